@@ -1,9 +1,75 @@
-from datetime import datetime
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import accumulate
+from sys import intern
+
+from arquivo_frio import GravadorFrio, HistoricoFrio
+from busca import IndiceBusca
+from extratos import EXTRATOS, Extrato
+from metricas import medir
+
+_EPOCH = datetime(1970, 1, 1)
+_MICRO = timedelta(microseconds=1)
+_TS_MIN = -2 ** 63
+
+# Tipos de transação conhecidos e o modelo do campo info de cada um.
+# O registro guarda só o código do tipo e a referência (conta de contrapartida
+# ou observação); o texto é montado quando a transação é materializada.
+_TIPOS = ["Depósito", "Saque", "Transferência - Enviada",
+          "Transferência - Recebida", "Rendimento", "Taxa de manutenção"]
+_CODIGOS = {tipo: i for i, tipo in enumerate(_TIPOS)}
+_DEPOSITO, _SAQUE, _ENVIADA, _RECEBIDA, _RENDIMENTO, _TAXA = range(6)
+_MODELOS_INFO = {_ENVIADA: "Para conta {}", _RECEBIDA: "De conta {}"}
+
+
+def tipo_codigo(tipo):
+    """Retorna o código numérico de um tipo de transação, registrando-o se novo."""
+    codigo = _CODIGOS.get(tipo)
+    if codigo is None:
+        if len(_TIPOS) >= 256:
+            raise ValueError("Limite de tipos de transação atingido.")
+        codigo = len(_TIPOS)
+        _TIPOS.append(intern(tipo))
+        _CODIGOS[tipo] = codigo
+    return codigo
+
+
+def _numpy():
+    """Importa numpy sob demanda; retorna None se não estiver instalado."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def tipo_nome(codigo):
+    return _TIPOS[codigo]
+
+
+def tipos_registrados():
+    """Nomes de todos os tipos registrados, na ordem dos códigos."""
+    return tuple(_TIPOS)
+
+
+def to_micros(data):
+    return (data - _EPOCH) // _MICRO
+
+
+def from_micros(ts):
+    return _EPOCH + timedelta(microseconds=ts)
+
 
 class Transaction:
     """
     Representa uma transação realizada na conta.
     """
+    __slots__ = ("tipo", "valor", "data", "info")
+
     def __init__(self, tipo, valor, data, info=""):
         self.tipo = tipo
         self.valor = valor
@@ -15,38 +81,391 @@ class Transaction:
         return f"{self.data.strftime('%d/%m/%Y %H:%M:%S')} - {self.tipo}: {sign}R$ {abs(self.valor):.2f} ({self.info})"
 
 
+class TransactionLog:
+    """
+    Registro de transações ordenado por data, em colunas compactas.
+    Cada entrada ocupa um timestamp em microssegundos (int64), o valor em
+    centavos (int64), o código do tipo (uint8) e uma referência compartilhada.
+    Objetos Transaction só são criados quando a entrada é lida.
+    Consultas por período usam busca binária sobre os timestamps.
+    Uma coluna de saldo acumulado (em centavos, após cada entrada) permite
+    obter o saldo em qualquer data também por busca binária.
+    Extratos consultados ficam no cache EXTRATOS e são atualizados a cada
+    nova entrada (ver extratos.py).
+    As entradas mais antigas podem ser movidas para um arquivo frio
+    (Bank.arquivar); os índices continuam contando desde a primeira entrada,
+    com as arquivadas antes das residentes.
+    """
+    def __init__(self, saldo_inicial=0.0):
+        self._ts = array("q")
+        self._cents = array("q")
+        self._tipos = array("B")
+        self._refs = []
+        self._saldos = array("q")
+        self._saldo_inicial = round(saldo_inicial * 100)  # antes da primeira entrada residente
+        self._extratos = {}
+        self._frio = None
+        self._nf = 0
+        self._ultimo_frio = _TS_MIN
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_extratos", None)
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault("_frio", None)
+        state.setdefault("_nf", 0)
+        state.setdefault("_ultimo_frio", _TS_MIN)
+        self.__dict__.update(state)
+        self._extratos = {}
+
+    def record(self, tipo, valor, data, ref=""):
+        """Registra uma entrada e retorna a Transaction correspondente."""
+        codigo = tipo_codigo(tipo)
+        self.append_raw(to_micros(data), round(valor * 100), codigo, ref)
+        return self._materialize(codigo, valor, data, ref)
+
+    def append(self, t):
+        codigo = tipo_codigo(t.tipo)
+        modelo = _MODELOS_INFO.get(codigo)
+        ref = t.info
+        if modelo is not None and ref.startswith(modelo[:-2]):
+            ref = ref[len(modelo) - 2:]
+        self.append_raw(to_micros(t.data), round(t.valor * 100), codigo, ref)
+
+    def append_raw(self, ts, cents, codigo, ref):
+        ref = intern(ref) if type(ref) is str else ref
+        if ts >= (self._ts[-1] if self._ts else self._ultimo_frio):
+            self._ts.append(ts)
+            self._cents.append(cents)
+            self._tipos.append(codigo)
+            self._refs.append(ref)
+            self._saldos.append((self._saldos[-1] if self._saldos else self._saldo_inicial) + cents)
+            if self._extratos:
+                self._atualizar_extratos(self._nf + len(self._ts) - 1, ts, cents)
+        else:
+            # Entrada fora de ordem: insere após as de mesmo timestamp e
+            # recalcula os saldos acumulados seguintes.
+            if ts < self._ultimo_frio:
+                self._desarquivar()
+            i = bisect_right(self._ts, ts)
+            self._ts.insert(i, ts)
+            self._cents.insert(i, cents)
+            self._tipos.insert(i, codigo)
+            self._refs.insert(i, ref)
+            self._saldos.insert(i, 0)
+            saldo = self._saldos[i - 1] if i else self._saldo_inicial
+            for j in range(i, len(self._saldos)):
+                saldo += self._cents[j]
+                self._saldos[j] = saldo
+            if self._extratos:
+                self._atualizar_extratos(self._nf + i, ts, cents)
+
+    def _atualizar_extratos(self, i, ts, cents):
+        """Ajusta os extratos em cache à entrada recém-inserida na posição `i`."""
+        no_fim = i == len(self) - 1
+        for periodo, extrato in list(self._extratos.items()):
+            inicio, fim = periodo
+            if fim is not None and ts > fim:
+                continue
+            if ts < inicio:
+                extrato.abertura += cents
+                extrato.fechamento += cents
+            elif no_fim:
+                EXTRATOS.acrescentar(extrato, self._get(i), cents)
+            else:
+                EXTRATOS.invalidar(self, periodo)
+
+    def extend_raw(self, ts, cents, codigos, refs):
+        """
+        Acrescenta várias entradas de uma vez (colunas de mesmo tamanho).
+        Se já vierem em ordem e depois da última entrada, as colunas são
+        estendidas em bloco; senão cada entrada é inserida individualmente.
+        """
+        ordenado = all(a <= b for a, b in zip(ts, ts[1:]))
+        ultimo = self._ts[-1] if self._ts else self._ultimo_frio
+        if not ordenado or (len(ts) and ts[0] < ultimo):
+            for entrada in zip(ts, cents, codigos, refs):
+                self.append_raw(*entrada)
+            return
+        for periodo in list(self._extratos):
+            EXTRATOS.invalidar(self, periodo)
+        self._ts.extend(ts)
+        self._cents.extend(cents)
+        self._tipos.extend(codigos)
+        self._refs.extend(intern(r) if type(r) is str else r for r in refs)
+        saldo = self._saldos[-1] if self._saldos else self._saldo_inicial
+        self._saldos.extend(accumulate(cents, initial=saldo))
+        # accumulate inclui o valor inicial; remove-o.
+        del self._saldos[len(self._saldos) - len(cents) - 1]
+
+    @property
+    def saldo_inicial(self):
+        if self._frio is not None:
+            return self._frio.saldo_inicial / 100
+        return self._saldo_inicial / 100
+
+    def columns(self, inicio=0, fim=None):
+        """Colunas brutas (timestamps, centavos, códigos, referências) de um intervalo."""
+        inicio, fim, _ = slice(inicio, fim).indices(len(self))
+        nf = self._nf
+        a, b = max(inicio - nf, 0), max(fim - nf, 0)
+        colunas = (self._ts[a:b], self._cents[a:b], self._tipos[a:b], self._refs[a:b])
+        if inicio >= nf:
+            return colunas
+        ts, cents, _, tipos, refs = self._frio.colunas(inicio, min(fim, nf))
+        return (ts + colunas[0], cents + colunas[1],
+                array("B", map(tipo_codigo, tipos)) + colunas[2], refs + colunas[3])
+
+    def _separar_frio(self, antes):
+        """Número de entradas residentes com data anterior a `antes` (µs)."""
+        return bisect_left(self._ts, antes)
+
+    def _colunas_residentes(self, k):
+        """Primeiras `k` entradas residentes, no formato de GravadorFrio.gravar."""
+        return (self._ts[:k], self._cents[:k], self._saldos[:k],
+                [_TIPOS[c] for c in self._tipos[:k]], self._refs[:k])
+
+    def _arquivar(self, segmento):
+        """Troca as primeiras entradas residentes pelo `segmento` já gravado com elas."""
+        k = segmento.n
+        if self._frio is None:
+            self._frio = HistoricoFrio(self._saldo_inicial)
+        self._frio.acrescentar(segmento)
+        self._saldo_inicial = self._saldos[k - 1]
+        self._ultimo_frio = self._ts[k - 1]
+        self._nf += k
+        for coluna in (self._ts, self._cents, self._tipos, self._refs, self._saldos):
+            del coluna[:k]
+
+    def _desarquivar(self):
+        """Traz de volta à memória as entradas arquivadas (inserção retroativa nelas)."""
+        ts, cents, saldos, tipos, refs = self._frio.colunas(0, self._nf)
+        self._ts = ts + self._ts
+        self._cents = cents + self._cents
+        self._saldos = saldos + self._saldos
+        self._tipos = array("B", map(tipo_codigo, tipos)) + self._tipos
+        self._refs = refs + self._refs
+        self._saldo_inicial = self._frio.saldo_inicial
+        self._frio = None
+        self._nf = 0
+        self._ultimo_frio = _TS_MIN
+
+    @staticmethod
+    def _materialize(codigo, valor, data, ref):
+        modelo = _MODELOS_INFO.get(codigo)
+        info = modelo.format(ref) if modelo is not None else ref
+        return Transaction(_TIPOS[codigo], valor, data, info)
+
+    def _get(self, i):
+        if i < self._nf:
+            ts, cents, tipo, ref = self._frio.get(i)
+            return self._materialize(tipo_codigo(tipo), cents / 100, from_micros(ts), ref)
+        i -= self._nf
+        return self._materialize(self._tipos[i], self._cents[i] / 100,
+                                 from_micros(self._ts[i]), self._refs[i])
+
+    def __len__(self):
+        return self._nf + len(self._ts)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._get(i)
+
+    def __getitem__(self, i):
+        n = len(self)
+        if isinstance(i, slice):
+            return [self._get(j) for j in range(*i.indices(n))]
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("índice de transação fora do intervalo")
+        return self._get(i)
+
+    def _bisect(self, funcao, ts):
+        """bisect_left/bisect_right sobre as datas de todas as entradas."""
+        k = funcao(self._ts, ts)
+        if k or not self._nf:
+            return self._nf + k
+        return self._frio.bisect(funcao, ts)
+
+    def index_range(self, start_date, end_date):
+        """
+        Retorna (inicio, fim) dos índices com start_date <= data <= end_date.
+        end_date None deixa o período aberto (até a última entrada).
+        """
+        lo = self._bisect(bisect_left, to_micros(start_date))
+        if end_date is None:
+            return lo, len(self)
+        return lo, max(lo, self._bisect(bisect_right, to_micros(end_date)))
+
+    def _saldo_ate(self, i):
+        """Saldo em centavos após as primeiras `i` entradas."""
+        if i > self._nf:
+            return self._saldos[i - self._nf - 1]
+        if i == self._nf:
+            return self._saldo_inicial
+        return self._frio.saldo_ate(i)
+
+    def balance_at(self, data):
+        """Saldo ao fim de `data` (após todas as entradas com data <= `data`)."""
+        return self._saldo_ate(self._bisect(bisect_right, to_micros(data))) / 100
+
+    def balance_range(self, start_date, end_date):
+        """Retorna (saldo de abertura, saldo de fechamento) do período."""
+        lo, hi = self.index_range(start_date, end_date)
+        return self._saldo_ate(lo) / 100, self._saldo_ate(hi) / 100
+
+    def between(self, start_date, end_date):
+        lo, hi = self.index_range(start_date, end_date)
+        return self[lo:hi]
+
+    def extrato(self, start_date, end_date):
+        """Extrato do período (ver extratos.Extrato), do cache quando possível."""
+        if not EXTRATOS.ativo:
+            lo, hi = self.index_range(start_date, end_date)
+            return Extrato(self[lo:hi], self._saldo_ate(lo), self._saldo_ate(hi))
+        periodo = (to_micros(start_date), None if end_date is None else to_micros(end_date))
+        extrato = EXTRATOS.obter(self, periodo)
+        if extrato is None:
+            lo, hi = self.index_range(start_date, end_date)
+            extrato = Extrato(self[lo:hi], self._saldo_ate(lo), self._saldo_ate(hi))
+            EXTRATOS.guardar(self, periodo, extrato)
+        return extrato
+
+    def page(self, numero, tamanho, start_date=None, end_date=None):
+        """Retorna a página `numero` (a partir de 0) do período, com `tamanho` itens."""
+        lo, hi = 0, len(self)
+        if start_date is not None:
+            lo = self._bisect(bisect_left, to_micros(start_date))
+        if end_date is not None:
+            hi = max(lo, self._bisect(bisect_right, to_micros(end_date)))
+        ini = lo + numero * tamanho
+        return self[ini:min(ini + tamanho, hi)]
+
+
+@contextmanager
+def lock_accounts(*accounts):
+    """
+    Adquire os locks de várias contas em ordem determinística (agencia, conta),
+    de modo que operações concorrentes sobre os mesmos pares nunca se bloqueiem
+    mutuamente.
+    """
+    unicas = {id(a): a for a in accounts}.values()
+    ordenadas = sorted(unicas, key=lambda a: (a.agencia, a.conta, id(a)))
+    for acc in ordenadas:
+        acc._lock.acquire()
+    try:
+        yield
+    finally:
+        for acc in reversed(ordenadas):
+            acc._lock.release()
+
+
 class Account:
     """
     Classe base para contas bancárias.
+    Cada conta tem um lock próprio; as operações são atômicas em relação a
+    outras threads que usem a mesma conta.
     """
     def __init__(self, agencia, conta, titular, endereco, saldo=0.0):
         self.agencia = agencia
         self.conta = conta
         self.titular = titular
         self.endereco = endereco
-        self.saldo = saldo
-        self.transactions = []
-        self.deletion_requested = False
+        self._saldo = saldo
+        self.transactions = TransactionLog(saldo)
+        self._deletion_requested = False
+        self._bank = None
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_bank"] = None
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        if "deletion_requested" in state:
+            state["_deletion_requested"] = state.pop("deletion_requested")
+        if "saldo" in state:
+            state["_saldo"] = state.pop("saldo")
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @property
+    def saldo(self):
+        return self._saldo
+
+    @saldo.setter
+    def saldo(self, valor):
+        if self._bank is not None:
+            self._bank._ajustar_agregados(self, self._saldo, valor)
+        self._saldo = valor
+
+    @property
+    def deletion_requested(self):
+        return self._deletion_requested
 
-    def deposit(self, amount, origem=""):
+    @deletion_requested.setter
+    def deletion_requested(self, valor):
+        self._marcar_exclusao(valor)
+        if self._bank is not None:
+            self._bank._atualizar_pendente(self)
+
+    def _marcar_exclusao(self, valor):
+        """Altera a solicitação de exclusão e notifica os observadores do banco."""
+        with self._lock:
+            self._deletion_requested = bool(valor)
+            self._notify("deletion_requested", self._deletion_requested)
+
+    def _notify(self, evento, *args):
+        if self._bank is not None:
+            self._bank._notify(evento, self, *args)
+
+    @medir("deposit")
+    def deposit(self, amount, origem="", data=None):
         if amount <= 0:
             raise ValueError("O valor do depósito deve ser positivo.")
-        self.saldo += amount
-        t = Transaction("Depósito", amount, datetime.now(), origem)
-        self.transactions.append(t)
+        data = data or datetime.now()
+        with self._lock:
+            self.saldo += amount
+            t = self.transactions.record("Depósito", amount, data, origem)
+            self._notify("deposit", amount, origem, data)
         return t
 
-    def withdraw(self, amount):  # método abstrato
+    def saldo_minimo(self):  # método abstrato
+        raise NotImplementedError
+
+    def withdraw(self, amount, data=None):  # método abstrato
         raise NotImplementedError
 
-    def transfer(self, destino, amount):  # método abstrato
+    def transfer(self, destino, amount, data=None):  # método abstrato
         raise NotImplementedError
 
-    def get_extrato(self, start_date, end_date):
-        return [t for t in self.transactions if start_date <= t.data <= end_date]
+    @medir("get_extrato")
+    def get_extrato(self, start_date, end_date=None):
+        """Transações do período; end_date None inclui até a última."""
+        with self._lock:
+            return list(self.transactions.extrato(start_date, end_date).transacoes)
+
+    def get_extrato_texto(self, start_date, end_date=None):
+        """Extrato formatado, uma transação por linha."""
+        with self._lock:
+            return EXTRATOS.texto(self.transactions.extrato(start_date, end_date))
+
+    def get_saldos_periodo(self, start_date, end_date):
+        """Saldos de abertura e de fechamento do período do extrato."""
+        return self.transactions.balance_range(start_date, end_date)
+
+    def get_saldo_em(self, data):
+        return self.transactions.balance_at(data)
 
     def update_address(self, novo_endereco):
-        self.endereco = novo_endereco
+        with self._lock:
+            self.endereco = novo_endereco
+            self._notify("update_address", novo_endereco)
         return novo_endereco
 
 
@@ -60,29 +479,49 @@ class ContaCorrente(Account):
         self.limite_cheque_especial = limite_cheque_especial
         self.taxa_manutencao = taxa_manutencao
 
-    def withdraw(self, amount):
+    def saldo_minimo(self):
+        return -self.limite_cheque_especial
+
+    def cobrar_taxa(self, data=None):
+        """Debita a taxa de manutenção mensal, mesmo além do cheque especial."""
+        return self._debitar_taxa(self.taxa_manutencao, data or datetime.now())
+
+    def _debitar_taxa(self, taxa, data):
+        with self._lock:
+            self.saldo -= taxa
+            t = self.transactions.record("Taxa de manutenção", -taxa,
+                                         data, "Taxa mensal")
+            self._notify("cobrar_taxa", taxa, data)
+        return t
+
+    @medir("withdraw")
+    def withdraw(self, amount, data=None):
         if amount <= 0:
             raise ValueError("O valor do saque deve ser positivo.")
-        if self.saldo - amount < -self.limite_cheque_especial:
-            raise ValueError("Saldo insuficiente: ultrapassa limite de cheque especial.")
-        self.saldo -= amount
-        t = Transaction("Saque", -amount, datetime.now(), "Saque realizado")
-        self.transactions.append(t)
+        data = data or datetime.now()
+        with self._lock:
+            if self.saldo - amount < -self.limite_cheque_especial:
+                raise ValueError("Saldo insuficiente: ultrapassa limite de cheque especial.")
+            self.saldo -= amount
+            t = self.transactions.record("Saque", -amount, data, "Saque realizado")
+            self._notify("withdraw", amount, data)
         return t
 
-    def transfer(self, destino, amount):
+    @medir("transfer")
+    def transfer(self, destino, amount, data=None):
         if amount <= 0:
             raise ValueError("O valor da transferência deve ser positivo.")
-        if self.saldo - amount < -self.limite_cheque_especial:
-            raise ValueError("Saldo insuficiente para transferência.")
-        self.saldo -= amount
-        t1 = Transaction("Transferência - Enviada", -amount,
-                         datetime.now(), f"Para conta {destino.conta}")
-        self.transactions.append(t1)
-        destino.saldo += amount
-        t2 = Transaction("Transferência - Recebida", amount,
-                         datetime.now(), f"De conta {self.conta}")
-        destino.transactions.append(t2)
+        data = data or datetime.now()
+        with lock_accounts(self, destino):
+            if self.saldo - amount < -self.limite_cheque_especial:
+                raise ValueError("Saldo insuficiente para transferência.")
+            self.saldo -= amount
+            t1 = self.transactions.record("Transferência - Enviada", -amount,
+                                          data, destino.conta)
+            destino.saldo += amount
+            t2 = destino.transactions.record("Transferência - Recebida", amount,
+                                             data, self.conta)
+            self._notify("transfer", destino, amount, data)
         return t1, t2
 
 
@@ -95,59 +534,629 @@ class ContaPoupanca(Account):
         super().__init__(agencia, conta, titular, endereco, saldo)
         self.rendimento_mensal = rendimento_mensal
 
-    def withdraw(self, amount):
+    def saldo_minimo(self):
+        return 0.0
+
+    @medir("withdraw")
+    def withdraw(self, amount, data=None):
         if amount <= 0:
             raise ValueError("O valor do saque deve ser positivo.")
-        if self.saldo - amount < 0:
-            raise ValueError("Saldo insuficiente: não permite saldo negativo.")
-        self.saldo -= amount
-        t = Transaction("Saque", -amount, datetime.now(), "Saque realizado")
-        self.transactions.append(t)
+        data = data or datetime.now()
+        with self._lock:
+            if self.saldo - amount < 0:
+                raise ValueError("Saldo insuficiente: não permite saldo negativo.")
+            self.saldo -= amount
+            t = self.transactions.record("Saque", -amount, data, "Saque realizado")
+            self._notify("withdraw", amount, data)
         return t
 
-    def transfer(self, destino, amount):
+    @medir("transfer")
+    def transfer(self, destino, amount, data=None):
         if amount <= 0:
             raise ValueError("O valor da transferência deve ser positivo.")
-        if self.saldo - amount < 0:
-            raise ValueError("Saldo insuficiente para transferência.")
-        self.saldo -= amount
-        t1 = Transaction("Transferência - Enviada", -amount,
-                         datetime.now(), f"Para conta {destino.conta}")
-        self.transactions.append(t1)
-        destino.saldo += amount
-        t2 = Transaction("Transferência - Recebida", amount,
-                         datetime.now(), f"De conta {self.conta}")
-        destino.transactions.append(t2)
+        data = data or datetime.now()
+        with lock_accounts(self, destino):
+            if self.saldo - amount < 0:
+                raise ValueError("Saldo insuficiente para transferência.")
+            self.saldo -= amount
+            t1 = self.transactions.record("Transferência - Enviada", -amount,
+                                          data, destino.conta)
+            destino.saldo += amount
+            t2 = destino.transactions.record("Transferência - Recebida", amount,
+                                             data, self.conta)
+            self._notify("transfer", destino, amount, data)
         return t1, t2
 
-    def aplicar_rendimento(self):
-        rendimento = self.saldo * self.rendimento_mensal
-        self.saldo += rendimento
-        t = Transaction("Rendimento", rendimento,
-                        datetime.now(), "Aplicação de rendimento")
-        self.transactions.append(t)
+    def aplicar_rendimento(self, data=None):
+        with self._lock:
+            # Arredondado ao centavo para o saldo coincidir com o registro.
+            rendimento = round(self.saldo * self.rendimento_mensal, 2)
+            return self._creditar_rendimento(rendimento, data or datetime.now())
+
+    def _creditar_rendimento(self, rendimento, data):
+        with self._lock:
+            self.saldo += rendimento
+            t = self.transactions.record("Rendimento", rendimento,
+                                         data, "Aplicação de rendimento")
+            self._notify("aplicar_rendimento", rendimento, data)
         return t
 
 
+def _calcular_mes(poupancas, correntes):
+    """Calcula rendimentos e taxas do mês em vetores (numpy, se disponível)."""
+    np = _numpy()
+    if np is None:
+        rendimentos = [round(acc.saldo * acc.rendimento_mensal, 2) for acc in poupancas]
+        taxas = [acc.taxa_manutencao for acc in correntes]
+        return (rendimentos, [round(r * 100) for r in rendimentos], sum(rendimentos),
+                taxas, [round(t * 100) for t in taxas], sum(taxas))
+    saldos = np.fromiter((acc.saldo for acc in poupancas), np.float64, len(poupancas))
+    taxas_rend = np.fromiter((acc.rendimento_mensal for acc in poupancas),
+                             np.float64, len(poupancas))
+    rendimentos = np.round(saldos * taxas_rend, 2)
+    cents_rend = np.rint(rendimentos * 100).astype(np.int64)
+    taxas = np.fromiter((acc.taxa_manutencao for acc in correntes), np.float64, len(correntes))
+    cents_taxa = np.rint(taxas * 100).astype(np.int64)
+    return (rendimentos.tolist(), cents_rend.tolist(), float(rendimentos.sum()),
+            taxas.tolist(), cents_taxa.tolist(), float(taxas.sum()))
+
+
+class AccountsView:
+    """
+    Visão somente leitura das contas de um Bank, na ordem de cadastro.
+    Suporta len, iteração, `in` e índices/fatias.
+    """
+    __slots__ = ("_bank",)
+
+    def __init__(self, bank):
+        self._bank = bank
+
+    def __len__(self):
+        return len(self._bank._index)
+
+    def __iter__(self):
+        for acc in self._bank._contas:
+            if acc is not None:
+                yield acc
+
+    def __contains__(self, account):
+        return self._bank._index.get((account.agencia, account.conta)) is account
+
+    def __getitem__(self, i):
+        bank = self._bank
+        if not bank._lacunas:
+            return bank._contas[i]
+        with bank._lock:
+            contas, lacunas = bank._contas, bank._lacunas
+            n = len(contas) - len(lacunas)
+            if isinstance(i, slice):
+                return [contas[_posicao(lacunas, j)] for j in range(*i.indices(n))]
+            if i < 0:
+                i += n
+            if not 0 <= i < n:
+                raise IndexError("índice de conta fora do intervalo")
+            return contas[_posicao(lacunas, i)]
+
+
+def _posicao(lacunas, i):
+    """Posição na lista com `lacunas` (posições vazias, em ordem) da i-ésima conta."""
+    # Antes da lacuna k há lacunas[k] - k contas; conta-se quantas lacunas
+    # têm no máximo i contas antes delas.
+    a, b = 0, len(lacunas)
+    while a < b:
+        m = (a + b) // 2
+        if lacunas[m] - m <= i:
+            a = m + 1
+        else:
+            b = m
+    return i + a
+
+
+class ResumoAgencia:
+    """
+    Agregados de uma agência, mantidos pelo Bank a cada alteração de saldo e
+    a cada cadastro ou remoção de conta. Valores em centavos.
+    """
+    __slots__ = ("contas", "correntes", "poupancas", "depositos",
+                 "cheque_especial", "contas_cheque_especial", "poupanca")
+
+    def __init__(self):
+        self.contas = self.correntes = self.poupancas = 0
+        self.depositos = self.cheque_especial = self.contas_cheque_especial = self.poupanca = 0
+
+    def __eq__(self, outro):
+        return isinstance(outro, ResumoAgencia) and all(
+            getattr(self, campo) == getattr(outro, campo) for campo in self.__slots__)
+
+    def contar(self, account, sinal):
+        """Inclui (sinal 1) ou exclui (sinal -1) a conta, com o seu saldo."""
+        self.contas += sinal
+        if isinstance(account, ContaCorrente):
+            self.correntes += sinal
+        elif isinstance(account, ContaPoupanca):
+            self.poupancas += sinal
+        self.somar(account, round(account.saldo * 100), sinal)
+
+    def somar(self, account, cents, sinal):
+        """Soma (ou subtrai) a parcela de um saldo de `cents` da conta."""
+        if cents > 0:
+            self.depositos += sinal * cents
+        if isinstance(account, ContaCorrente):
+            if cents < 0:
+                self.cheque_especial -= sinal * cents
+                self.contas_cheque_especial += sinal
+        elif isinstance(account, ContaPoupanca):
+            self.poupanca += sinal * cents
+
+    def ajustar(self, account, antigo, novo):
+        """Troca a parcela de um saldo de `antigo` pela de `novo` centavos."""
+        self.depositos += (novo if novo > 0 else 0) - (antigo if antigo > 0 else 0)
+        if isinstance(account, ContaCorrente):
+            if novo < 0 or antigo < 0:
+                self.cheque_especial += (-novo if novo < 0 else 0) - (-antigo if antigo < 0 else 0)
+                self.contas_cheque_especial += (novo < 0) - (antigo < 0)
+        elif isinstance(account, ContaPoupanca):
+            self.poupanca += novo - antigo
+
+    def como_dict(self):
+        return {
+            "contas": self.contas,
+            "correntes": self.correntes,
+            "poupancas": self.poupancas,
+            "total_depositos": self.depositos / 100,
+            "exposicao_cheque_especial": self.cheque_especial / 100,
+            "contas_cheque_especial": self.contas_cheque_especial,
+            "volume_poupanca": self.poupanca / 100,
+        }
+
+
+def recalcular_agregados(contas):
+    """Agregados por agência calculados do zero a partir de `contas`."""
+    agencias = {}
+    for acc in contas:
+        resumo = agencias.get(acc.agencia)
+        if resumo is None:
+            resumo = agencias[acc.agencia] = ResumoAgencia()
+        resumo.contar(acc, 1)
+    return agencias
+
+
 class Bank:
     """
     Gerencia as contas do sistema.
+    Mantém um índice primário por (agencia, conta) para buscas em tempo constante.
+    As contas ficam numa lista em que remoções deixam lacunas (compactada
+    pela própria remoção quando metade dela é lacuna), e as solicitações de
+    exclusão numa fila mantida pela própria conta ao mudar deletion_requested;
+    `accounts` é uma visão dessa lista sem as lacunas, cujo acesso por índice
+    salta as lacunas por busca binária, sem alterar a lista.
+    Os agregados por agência (ResumoAgencia) são atualizados pela própria
+    conta a cada alteração de saldo e pelo cadastro e remoção de contas, então
+    agregados(agencia) não percorre as contas.
+    buscar(texto) consulta por prefixo de titular, conta ou agência num
+    IndiceBusca, criado na primeira busca e mantido pelo cadastro e remoção.
+    Observadores registrados com add_observer recebem cada alteração de estado
+    como (evento, conta, *args), depois que ela foi aplicada e ainda sob o lock
+    das contas envolvidas.
+    Os métodos deposit, withdraw e transfer por (agencia, conta) podem ser
+    chamados de várias threads.
     """
     def __init__(self):
-        self.accounts = []
+        self._contas = []
+        self._slots = {}
+        self._lacunas = []
+        self._pendentes = {}
+        self.accounts = AccountsView(self)
+        self._index = {}
+        self._observers = []
+        self._lock = threading.RLock()
+        self._agencias = {}
+        self._lock_agregados = threading.Lock()
+        self._busca = None
+
+    def add_observer(self, observer):
+        self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        self._observers.remove(observer)
+
+    def _notify(self, evento, account, *args):
+        for observer in self._observers:
+            observer(evento, account, *args)
+
+    @property
+    def _precisa_eventos(self):
+        """
+        Se as operações em massa (add_accounts, apply_batch, month_end) devem
+        emitir eventos. Sem observadores elas os pulam; subclasses que
+        consomem os eventos em _notify retornam True.
+        """
+        return bool(self._observers)
 
     def add_account(self, account):
-        self.accounts.append(account)
+        key = (account.agencia, account.conta)
+        with self._lock:
+            if key in self._index:
+                raise ValueError("Conta já cadastrada para esta agência.")
+            self._index[key] = account
+            self._slots[key] = len(self._contas)
+            self._contas.append(account)
+            if account.deletion_requested:
+                self._pendentes[key] = account
+            self._contar(account, 1)
+            if self._busca is not None:
+                self._busca.adicionar(account)
+            account._bank = self
+            self._notify("add_account", account)
 
+    def add_accounts(self, accounts):
+        """Cadastra várias contas sob um único lock; levanta ValueError na primeira duplicada."""
+        with self._lock:
+            index, slots, contas = self._index, self._slots, self._contas
+            notificar = self._precisa_eventos
+            busca = self._busca
+            for account in accounts:
+                key = (account.agencia, account.conta)
+                if key in index:
+                    raise ValueError("Conta já cadastrada para esta agência.")
+                index[key] = account
+                slots[key] = len(contas)
+                contas.append(account)
+                if account.deletion_requested:
+                    self._pendentes[key] = account
+                self._contar(account, 1)
+                if busca is not None:
+                    busca.adicionar(account)
+                account._bank = self
+                if notificar:
+                    self._notify("add_account", account)
+
+    @medir("find_account")
     def find_account(self, agencia, conta):
-        for acc in self.accounts:
-            if acc.agencia == agencia and acc.conta == conta:
-                return acc
-        return None
+        return self._index.get((agencia, conta))
+
+    @medir("buscar")
+    def buscar(self, texto, k=20):
+        """
+        Até `k` contas em que cada palavra de `texto` é prefixo de uma palavra
+        do titular, da conta ou da agência (sem diferenciar maiúsculas nem
+        acentos). A primeira busca cria o índice.
+        """
+        with self._lock:
+            if self._busca is None:
+                self._busca = IndiceBusca(self.accounts)
+            return self._busca.buscar(texto, k)
+
+    def _get_account(self, agencia, conta):
+        acc = self._index.get((agencia, conta))
+        if acc is None:
+            raise ValueError("Agência ou conta não encontrada.")
+        return acc
 
     def remove_account(self, account):
-        if account in self.accounts:
-            self.accounts.remove(account)
+        with self._lock, account._lock:
+            self._remover(account)
+            self._compactar_se_preciso()
+
+    def _remover(self, account):
+        """Remove a conta (com os locks do banco e da conta); retorna se estava cadastrada."""
+        key = (account.agencia, account.conta)
+        if self._index.get(key) is not account:
+            return False
+        del self._index[key]
+        posicao = self._slots.pop(key)
+        self._contas[posicao] = None
+        insort(self._lacunas, posicao)
+        self._pendentes.pop(key, None)
+        account._bank = None
+        self._contar(account, -1)
+        if self._busca is not None:
+            self._busca.remover(account)
+        self._notify("remove_account", account)
+        return True
+
+    def _compactar_se_preciso(self):
+        if len(self._lacunas) > 64 and 2 * len(self._lacunas) > len(self._contas):
+            self._compactar()
+
+    def _compactar(self):
+        """Remove as lacunas da lista de contas e renumera as posições."""
+        if not self._lacunas:
+            return
+        contas = [acc for acc in self._contas if acc is not None]
+        self._slots = {(acc.agencia, acc.conta): i for i, acc in enumerate(contas)}
+        self._contas = contas
+        self._lacunas = []
+
+    def _contar(self, account, sinal):
+        with self._lock_agregados:
+            resumo = self._agencias.get(account.agencia)
+            if resumo is None:
+                resumo = self._agencias[account.agencia] = ResumoAgencia()
+            resumo.contar(account, sinal)
+            if not resumo.contas:
+                del self._agencias[account.agencia]
+
+    def _ajustar_agregados(self, account, antigo, novo):
+        """Chamado pela conta (sob o seu lock) antes de o saldo mudar de `antigo` para `novo`."""
+        antigo, novo = round(antigo * 100), round(novo * 100)
+        if antigo != novo:
+            with self._lock_agregados:
+                self._agencias[account.agencia].ajustar(account, antigo, novo)
+
+    def agregados(self, agencia):
+        """
+        Número de contas, total depositado, exposição ao cheque especial e
+        volume em poupança da agência, sem percorrer as contas.
+        """
+        with self._lock_agregados:
+            resumo = self._agencias.get(agencia)
+            return (resumo or ResumoAgencia()).como_dict()
+
+    def agregados_por_agencia(self):
+        with self._lock_agregados:
+            return {agencia: r.como_dict() for agencia, r in sorted(self._agencias.items())}
+
+    def verificar_agregados(self):
+        """
+        Recalcula os agregados do zero, com todas as contas bloqueadas, e os
+        compara aos mantidos. Retorna {agencia: (mantido, recalculado)} das
+        agências divergentes; vazio se estiverem consistentes.
+        """
+        with self._lock, lock_accounts(*self.accounts):
+            return self._comparar_agregados(recalcular_agregados(self.accounts))
+
+    def _comparar_agregados(self, recalculados):
+        with self._lock_agregados:
+            mantidos = dict(self._agencias)
+            vazio = ResumoAgencia()
+            return {agencia: (mantidos.get(agencia, vazio).como_dict(),
+                              recalculados.get(agencia, vazio).como_dict())
+                    for agencia in mantidos.keys() | recalculados.keys()
+                    if mantidos.get(agencia) != recalculados.get(agencia)}
+
+    def _atualizar_pendente(self, account):
+        key = (account.agencia, account.conta)
+        with self._lock:
+            if self._index.get(key) is not account:
+                return
+            if account.deletion_requested:
+                self._pendentes[key] = account
+            else:
+                self._pendentes.pop(key, None)
 
     def get_pending_deletion_requests(self):
-        return [acc for acc in self.accounts if acc.deletion_requested]
+        """Contas com exclusão solicitada, na ordem das solicitações."""
+        return list(self._pendentes.values())
+
+    def approve_deletion_requests(self, accounts=None):
+        """
+        Remove as contas com exclusão solicitada dentre `accounts` (todas as
+        pendentes, se None). Retorna quantas foram removidas.
+        """
+        with self._lock:
+            alvo = list(self._pendentes.values()) if accounts is None else list(accounts)
+            n = 0
+            for acc in alvo:
+                with acc._lock:
+                    if acc.deletion_requested and self._remover(acc):
+                        n += 1
+            self._compactar_se_preciso()
+        return n
+
+    def reject_deletion_requests(self, accounts=None):
+        """
+        Recusa as solicitações de exclusão dentre `accounts` (todas as
+        pendentes, se None). Retorna quantas foram recusadas.
+        """
+        with self._lock:
+            alvo = list(self._pendentes.values()) if accounts is None else list(accounts)
+            n = 0
+            for acc in alvo:
+                if acc.deletion_requested:
+                    acc._marcar_exclusao(False)
+                    if self._pendentes.pop((acc.agencia, acc.conta), None) is not None:
+                        n += 1
+        return n
+
+    def deposit(self, agencia, conta, amount, origem=""):
+        return self._get_account(agencia, conta).deposit(amount, origem)
+
+    def withdraw(self, agencia, conta, amount):
+        return self._get_account(agencia, conta).withdraw(amount)
+
+    def transfer(self, agencia, conta, agencia_destino, conta_destino, amount):
+        origem = self._get_account(agencia, conta)
+        destino = self._get_account(agencia_destino, conta_destino)
+        return origem.transfer(destino, amount)
+
+    def apply_batch(self, ops, atomic=True):
+        """
+        Aplica um lote de operações sob um único timestamp.
+
+        Cada operação é uma tupla:
+            ("deposit", agencia, conta, valor[, origem])
+            ("withdraw", agencia, conta, valor)
+            ("transfer", agencia, conta, agencia_destino, conta_destino, valor)
+
+        As contas são resolvidas numa só passada e os limites (cheque especial
+        ou saldo não negativo) são validados para o lote inteiro antes de
+        qualquer alteração, com todas as contas envolvidas bloqueadas.
+        Com atomic=True, qualquer operação inválida levanta ValueError e nada
+        é aplicado. Com atomic=False, as inválidas são ignoradas.
+        Retorna uma lista com None para cada operação aplicada ou o
+        ValueError da operação rejeitada.
+        """
+        index = self._index
+        resolvidas = []
+        envolvidas = {}
+        for op in ops:
+            tipo = op[0]
+            if tipo == "transfer":
+                origem = index.get((op[1], op[2]))
+                destino = index.get((op[3], op[4]))
+                amount, info = op[5], None
+            elif tipo in ("deposit", "withdraw"):
+                origem, destino = index.get((op[1], op[2])), None
+                amount = op[3]
+                info = op[4] if tipo == "deposit" and len(op) > 4 else ""
+            else:
+                raise ValueError(f"Operação desconhecida: {tipo}")
+            resolvidas.append((tipo, origem, destino, amount, info))
+            if origem is not None:
+                envolvidas[id(origem)] = origem
+            if destino is not None:
+                envolvidas[id(destino)] = destino
+
+        data = datetime.now()
+        ts = to_micros(data)
+        resultados = [None] * len(resolvidas)
+        with lock_accounts(*envolvidas.values()):
+            # Por conta: saldo projetado, saldo mínimo e os lançamentos
+            # (centavos, códigos, referências). Cada conta recebe depois o
+            # saldo final de uma vez (um único ajuste dos agregados) e os seus
+            # lançamentos num só bloco.
+            contas = {}
+            validas = []
+            for i, (tipo, origem, destino, amount, info) in enumerate(resolvidas):
+                if origem is None or (tipo == "transfer" and destino is None):
+                    erro = "Agência ou conta não encontrada."
+                elif amount <= 0:
+                    erro = "O valor da operação deve ser positivo."
+                else:
+                    o = contas.get(id(origem))
+                    if o is None:
+                        o = contas[id(origem)] = [origem.saldo, None, [], [], []]
+                    cents = round(amount * 100)
+                    if tipo == "deposit":
+                        o[0] += amount
+                        o[2].append(cents)
+                        o[3].append(_DEPOSITO)
+                        o[4].append(info)
+                        validas.append(i)
+                        continue
+                    if o[1] is None:
+                        o[1] = origem.saldo_minimo()
+                    if o[0] - amount < o[1]:
+                        erro = "Saldo insuficiente."
+                    else:
+                        o[0] -= amount
+                        o[2].append(-cents)
+                        if tipo == "withdraw":
+                            o[3].append(_SAQUE)
+                            o[4].append("Saque realizado")
+                        else:
+                            o[3].append(_ENVIADA)
+                            o[4].append(destino.conta)
+                            d = contas.get(id(destino))
+                            if d is None:
+                                d = contas[id(destino)] = [destino.saldo, None, [], [], []]
+                            d[0] += amount
+                            d[2].append(cents)
+                            d[3].append(_RECEBIDA)
+                            d[4].append(origem.conta)
+                        validas.append(i)
+                        continue
+                if atomic:
+                    raise ValueError(f"Operação {i}: {erro}")
+                resultados[i] = ValueError(erro)
+            for chave, (saldo, _, cents, codigos, refs) in contas.items():
+                if not cents:
+                    continue
+                acc = envolvidas[chave]
+                acc.saldo = saldo
+                if len(cents) == 1:
+                    acc.transactions.append_raw(ts, cents[0], codigos[0], refs[0])
+                else:
+                    acc.transactions.extend_raw([ts] * len(cents), cents, codigos, refs)
+            if self._precisa_eventos:
+                for i in validas:
+                    tipo, origem, destino, amount, info = resolvidas[i]
+                    if tipo == "deposit":
+                        origem._notify("deposit", amount, info, data)
+                    elif tipo == "withdraw":
+                        origem._notify("withdraw", amount, data)
+                    else:
+                        origem._notify("transfer", destino, amount, data)
+        return resultados
+
+    def month_end(self, data=None):
+        """
+        Fechamento mensal: credita o rendimento de todas as poupanças e
+        debita a taxa de manutenção de todas as contas correntes.
+
+        Saldos e taxas são reunidos em vetores e os valores calculados numa
+        única passada vetorizada (numpy, se instalado; senão um laço Python
+        com o mesmo arredondamento ao centavo). Em seguida cada conta recebe
+        o lançamento correspondente. Valores nulos não geram lançamento.
+        Retorna um resumo com quantidades e totais.
+        """
+        data = data or datetime.now()
+        with self._lock, lock_accounts(*self.accounts):
+            return self._fechar_mes(self.accounts, data)
+
+    def arquivar(self, diretorio, horizonte):
+        """
+        Move para um arquivo frio em `diretorio` as transações de todas as
+        contas com data anterior a `horizonte` (ver arquivo_frio.py). As
+        consultas continuam vendo o histórico completo. Retorna quantas
+        transações foram arquivadas; levanta ValueError, sem arquivar nada,
+        se alguma referência não puder ser gravada (ver GravadorFrio.gravar).
+        Com Persistencia ativa, grave um snapshot em seguida: ele passa a
+        referenciar o arquivo.
+        """
+        antes = to_micros(horizonte)
+        os.makedirs(diretorio, exist_ok=True)
+        caminho = os.path.join(diretorio, f"frio-{to_micros(datetime.now())}.dat")
+        with self._lock, lock_accounts(*self.accounts):
+            gravador = None
+            blocos = []
+            try:
+                for acc in self.accounts:
+                    log = acc.transactions
+                    k = log._separar_frio(antes)
+                    if k:
+                        gravador = gravador or GravadorFrio(caminho)
+                        blocos.append((log, gravador.gravar(*log._colunas_residentes(k)), k))
+                if gravador is None:
+                    return 0
+                arquivo = gravador.fechar()
+            except BaseException:
+                # Nada saiu da memória ainda: basta descartar o arquivo parcial.
+                if gravador is not None:
+                    gravador.descartar()
+                raise
+            for log, inicio, k in blocos:
+                log._arquivar(arquivo.segmento(inicio, k))
+        return sum(k for _, _, k in blocos)
+
+    def _fechar_mes(self, contas, data):
+        """Fechamento mensal de `contas`, já bloqueadas pelo chamador."""
+        ts = to_micros(data)
+        poupancas = [acc for acc in contas if isinstance(acc, ContaPoupanca)]
+        correntes = [acc for acc in contas if isinstance(acc, ContaCorrente)]
+        (rendimentos, cents_rend, total_rend,
+         taxas, cents_taxa, total_taxa) = _calcular_mes(poupancas, correntes)
+
+        notificar = self._precisa_eventos
+        n_rend = n_taxa = 0
+        for acc, valor, cents in zip(poupancas, rendimentos, cents_rend):
+            if cents:
+                acc.saldo += valor
+                acc.transactions.append_raw(ts, cents, _RENDIMENTO, "Aplicação de rendimento")
+                if notificar:
+                    self._notify("aplicar_rendimento", acc, valor, data)
+                n_rend += 1
+        for acc, valor, cents in zip(correntes, taxas, cents_taxa):
+            if cents:
+                acc.saldo -= valor
+                acc.transactions.append_raw(ts, -cents, _TAXA, "Taxa mensal")
+                if notificar:
+                    self._notify("cobrar_taxa", acc, valor, data)
+                n_taxa += 1
+        return {
+            "rendimentos": n_rend,
+            "total_rendimentos": total_rend,
+            "taxas": n_taxa,
+            "total_taxas": total_taxa,
+        }
@@ -0,0 +1,245 @@
+"""
+Arquivo frio de transações antigas.
+
+Bank.arquivar grava as transações anteriores a um horizonte num arquivo de
+registros de largura fixa e as remove da memória. Cada execução gera um
+arquivo imutável com os blocos de todas as contas; o TransactionLog de cada
+conta passa a apontar para o seu bloco (um Segmento) e continua expondo o
+histórico completo. As leituras vão direto ao mapeamento (mmap) do arquivo,
+por views sem cópia sobre as colunas, então só as páginas lidas ocupam
+memória. Cada arquivo fica mapeado enquanto algum segmento o referencia
+(ou até ArquivoFrio.fechar).
+
+Layout do arquivo (ordem de bytes nativa, indicada no magic):
+    cabeçalho   magic (8), nº de registros, posição e tamanho da tabela de
+                textos (uint64 cada)
+    registros   32 bytes: data (µs), valor (centavos), saldo acumulado
+                (centavos), índice do tipo (uint32), índice da referência (uint32)
+    textos      nomes de tipos e referências em UTF-8, separados por NUL
+"""
+import mmap
+import os
+import struct
+import sys
+import threading
+import weakref
+from array import array
+from bisect import bisect_left, bisect_right
+from sys import intern
+
+_MAGIC = b"SBFRIO1" + (b"L" if sys.byteorder == "little" else b"B")
+_CABECALHO = struct.Struct("<8sQQQ")
+_PALAVRAS = 4  # int64 por registro
+
+# Mapeamentos abertos por caminho; saem daqui (e o mmap é fechado) quando o
+# último segmento que os usa é descartado.
+_abertos = weakref.WeakValueDictionary()
+_lock_abertos = threading.Lock()
+
+
+def abrir(caminho):
+    """ArquivoFrio de `caminho`, compartilhado entre todas as contas que o usam."""
+    caminho = os.path.abspath(caminho)
+    with _lock_abertos:
+        arquivo = _abertos.get(caminho)
+        if arquivo is None:
+            arquivo = _abertos[caminho] = ArquivoFrio(caminho)
+        return arquivo
+
+
+class ArquivoFrio:
+    """Arquivo de registros mapeado em memória, somente leitura."""
+    def __init__(self, caminho):
+        self.caminho = caminho
+        with open(caminho, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, pos_textos, tam_textos = _CABECALHO.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError("Arquivo frio inválido ou de outra arquitetura.")
+        self.n = n
+        self._pos_textos = pos_textos
+        self._tam_textos = tam_textos
+        fim = _CABECALHO.size + 8 * _PALAVRAS * n
+        self._palavras = memoryview(self._mmap)[_CABECALHO.size:fim].cast("q")
+        self._textos = None
+        self._lock = threading.Lock()
+
+    def fechar(self):
+        """Desfaz o mapeamento; segmentos deste arquivo deixam de poder ser lidos."""
+        with _lock_abertos:
+            if _abertos.get(self.caminho) is self:
+                del _abertos[self.caminho]
+        self._palavras.release()
+        self._mmap.close()
+
+    def texto(self, i):
+        if self._textos is None:
+            with self._lock:
+                if self._textos is None:
+                    blob = self._mmap[self._pos_textos:self._pos_textos + self._tam_textos]
+                    self._textos = [intern(t) for t in blob.decode("utf-8").split("\0")]
+        return self._textos[i]
+
+    def segmento(self, inicio, n):
+        return Segmento(self, inicio, n)
+
+
+class Segmento:
+    """
+    Bloco de `n` registros consecutivos de uma conta, a partir de `inicio`.
+    As colunas são views sem cópia, criadas a cada consulta para que o
+    segmento em si ocupe pouca memória.
+    """
+    __slots__ = ("arquivo", "inicio", "n")
+
+    def __init__(self, arquivo, inicio, n):
+        self.arquivo = arquivo
+        self.inicio = inicio
+        self.n = n
+
+    def coluna(self, campo, a=0, b=None):
+        """View da coluna `campo` (0 data, 1 valor, 2 saldo, 3 tipo/referência) em [a, b)."""
+        b = self.n if b is None else b
+        base = _PALAVRAS * self.inicio + campo
+        return self.arquivo._palavras[base + _PALAVRAS * a:base + _PALAVRAS * b:_PALAVRAS]
+
+    def valor(self, campo, i):
+        return self.arquivo._palavras[_PALAVRAS * (self.inicio + i) + campo]
+
+    def tipo_ref(self, i):
+        meta = self.valor(3, i)
+        texto = self.arquivo.texto
+        return texto(meta & 0xFFFFFFFF), texto(meta >> 32)
+
+
+class HistoricoFrio:
+    """
+    Parte arquivada do histórico de uma conta: segmentos em ordem de data,
+    vistos como uma sequência única de entradas.
+    """
+    def __init__(self, saldo_inicial):
+        self.saldo_inicial = saldo_inicial  # centavos, antes da primeira entrada
+        self._segmentos = []
+        self._inicios = []
+        self._n = 0
+
+    def __getstate__(self):
+        return {"saldo_inicial": self.saldo_inicial,
+                "segmentos": [(s.arquivo.caminho, s.inicio, s.n) for s in self._segmentos]}
+
+    def __setstate__(self, state):
+        self.__init__(state["saldo_inicial"])
+        for caminho, inicio, n in state["segmentos"]:
+            self.acrescentar(abrir(caminho).segmento(inicio, n))
+
+    def __len__(self):
+        return self._n
+
+    def acrescentar(self, segmento):
+        self._inicios.append(self._n)
+        self._segmentos.append(segmento)
+        self._n += segmento.n
+
+    @property
+    def ultimo_ts(self):
+        seg = self._segmentos[-1]
+        return seg.valor(0, seg.n - 1)
+
+    def _localizar(self, i):
+        k = bisect_right(self._inicios, i) - 1
+        return self._segmentos[k], i - self._inicios[k]
+
+    def get(self, i):
+        """(ts, cents, nome do tipo, referência) da entrada `i`."""
+        seg, j = self._localizar(i)
+        tipo, ref = seg.tipo_ref(j)
+        return seg.valor(0, j), seg.valor(1, j), tipo, ref
+
+    def saldo_ate(self, i):
+        if not i:
+            return self.saldo_inicial
+        seg, j = self._localizar(i - 1)
+        return seg.valor(2, j)
+
+    def bisect(self, funcao, ts):
+        """bisect_left/bisect_right sobre as datas de todos os segmentos."""
+        for inicio, seg in zip(self._inicios, self._segmentos):
+            ultimo = seg.valor(0, seg.n - 1)
+            if ultimo > ts or (ultimo == ts and funcao is bisect_left):
+                return inicio + funcao(seg.coluna(0), ts)
+        return self._n
+
+    def colunas(self, inicio, fim):
+        """Cópia das entradas [inicio, fim): (ts, cents, saldos, nomes de tipo, referências)."""
+        ts, cents, saldos, tipos, refs = array("q"), array("q"), array("q"), [], []
+        for base, seg in zip(self._inicios, self._segmentos):
+            a, b = max(inicio - base, 0), min(fim - base, seg.n)
+            if a >= b:
+                continue
+            ts.extend(seg.coluna(0, a, b))
+            cents.extend(seg.coluna(1, a, b))
+            saldos.extend(seg.coluna(2, a, b))
+            for j in range(a, b):
+                tipo, ref = seg.tipo_ref(j)
+                tipos.append(tipo)
+                refs.append(ref)
+        return ts, cents, saldos, tipos, refs
+
+
+class GravadorFrio:
+    """Grava um arquivo frio: blocos de contas com gravar(), depois fechar()."""
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._f = open(caminho, "wb")
+        self._f.write(b"\0" * _CABECALHO.size)
+        self._n = 0
+        self._textos = {}
+
+    def _indice(self, texto):
+        i = self._textos.get(texto)
+        if i is None:
+            # A tabela de textos é separada por NUL: outro tipo ou um NUL no
+            # texto deslocaria os índices de todos os textos seguintes.
+            if type(texto) is not str or "\0" in texto:
+                raise ValueError(f"Texto inválido para o arquivo frio: {texto!r}")
+            i = self._textos[texto] = len(self._textos)
+        return i
+
+    def gravar(self, ts, cents, saldos, tipos, refs):
+        """
+        Grava um bloco (colunas de mesmo tamanho, tipos por nome); retorna seu
+        início. Levanta ValueError se um tipo ou referência não for texto ou
+        contiver NUL.
+        """
+        n = len(ts)
+        registros = array("q", bytes(8 * _PALAVRAS * n))
+        registros[0::_PALAVRAS] = ts
+        registros[1::_PALAVRAS] = cents
+        registros[2::_PALAVRAS] = saldos
+        indice = self._indice
+        registros[3::_PALAVRAS] = array("q", (indice(t) | indice(r) << 32
+                                              for t, r in zip(tipos, refs)))
+        self._f.write(registros.tobytes())
+        inicio = self._n
+        self._n += n
+        return inicio
+
+    def fechar(self):
+        """Conclui o arquivo (com fsync) e o devolve aberto para leitura."""
+        blob = "\0".join(self._textos).encode("utf-8")
+        pos = self._f.tell()
+        self._f.write(blob)
+        self._f.seek(0)
+        self._f.write(_CABECALHO.pack(_MAGIC, self._n, pos, len(blob)))
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+        return abrir(self.caminho)
+
+    def descartar(self):
+        """Abandona um arquivo não concluído e o remove."""
+        self._f.close()
+        try:
+            os.remove(self.caminho)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,683 @@
+"""
+Backend SQLite para o Bank.
+
+SQLiteBank guarda contas e transações num arquivo SQLite local (modo WAL) e
+mantém em memória apenas as contas em uso, então a base pode ser maior que a
+RAM. Account, ContaCorrente e ContaPoupanca funcionam sem alteração: cada
+conta carregada recebe um SQLiteTransactionLog, que grava e consulta o
+histórico no banco, e usa como lock o lock de escrita do SQLiteBank, já que o
+SQLite admite um único escritor. Os lançamentos e saldos de uma operação são
+confirmados num único commit quando esse lock é liberado pela última vez.
+
+Leituras feitas fora de uma operação (buscas, between, page, balance_at,
+iteração) usam um pool pequeno de conexões somente leitura, em paralelo com
+a escrita. Todas as consultas são SQL fixo com parâmetros, reaproveitado pelo
+cache de statements preparados de cada conexão.
+"""
+import os
+import queue
+import sqlite3
+import threading
+import weakref
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import accumulate, islice
+from urllib.parse import quote
+
+from extratos import Extrato
+from metricas import medir
+from SistemaBancario import (AccountsView, Bank, ContaCorrente, ContaPoupanca, ResumoAgencia,
+                             TransactionLog, from_micros, recalcular_agregados, tipo_codigo,
+                             tipo_nome, to_micros)
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS contas (
+    id INTEGER PRIMARY KEY,
+    agencia TEXT NOT NULL,
+    conta TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    titular TEXT NOT NULL,
+    endereco TEXT NOT NULL,
+    saldo REAL NOT NULL,
+    saldo_inicial INTEGER NOT NULL,
+    p1 REAL NOT NULL,
+    p2 REAL NOT NULL,
+    exclusao INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (agencia, conta)
+);
+CREATE INDEX IF NOT EXISTS contas_exclusao ON contas (exclusao) WHERE exclusao > 0;
+CREATE TABLE IF NOT EXISTS tipos (
+    codigo INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS transacoes (
+    id INTEGER PRIMARY KEY,
+    conta_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    cents INTEGER NOT NULL,
+    tipo INTEGER NOT NULL,
+    ref TEXT NOT NULL,
+    saldo INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transacoes_conta_ts ON transacoes (conta_id, ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS contas_busca USING fts5 (
+    titular, conta, agencia, content='contas', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS contas_busca_inserir AFTER INSERT ON contas BEGIN
+    INSERT INTO contas_busca (rowid, titular, conta, agencia)
+    VALUES (new.id, new.titular, new.conta, new.agencia);
+END;
+CREATE TRIGGER IF NOT EXISTS contas_busca_excluir AFTER DELETE ON contas BEGIN
+    INSERT INTO contas_busca (contas_busca, rowid, titular, conta, agencia)
+    VALUES ('delete', old.id, old.titular, old.conta, old.agencia);
+END;
+"""
+
+_COLUNAS_CONTA = "id, agencia, conta, tipo, titular, endereco, saldo, saldo_inicial, p1, p2, exclusao"
+_SQL_CONTA = f"SELECT {_COLUNAS_CONTA} FROM contas WHERE agencia = ? AND conta = ?"
+_SQL_INSERIR_CONTA = ("INSERT INTO contas (agencia, conta, tipo, titular, endereco, saldo, "
+                      "saldo_inicial, p1, p2, exclusao) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+_SQL_SALDO = "UPDATE contas SET saldo = ? WHERE id = ?"
+_SQL_INSERIR_TRANSACAO = ("INSERT INTO transacoes (conta_id, ts, cents, tipo, ref, saldo) "
+                          "VALUES (?, ?, ?, ?, ?, ?)")
+_SQL_ULTIMA = ("SELECT ts, saldo FROM transacoes WHERE conta_id = ? "
+               "ORDER BY ts DESC, id DESC LIMIT 1")
+_SQL_SALDO_ATE = ("SELECT saldo FROM transacoes WHERE conta_id = ? AND ts <= ? "
+                  "ORDER BY ts DESC, id DESC LIMIT 1")
+_SQL_SALDO_FINAL = ("SELECT saldo FROM transacoes WHERE conta_id = ? "
+                    "ORDER BY ts DESC, id DESC LIMIT 1")
+_SQL_SALDO_ANTES = ("SELECT saldo FROM transacoes WHERE conta_id = ? AND ts < ? "
+                    "ORDER BY ts DESC, id DESC LIMIT 1")
+_SQL_AGREGADOS = ("SELECT agencia, tipo, COUNT(*), SUM(MAX(c, 0)), SUM(MAX(-c, 0)), SUM(c < 0), SUM(c) "
+                  "FROM (SELECT agencia, tipo, CAST(round(saldo * 100) AS INTEGER) AS c FROM contas) "
+                  "GROUP BY agencia, tipo")
+_SQL_BUSCA = (f"SELECT {_COLUNAS_CONTA} FROM contas WHERE id IN "
+              "(SELECT rowid FROM contas_busca WHERE contas_busca MATCH ? LIMIT ?) ORDER BY id")
+_SELECT_TRANSACOES = "SELECT ts, cents, tipo, ref FROM transacoes WHERE conta_id = ?"
+_ORDEM = " ORDER BY ts, id"
+
+_EVENTOS_SALDO = ("deposit", "withdraw", "aplicar_rendimento", "cobrar_taxa")
+
+
+class _LockEscrita:
+    """
+    RLock compartilhado pelas contas do SQLiteBank. Ao ser liberado pela
+    última vez, confirma a transação aberta na conexão de escrita.
+    """
+    def __init__(self, conn):
+        self._lock = threading.RLock()
+        self._conn = conn
+        self._nivel = 0
+        self._dono = None
+
+    def acquire(self, blocking=True, timeout=-1):
+        if not self._lock.acquire(blocking, timeout):
+            return False
+        self._nivel += 1
+        self._dono = threading.get_ident()
+        return True
+
+    def release(self):
+        try:
+            if self._nivel == 1 and self._conn.in_transaction:
+                self._conn.commit()
+        finally:
+            self._nivel -= 1
+            if not self._nivel:
+                self._dono = None
+            self._lock.release()
+
+    def segurado(self):
+        return self._dono == threading.get_ident()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class SQLiteTransactionLog(TransactionLog):
+    """
+    TransactionLog gravado na tabela `transacoes`. Cada linha guarda também
+    o saldo acumulado, então saldos por data saem de uma única busca no
+    índice (conta_id, ts). Posições seguem a ordem (data, inserção).
+    Extratos não passam pelo cache EXTRATOS: cada consulta lê o período do
+    banco.
+    """
+    def __init__(self, banco, conta_id, saldo_inicial):
+        self._banco = banco
+        self._conta_id = conta_id
+        self._saldo_inicial = saldo_inicial
+        self._ultima = None  # (ts, saldo) da última entrada, carregada sob demanda
+
+    def __getstate__(self):
+        raise TypeError("SQLiteTransactionLog não pode ser serializado.")
+
+    def _linhas(self, sql, params):
+        with self._banco._leitura() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def _escalar(self, sql, params, padrao=None):
+        with self._banco._leitura() as conn:
+            linha = conn.execute(sql, params).fetchone()
+        return padrao if linha is None else linha[0]
+
+    def _materializar(self, linhas):
+        local = self._banco._tipo_local
+        return [self._materialize(local(tipo), cents / 100, from_micros(ts), ref)
+                for ts, cents, tipo, ref in linhas]
+
+    def append_raw(self, ts, cents, codigo, ref):
+        banco = self._banco
+        with banco._escrita:
+            conn = banco._conn
+            if self._ultima is None:
+                linha = conn.execute(_SQL_ULTIMA, (self._conta_id,)).fetchone()
+                self._ultima = linha if linha is not None else (None, self._saldo_inicial)
+            ultimo_ts, ultimo_saldo = self._ultima
+            tipo = banco._tipo_db(codigo)
+            if ultimo_ts is None or ts >= ultimo_ts:
+                saldo = ultimo_saldo + cents
+                conn.execute(_SQL_INSERIR_TRANSACAO, (self._conta_id, ts, cents, tipo, ref, saldo))
+                self._ultima = (ts, saldo)
+            else:
+                # Fora de ordem: entra após as de mesmo timestamp e desloca
+                # o saldo acumulado das seguintes.
+                anterior = conn.execute(_SQL_SALDO_ATE, (self._conta_id, ts)).fetchone()
+                saldo = (anterior[0] if anterior else self._saldo_inicial) + cents
+                conn.execute(_SQL_INSERIR_TRANSACAO, (self._conta_id, ts, cents, tipo, ref, saldo))
+                conn.execute("UPDATE transacoes SET saldo = saldo + ? WHERE conta_id = ? AND ts > ?",
+                             (cents, self._conta_id, ts))
+                self._ultima = (ultimo_ts, ultimo_saldo + cents)
+
+    def extend_raw(self, ts, cents, codigos, refs):
+        """Acrescenta várias entradas; em ordem e após a última, num só executemany."""
+        banco = self._banco
+        with banco._escrita:
+            if self._ultima is None:
+                linha = banco._conn.execute(_SQL_ULTIMA, (self._conta_id,)).fetchone()
+                self._ultima = linha if linha is not None else (None, self._saldo_inicial)
+            ultimo_ts, saldo = self._ultima
+            ordenado = all(a <= b for a, b in zip(ts, ts[1:]))
+            if not ordenado or (ultimo_ts is not None and len(ts) and ts[0] < ultimo_ts):
+                for entrada in zip(ts, cents, codigos, refs):
+                    self.append_raw(*entrada)
+                return
+            if not len(ts):
+                return
+            saldos = list(accumulate(cents, initial=saldo))[1:]
+            tipos = [banco._tipo_db(c) for c in codigos]
+            banco._conn.executemany(_SQL_INSERIR_TRANSACAO, zip(
+                [self._conta_id] * len(ts), ts, cents, tipos, refs, saldos))
+            self._ultima = (ts[-1], saldos[-1])
+
+    @property
+    def saldo_inicial(self):
+        return self._saldo_inicial / 100
+
+    def columns(self, inicio=0, fim=None):
+        n = len(self)
+        inicio, fim, _ = slice(inicio, fim).indices(n)
+        linhas = self._linhas(_SELECT_TRANSACOES + _ORDEM + " LIMIT ? OFFSET ?",
+                              (self._conta_id, max(0, fim - inicio), inicio))
+        local = self._banco._tipo_local
+        return (array("q", (l[0] for l in linhas)), array("q", (l[1] for l in linhas)),
+                array("B", (local(l[2]) for l in linhas)), [l[3] for l in linhas])
+
+    def __len__(self):
+        return self._escalar("SELECT COUNT(*) FROM transacoes WHERE conta_id = ?",
+                             (self._conta_id,))
+
+    def __iter__(self):
+        # Paginação por chave (ts, id): memória constante e sem OFFSET.
+        ultimo = (-2 ** 63, -1)
+        while True:
+            linhas = self._linhas(
+                "SELECT ts, cents, tipo, ref, id FROM transacoes WHERE conta_id = ? "
+                "AND (ts, id) > (?, ?)" + _ORDEM + " LIMIT 1000", (self._conta_id,) + ultimo)
+            if not linhas:
+                return
+            ultimo = (linhas[-1][0], linhas[-1][4])
+            yield from self._materializar(l[:4] for l in linhas)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            inicio, fim, passo = i.indices(len(self))
+            if passo != 1:
+                return self[inicio:fim][::passo]
+            if fim <= inicio:
+                return []
+            return self._materializar(self._linhas(
+                _SELECT_TRANSACOES + _ORDEM + " LIMIT ? OFFSET ?",
+                (self._conta_id, fim - inicio, inicio)))
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("índice de transação fora do intervalo")
+        return self[i:i + 1][0]
+
+    def _get(self, i):
+        return self[i]
+
+    def index_range(self, start_date, end_date):
+        lo = self._escalar("SELECT COUNT(*) FROM transacoes WHERE conta_id = ? AND ts < ?",
+                           (self._conta_id, to_micros(start_date)))
+        if end_date is None:
+            return lo, len(self)
+        hi = self._escalar("SELECT COUNT(*) FROM transacoes WHERE conta_id = ? AND ts <= ?",
+                           (self._conta_id, to_micros(end_date)))
+        return lo, max(lo, hi)
+
+    def _saldo_ate(self, i):
+        if not i:
+            return self._saldo_inicial
+        return self._escalar("SELECT saldo FROM transacoes WHERE conta_id = ?" + _ORDEM
+                             + " LIMIT 1 OFFSET ?", (self._conta_id, i - 1))
+
+    def _saldos_periodo(self, start_date, end_date):
+        """(abertura, fechamento) do período em centavos."""
+        abertura = self._escalar(_SQL_SALDO_ANTES, (self._conta_id, to_micros(start_date)),
+                                 self._saldo_inicial)
+        if end_date is None:
+            fechamento = self._escalar(_SQL_SALDO_FINAL, (self._conta_id,), self._saldo_inicial)
+        elif end_date < start_date:
+            fechamento = abertura
+        else:
+            fechamento = self._escalar(_SQL_SALDO_ATE, (self._conta_id, to_micros(end_date)),
+                                       self._saldo_inicial)
+        return abertura, fechamento
+
+    def balance_at(self, data):
+        return self._escalar(_SQL_SALDO_ATE, (self._conta_id, to_micros(data)),
+                             self._saldo_inicial) / 100
+
+    def balance_range(self, start_date, end_date):
+        abertura, fechamento = self._saldos_periodo(start_date, end_date)
+        return abertura / 100, fechamento / 100
+
+    def between(self, start_date, end_date):
+        if end_date is None:
+            sql, params = " AND ts >= ?", (self._conta_id, to_micros(start_date))
+        else:
+            sql, params = " AND ts BETWEEN ? AND ?", (self._conta_id, to_micros(start_date),
+                                                      to_micros(end_date))
+        return self._materializar(self._linhas(_SELECT_TRANSACOES + sql + _ORDEM, params))
+
+    def page(self, numero, tamanho, start_date=None, end_date=None):
+        sql, params = "", [self._conta_id]
+        if start_date is not None:
+            sql += " AND ts >= ?"
+            params.append(to_micros(start_date))
+        if end_date is not None:
+            sql += " AND ts <= ?"
+            params.append(to_micros(end_date))
+        params += [tamanho, numero * tamanho]
+        return self._materializar(self._linhas(
+            _SELECT_TRANSACOES + sql + _ORDEM + " LIMIT ? OFFSET ?", params))
+
+    def extrato(self, start_date, end_date):
+        abertura, fechamento = self._saldos_periodo(start_date, end_date)
+        return Extrato(self.between(start_date, end_date), abertura, fechamento)
+
+
+class SQLiteAccountsView(AccountsView):
+    """Contas do SQLiteBank em ordem de cadastro, lidas do banco em blocos."""
+    __slots__ = ()
+
+    def __len__(self):
+        with self._bank._leitura() as conn:
+            return conn.execute("SELECT COUNT(*) FROM contas").fetchone()[0]
+
+    def __iter__(self):
+        ultimo = 0
+        while True:
+            contas = self._bank._carregar(f"SELECT {_COLUNAS_CONTA} FROM contas WHERE id > ? "
+                                          "ORDER BY id LIMIT 1000", (ultimo,))
+            if not contas:
+                return
+            ultimo = contas[-1].transactions._conta_id
+            yield from contas
+
+    def __contains__(self, account):
+        return self._bank.find_account(account.agencia, account.conta) is account
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            inicio, fim, passo = i.indices(len(self))
+            if fim <= inicio:
+                return []
+            return self._bank._carregar(f"SELECT {_COLUNAS_CONTA} FROM contas ORDER BY id "
+                                        "LIMIT ? OFFSET ?", (fim - inicio, inicio))[::passo]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("índice de conta fora do intervalo")
+        return self[i:i + 1][0]
+
+
+class _IndiceSQLite:
+    """Substitui o dicionário (agencia, conta) -> conta do Bank, carregando do banco."""
+    __slots__ = ("_bank",)
+
+    def __init__(self, bank):
+        self._bank = bank
+
+    def get(self, key, padrao=None):
+        acc = self._bank._vivas.get(key)
+        if acc is None:
+            acc = self._bank._buscar(key)
+        return padrao if acc is None else acc
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self._bank.accounts)
+
+
+class SQLiteBank(Bank):
+    """
+    Bank persistido em SQLite (arquivo `caminho`).
+
+    Contas carregadas ficam num dicionário de referências fracas (uma única
+    instância por conta enquanto estiver em uso) mais um LRU com as
+    `contas_em_memoria` mais recentes. A carga de contas é feita sob o lock
+    de escrita, para que nenhum commit ocorra entre a leitura da linha e o
+    registro da instância. Até `leitores` conexões somente leitura atendem
+    as demais consultas concorrentes.
+    """
+    def __init__(self, caminho, leitores=4, contas_em_memoria=10_000):
+        super().__init__()
+        self.caminho = caminho
+        self.contas_em_memoria = contas_em_memoria
+        self._conn = sqlite3.connect(caminho, check_same_thread=False, cached_statements=256)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        sem_busca = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'contas_busca'").fetchone() is None
+        self._conn.executescript(_ESQUEMA)
+        if sem_busca:
+            # Base criada antes do índice de busca: indexa as contas existentes.
+            with self._conn:
+                self._conn.execute("INSERT INTO contas_busca (contas_busca) VALUES ('rebuild')")
+        self._escrita = _LockEscrita(self._conn)
+        self._uri = "file:" + quote(os.path.abspath(caminho)) + "?mode=ro"
+        self._max_leitores = leitores
+        self._leitores = queue.LifoQueue()
+        self._abertas = []
+        self._carga = threading.RLock()
+        self._vivas = weakref.WeakValueDictionary()
+        self._recentes = OrderedDict()
+        self._tipos_db = {}
+        self._tipos_local = {}
+        self._carregar_tipos()
+        self._carregar_agregados()
+        self._index = _IndiceSQLite(self)
+        self.accounts = SQLiteAccountsView(self)
+
+    # --- conexões -----------------------------------------------------------
+
+    @contextmanager
+    def _leitura(self):
+        """Conexão para leitura: a de escrita dentro de uma operação, senão uma do pool."""
+        if self._escrita.segurado():
+            yield self._conn
+            return
+        try:
+            conn = self._leitores.get_nowait()
+        except queue.Empty:
+            with self._carga:
+                criar = len(self._abertas) < self._max_leitores
+                if criar:
+                    conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False,
+                                           cached_statements=256)
+                    self._abertas.append(conn)
+            if not criar:
+                conn = self._leitores.get()
+        try:
+            yield conn
+        finally:
+            self._leitores.put(conn)
+
+    def close(self):
+        with self._escrita:
+            if self._conn.in_transaction:
+                self._conn.commit()
+        for conn in self._abertas:
+            conn.close()
+        self._abertas = []
+        self._conn.close()
+
+    # --- tipos de transação -------------------------------------------------
+
+    def _carregar_tipos(self):
+        with self._carga:
+            for codigo, nome in self._conn.execute("SELECT codigo, nome FROM tipos"):
+                local = tipo_codigo(nome)
+                self._tipos_db[local] = codigo
+                self._tipos_local[codigo] = local
+
+    def _tipo_db(self, local):
+        """Código do tipo no banco (chamado com o lock de escrita)."""
+        codigo = self._tipos_db.get(local)
+        if codigo is None:
+            self._conn.execute("INSERT OR IGNORE INTO tipos (nome) VALUES (?)", (tipo_nome(local),))
+            codigo = self._conn.execute("SELECT codigo FROM tipos WHERE nome = ?",
+                                        (tipo_nome(local),)).fetchone()[0]
+            with self._carga:
+                self._tipos_db[local] = codigo
+                self._tipos_local[codigo] = local
+        return codigo
+
+    def _tipo_local(self, codigo):
+        local = self._tipos_local.get(codigo)
+        if local is None:
+            with self._leitura() as conn:
+                (nome,) = conn.execute("SELECT nome FROM tipos WHERE codigo = ?", (codigo,)).fetchone()
+            local = tipo_codigo(nome)
+            with self._carga:
+                self._tipos_db[local] = codigo
+                self._tipos_local[codigo] = local
+        return local
+
+    def _carregar_agregados(self):
+        """Agregados por agência das contas já gravadas, numa única consulta."""
+        for agencia, tipo, n, positivos, negativos, n_negativos, soma in self._conn.execute(_SQL_AGREGADOS):
+            resumo = self._agencias.get(agencia)
+            if resumo is None:
+                resumo = self._agencias[agencia] = ResumoAgencia()
+            resumo.contas += n
+            resumo.depositos += positivos
+            if tipo == "corrente":
+                resumo.correntes += n
+                resumo.cheque_especial += negativos
+                resumo.contas_cheque_especial += n_negativos
+            else:
+                resumo.poupancas += n
+                resumo.poupanca += soma
+
+    # --- carga de contas ----------------------------------------------------
+
+    def _conta(self, linha):
+        """Conta viva para a linha de `contas` (chamado com o lock de escrita)."""
+        (id_, agencia, conta, tipo, titular, endereco,
+         saldo, saldo_inicial, p1, p2, exclusao) = linha
+        key = (agencia, conta)
+        acc = self._vivas.get(key)
+        if acc is None:
+            if tipo == "corrente":
+                acc = ContaCorrente(agencia, conta, titular, endereco, saldo,
+                                    limite_cheque_especial=p1, taxa_manutencao=p2)
+            else:
+                acc = ContaPoupanca(agencia, conta, titular, endereco, saldo, rendimento_mensal=p1)
+            acc.transactions = SQLiteTransactionLog(self, id_, saldo_inicial)
+            acc._deletion_requested = bool(exclusao)
+            acc._bank = self
+            acc._lock = self._escrita
+            self._vivas[key] = acc
+        self._lembrar(key, acc)
+        return acc
+
+    def _lembrar(self, key, acc):
+        recentes = self._recentes
+        recentes[key] = acc
+        recentes.move_to_end(key)
+        while len(recentes) > self.contas_em_memoria:
+            recentes.popitem(last=False)
+
+    def _carregar(self, sql, params):
+        """Contas das linhas selecionadas por `sql`; as já vivas prevalecem."""
+        with self._escrita:
+            return [self._conta(l) for l in self._conn.execute(sql, params).fetchall()]
+
+    def _buscar(self, key):
+        with self._escrita:
+            acc = self._vivas.get(key)
+            if acc is not None:
+                return acc
+            linha = self._conn.execute(_SQL_CONTA, key).fetchone()
+            return None if linha is None else self._conta(linha)
+
+    @medir("buscar")
+    def buscar(self, texto, k=20):
+        """Busca por prefixo no índice FTS5 das contas; resultados na ordem de cadastro."""
+        termos = ['"' + t.replace('"', '""') + '"*' for t in texto.split()]
+        if not termos or k <= 0:
+            return []
+        return self._carregar(_SQL_BUSCA, (" ".join(termos), k))
+
+    # --- cadastro -----------------------------------------------------------
+
+    def add_account(self, account):
+        self.add_accounts((account,))
+
+    def add_accounts(self, accounts):
+        """
+        Cadastra contas (e o histórico que já tiverem) numa única transação.
+        Levanta ValueError na primeira duplicada; as anteriores permanecem.
+        """
+        with self._lock, self._escrita:
+            conn = self._conn
+            for account in accounts:
+                key = (account.agencia, account.conta)
+                log = account.transactions
+                if isinstance(account, ContaCorrente):
+                    tipo, p1, p2 = "corrente", account.limite_cheque_especial, account.taxa_manutencao
+                else:
+                    tipo, p1, p2 = "poupanca", account.rendimento_mensal, 0.0
+                saldo_inicial = round(log.saldo_inicial * 100)
+                try:
+                    cur = conn.execute(_SQL_INSERIR_CONTA, (
+                        account.agencia, account.conta, tipo, account.titular, account.endereco,
+                        account.saldo, saldo_inicial, p1, p2,
+                        to_micros(datetime.now()) if account.deletion_requested else 0))
+                except sqlite3.IntegrityError:
+                    raise ValueError("Conta já cadastrada para esta agência.") from None
+                novo = SQLiteTransactionLog(self, cur.lastrowid, saldo_inicial)
+                if len(log):
+                    novo.extend_raw(*log.columns())
+                account.transactions = novo
+                self._contar(account, 1)
+                account._bank = self
+                account._lock = self._escrita
+                self._vivas[key] = account
+                self._lembrar(key, account)
+                self._notify("add_account", account)
+
+    def _remover(self, account):
+        key = (account.agencia, account.conta)
+        if self._vivas.get(key) is not account:
+            return False
+        self._conn.execute("DELETE FROM transacoes WHERE conta_id = ?",
+                           (account.transactions._conta_id,))
+        self._conn.execute("DELETE FROM contas WHERE id = ?", (account.transactions._conta_id,))
+        self._vivas.pop(key, None)
+        self._recentes.pop(key, None)
+        account._bank = None
+        self._contar(account, -1)
+        self._notify("remove_account", account)
+        return True
+
+    # --- solicitações de exclusão -------------------------------------------
+
+    def _atualizar_pendente(self, account):
+        with self._escrita:
+            if self._vivas.get((account.agencia, account.conta)) is account:
+                marca = to_micros(datetime.now()) if account.deletion_requested else 0
+                self._conn.execute("UPDATE contas SET exclusao = ? WHERE id = ?",
+                                   (marca, account.transactions._conta_id))
+
+    def get_pending_deletion_requests(self):
+        return self._carregar(f"SELECT {_COLUNAS_CONTA} FROM contas WHERE exclusao > 0 "
+                              "ORDER BY exclusao", ())
+
+    def approve_deletion_requests(self, accounts=None):
+        with self._lock, self._escrita:
+            alvo = self.get_pending_deletion_requests() if accounts is None else accounts
+            return super().approve_deletion_requests(alvo)
+
+    def reject_deletion_requests(self, accounts=None):
+        with self._lock, self._escrita:
+            alvo = self.get_pending_deletion_requests() if accounts is None else list(accounts)
+            recusadas = [acc for acc in alvo
+                         if acc.deletion_requested and self._vivas.get((acc.agencia, acc.conta)) is acc]
+            for acc in recusadas:
+                acc._marcar_exclusao(False)
+            self._conn.executemany("UPDATE contas SET exclusao = 0 WHERE id = ?",
+                                   [(acc.transactions._conta_id,) for acc in recusadas])
+        return len(recusadas)
+
+    def verificar_agregados(self):
+        with self._lock, self._escrita:
+            return self._comparar_agregados(recalcular_agregados(self.accounts))
+
+    # --- escrita dos saldos -------------------------------------------------
+
+    @property
+    def _precisa_eventos(self):
+        # Os saldos são gravados em _notify, então os eventos nunca são pulados.
+        return True
+
+    def _notify(self, evento, account, *args):
+        # Chamado sob o lock de escrita, no fim de cada operação.
+        if evento in _EVENTOS_SALDO:
+            self._conn.execute(_SQL_SALDO, (account.saldo, account.transactions._conta_id))
+        elif evento == "transfer":
+            destino = args[0]
+            self._conn.executemany(_SQL_SALDO, ((account.saldo, account.transactions._conta_id),
+                                                (destino.saldo, destino.transactions._conta_id)))
+        elif evento == "update_address":
+            self._conn.execute("UPDATE contas SET endereco = ? WHERE id = ?",
+                               (account.endereco, account.transactions._conta_id))
+        super()._notify(evento, account, *args)
+
+    def arquivar(self, diretorio, horizonte):
+        """O histórico já fica em disco; não há o que arquivar."""
+        return 0
+
+    def month_end(self, data=None, bloco=10_000):
+        """
+        Fechamento mensal em blocos de `bloco` contas, com um commit por bloco,
+        de modo que a memória não dependa do número de contas.
+        """
+        data = data or datetime.now()
+        resumo = {"rendimentos": 0, "total_rendimentos": 0.0, "taxas": 0, "total_taxas": 0.0}
+        contas = iter(self.accounts)
+        with self._lock, self._escrita:
+            while True:
+                lote = list(islice(contas, bloco))
+                if not lote:
+                    break
+                # Os saldos alterados são gravados pelos eventos do fechamento.
+                parcial = self._fechar_mes(lote, data)
+                self._conn.commit()
+                for chave, valor in parcial.items():
+                    resumo[chave] += valor
+        return resumo
@@ -0,0 +1,1136 @@
+"""
+Benchmarks do núcleo bancário (sem tkinter).
+
+Uso:
+    python benchmark.py suite [--escala 100000] [--transacoes 20] [--saida res.json]
+    python benchmark.py comparar base.json novo.json [--tolerancia 0.10]
+    python benchmark.py memoria [-n 1000000]
+    python benchmark.py journal [--threads 8] [--ops 20000] [--tail 100000]
+    python benchmark.py concorrencia [--threads 8] [--contas 100] [--ops 200000]
+    python benchmark.py lote [--contas 10000] [--ops 50000]
+    python benchmark.py mensal [--contas 1000000]
+    python benchmark.py particoes [--shards 4] [--agencias 16] [--ops 400000]
+    python benchmark.py metricas [-n 200000]
+    python benchmark.py importacao [--contas 100000] [--transacoes 20]
+    python benchmark.py extratos [--contas 1000] [--transacoes 500] [--consultas 20000]
+    python benchmark.py exclusoes [--contas 1000000] [--pendentes 10000]
+    python benchmark.py sqlite [--contas 100000] [--transacoes 20] [--amostras 20000]
+    python benchmark.py arquivo [--contas 20000] [--transacoes 100] [--dias-recentes 30]
+    python benchmark.py agregados [--contas 100000] [--threads 8] [--ops 200000]
+    python benchmark.py cli [--contas 10000] [--ops 200000]
+    python benchmark.py busca [--contas 1000000] [--consultas 2000] [--k 20]
+    python benchmark.py servico [--contas 10000] [--requisicoes 100000] [--conexoes 8]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from SistemaBancario import (Bank, ContaCorrente, ContaPoupanca, TransactionLog,
+                             _calcular_mes, _numpy, recalcular_agregados)
+import arquivo_frio
+import importacao
+from banco_sqlite import SQLiteBank
+from busca import IndiceBusca, _casa, normalizar
+from cliente_servico import ClienteServico, gerar_carga
+from carga import _NOMES, _SOBRENOMES, agencia_de, gerar_banco
+from extratos import EXTRATOS
+from metricas import METRICAS
+from particoes import ShardedBank
+from persistencia import Persistencia
+
+
+def _estatisticas(amostras_ns):
+    amostras_ns = sorted(amostras_ns)
+    n = len(amostras_ns)
+    total = sum(amostras_ns)
+    return {
+        "n": n,
+        "ops_por_segundo": n / (total / 1e9) if total else None,
+        "media_us": total / n / 1000,
+        "p50_us": amostras_ns[n // 2] / 1000,
+        "p99_us": amostras_ns[min(n - 1, int(n * 0.99))] / 1000,
+    }
+
+
+def _cronometrar(fn, argumentos):
+    """Chama fn(*args) para cada item de `argumentos` e retorna os tempos em ns."""
+    relogio = time.perf_counter_ns
+    tempos = []
+    for args in argumentos:
+        t0 = relogio()
+        try:
+            fn(*args)
+        except ValueError:
+            pass
+        tempos.append(relogio() - t0)
+    return tempos
+
+
+def _metadados():
+    try:
+        revisao = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                 cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        revisao = ""
+    return {
+        "revisao": revisao or None,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def bench_suite(escala, transacoes, agencias=100, amostras=20_000, medir_memoria=True, seed=0):
+    """
+    Mede as operações principais sobre uma população sintética de `escala`
+    contas com `transacoes` entradas de histórico cada.
+    """
+    rnd = random.Random(seed)
+    resultado = {"benchmark": "suite", "escala": escala, "transacoes_por_conta": transacoes,
+                 "metadados": _metadados()}
+
+    if medir_memoria:
+        gc.collect()
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    bank = gerar_banco(escala, transacoes, agencias=agencias, seed=seed)
+    resultado["geracao_s"] = time.perf_counter() - t0
+    if medir_memoria:
+        atual, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resultado["memoria_bytes"] = atual
+        resultado["memoria_bytes_por_conta"] = atual / escala
+
+    def chave():
+        i = rnd.randrange(escala)
+        return agencia_de(i, agencias), str(i)
+
+    resultado["find_account"] = _estatisticas(
+        _cronometrar(bank.find_account, [chave() for _ in range(amostras)]))
+
+    pares = []
+    for _ in range(amostras):
+        pares.append((bank.find_account(*chave()), bank.find_account(*chave()),
+                      float(rnd.randint(1, 100))))
+    resultado["transfer"] = _estatisticas(
+        _cronometrar(lambda a, b, v: a.transfer(b, v), pares))
+
+    fim = datetime(2025, 1, 1)
+    periodos = []
+    for _ in range(min(amostras, 5_000)):
+        inicio = fim - timedelta(days=rnd.randint(1, 365))
+        periodos.append((bank.find_account(*chave()), inicio, inicio + timedelta(days=30)))
+    resultado["get_extrato"] = _estatisticas(
+        _cronometrar(lambda acc, a, b: acc.get_extrato(a, b), periodos))
+
+    for _ in range(max(1, escala // 1000)):
+        bank.find_account(*chave()).deletion_requested = True
+    resultado["get_pending_deletion_requests"] = _estatisticas(
+        _cronometrar(bank.get_pending_deletion_requests, [()] * 10))
+
+    poupancas = [acc for acc in bank.accounts if isinstance(acc, ContaPoupanca)][:amostras]
+    resultado["aplicar_rendimento"] = _estatisticas(
+        _cronometrar(lambda acc: acc.aplicar_rendimento(), [(acc,) for acc in poupancas]))
+    return resultado
+
+
+def comparar(base, novo, tolerancia):
+    """Compara ops_por_segundo de dois resultados da suite; lista regressões."""
+    linhas, regressoes = [], []
+    for nome, medida in novo.items():
+        if not isinstance(medida, dict) or "ops_por_segundo" not in medida:
+            continue
+        anterior = base.get(nome, {}).get("ops_por_segundo")
+        if not anterior or not medida["ops_por_segundo"]:
+            continue
+        razao = medida["ops_por_segundo"] / anterior
+        linhas.append({"operacao": nome, "base": anterior, "novo": medida["ops_por_segundo"],
+                       "razao": razao})
+        if razao < 1 - tolerancia:
+            regressoes.append(nome)
+    return {"benchmark": "comparar", "operacoes": linhas, "regressoes": regressoes}
+
+
+class _TransacaoLegada:
+    """Layout anterior: um objeto com __dict__ por transação e info formatada."""
+    def __init__(self, tipo, valor, data, info=""):
+        self.tipo = tipo
+        self.valor = valor
+        self.data = data
+        self.info = info
+
+
+def _medir_memoria(construir):
+    gc.collect()
+    tracemalloc.start()
+    obj = construir()
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return atual
+
+
+def bench_memoria(n):
+    inicio = datetime(2024, 1, 1)
+    passo = timedelta(seconds=1)
+
+    def legado():
+        itens = []
+        for i in range(n):
+            itens.append(_TransacaoLegada("Transferência - Enviada", -10.0 - i % 100,
+                                          inicio + i * passo, f"Para conta {i % 5000}"))
+        return itens
+
+    def compacto():
+        log = TransactionLog()
+        contas = [str(c) for c in range(5000)]
+        for i in range(n):
+            log.record("Transferência - Enviada", -10.0 - i % 100,
+                       inicio + i * passo, contas[i % 5000])
+        return log
+
+    bytes_legado = _medir_memoria(legado)
+    bytes_compacto = _medir_memoria(compacto)
+    return {
+        "benchmark": "memoria",
+        "n": n,
+        "legado_bytes": bytes_legado,
+        "compacto_bytes": bytes_compacto,
+        "legado_bytes_por_entrada": bytes_legado / n,
+        "compacto_bytes_por_entrada": bytes_compacto / n,
+        "reducao": bytes_legado / bytes_compacto,
+    }
+
+
+def bench_journal(threads, ops, tail):
+    """Vazão de commits síncronos com N threads e tempo de recuperação."""
+    with tempfile.TemporaryDirectory() as diretorio:
+        p = Persistencia(diretorio, snapshot_every=10**12)
+        bank = p.open()
+        contas = [ContaCorrente("0001", str(i), f"Cliente {i}", "Rua A") for i in range(threads)]
+        for acc in contas:
+            bank.add_account(acc)
+        por_thread = ops // threads
+
+        def trabalhar(acc):
+            for _ in range(por_thread):
+                acc.deposit(1.0)
+
+        ts = [threading.Thread(target=trabalhar, args=(acc,)) for acc in contas]
+        t0 = time.perf_counter()
+        for t in ts:
+            t.start()
+        for t in ts:
+            t.join()
+        duracao = time.perf_counter() - t0
+        commits = p._journal.commits
+        p.snapshot()
+        p.close()
+        # Cauda do journal após o snapshot, sem esperar fsync por operação.
+        p = Persistencia(diretorio, snapshot_every=10**12, sync_commit=False)
+        bank = p.open()
+        acc = bank.find_account("0001", "0")
+        for _ in range(tail):
+            acc.deposit(1.0)
+        p.close()
+        tamanho = sum(os.path.getsize(os.path.join(diretorio, n)) for n in os.listdir(diretorio))
+        t0 = time.perf_counter()
+        p = Persistencia(diretorio)
+        p.open()
+        recuperacao = time.perf_counter() - t0
+        p.close()
+    total = por_thread * threads
+    return {
+        "benchmark": "journal",
+        "threads": threads,
+        "ops": total,
+        "commits_por_segundo": total / duracao,
+        "fsyncs": commits,
+        "registros_por_fsync": total / max(commits, 1),
+        "cauda_registros": tail,
+        "bytes_em_disco": tamanho,
+        "recuperacao_s": recuperacao,
+    }
+
+
+def bench_concorrencia(threads, contas, ops, seed=0, limite_s=300):
+    """
+    Teste de estresse: transferências aleatórias entre contas a partir de
+    várias threads. Verifica que a soma dos saldos se conserva, que nenhum
+    limite foi ultrapassado, que nenhuma thread falhou com exceção inesperada
+    e que todas terminaram dentro de `limite_s` (uma espera maior indica
+    deadlock na ordem dos locks).
+    """
+    bank = Bank()
+    for i in range(contas):
+        if i % 2:
+            bank.add_account(ContaPoupanca("0001", str(i), f"Cliente {i}", "Rua A", 100.0))
+        else:
+            bank.add_account(ContaCorrente("0001", str(i), f"Cliente {i}", "Rua A", 100.0,
+                                           limite_cheque_especial=50.0))
+    total_inicial = sum(acc.saldo for acc in bank.accounts)
+    rejeitadas = [0] * threads
+    erros = []
+    por_thread = ops // threads
+
+    def trabalhar(n):
+        rnd = random.Random(seed + n)
+        try:
+            for _ in range(por_thread):
+                a, b = rnd.randrange(contas), rnd.randrange(contas)
+                if a == b:
+                    continue
+                try:
+                    bank.transfer("0001", str(a), "0001", str(b), float(rnd.randint(1, 80)))
+                except ValueError:
+                    rejeitadas[n] += 1
+        except Exception as e:
+            erros.append(repr(e))
+
+    # daemon: threads presas num deadlock não impedem o processo de sair.
+    ts = [threading.Thread(target=trabalhar, args=(n,), daemon=True) for n in range(threads)]
+    t0 = time.perf_counter()
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join(max(0.0, limite_s - (time.perf_counter() - t0)))
+    travadas = sum(t.is_alive() for t in ts)
+    duracao = time.perf_counter() - t0
+    total_final = sum(acc.saldo for acc in bank.accounts)
+    violacoes = [acc.conta for acc in bank.accounts
+                 if acc.saldo < (-acc.limite_cheque_especial if isinstance(acc, ContaCorrente) else 0)]
+    return {
+        "benchmark": "concorrencia",
+        "threads": threads,
+        "contas": contas,
+        "ops": por_thread * threads,
+        "ops_por_segundo": por_thread * threads / duracao,
+        "rejeitadas": sum(rejeitadas),
+        "saldo_total_inicial": total_inicial,
+        "saldo_total_final": total_final,
+        "conservado": abs(total_final - total_inicial) < 1e-6,
+        "violacoes_de_limite": violacoes,
+        "erros": erros,
+        "threads_travadas": travadas,
+    }
+
+
+def _banco_lote(contas):
+    bank = Bank()
+    for i in range(contas):
+        bank.add_account(ContaCorrente("0001", str(i), f"Cliente {i}", "Rua A", 1000.0))
+    return bank
+
+
+def bench_lote(contas, ops, seed=0):
+    """Lote de depósitos, saques e transferências: chamadas individuais x apply_batch."""
+    rnd = random.Random(seed)
+    lote = []
+    for _ in range(ops):
+        a, b = str(rnd.randrange(contas)), str(rnd.randrange(contas))
+        r = rnd.random()
+        if r < 0.4:
+            lote.append(("deposit", "0001", a, 10.0, "Folha"))
+        elif r < 0.6:
+            lote.append(("withdraw", "0001", a, 5.0))
+        else:
+            lote.append(("transfer", "0001", a, "0001", b, 7.5))
+
+    bank = _banco_lote(contas)
+    t0 = time.perf_counter()
+    for op in lote:
+        if op[0] == "deposit":
+            bank.find_account(op[1], op[2]).deposit(op[3], op[4])
+        elif op[0] == "withdraw":
+            bank.find_account(op[1], op[2]).withdraw(op[3])
+        else:
+            bank.find_account(op[1], op[2]).transfer(bank.find_account(op[3], op[4]), op[5])
+    individual = time.perf_counter() - t0
+
+    bank = _banco_lote(contas)
+    t0 = time.perf_counter()
+    bank.apply_batch(lote)
+    em_lote = time.perf_counter() - t0
+    return {
+        "benchmark": "lote",
+        "contas": contas,
+        "ops": ops,
+        "individual_ops_por_segundo": ops / individual,
+        "lote_ops_por_segundo": ops / em_lote,
+        "ganho": individual / em_lote,
+    }
+
+
+def bench_mensal(contas):
+    """Fechamento mensal (rendimentos e taxas) sobre `contas` contas."""
+    bank = Bank()
+    for i in range(contas):
+        if i % 2:
+            bank.add_account(ContaPoupanca("0001", str(i), "Cliente", "Rua A", 100.0 + i % 1000))
+        else:
+            bank.add_account(ContaCorrente("0001", str(i), "Cliente", "Rua A", 100.0 + i % 1000))
+    inicial = sum(acc.saldo for acc in bank.accounts)
+    poupancas = [acc for acc in bank.accounts if isinstance(acc, ContaPoupanca)]
+    correntes = [acc for acc in bank.accounts if isinstance(acc, ContaCorrente)]
+    _numpy()
+    t0 = time.perf_counter()
+    _calcular_mes(poupancas, correntes)
+    calculo = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    resumo = bank.month_end()
+    duracao = time.perf_counter() - t0
+    final = sum(acc.saldo for acc in bank.accounts)
+    esperado = inicial + resumo["total_rendimentos"] - resumo["total_taxas"]
+    return {
+        "benchmark": "mensal",
+        "contas": contas,
+        "numpy": _numpy() is not None,
+        "calculo_s": calculo,
+        "duracao_s": duracao,
+        "contas_por_segundo": contas / duracao,
+        "resumo": resumo,
+        "consistente": abs(final - esperado) < 1e-3,
+    }
+
+
+def bench_particoes(shards, agencias, ops, contas_por_agencia=100, lote=20_000, seed=0):
+    """
+    Vazão de transferências dentro da mesma agência com 1 e com `shards`
+    partições, mais uma rodada com transferências entre agências para
+    verificar a conservação do saldo total.
+    """
+    rnd = random.Random(seed)
+    nomes = [f"{a:04d}" for a in range(agencias)]
+    intra = []
+    for _ in range(ops):
+        ag = rnd.choice(nomes)
+        intra.append(("transfer", ag, str(rnd.randrange(contas_por_agencia)),
+                      ag, str(rnd.randrange(contas_por_agencia)), 1.0))
+    cruzadas = [("transfer", rnd.choice(nomes), str(rnd.randrange(contas_por_agencia)),
+                 rnd.choice(nomes), str(rnd.randrange(contas_por_agencia)), 1.0)
+                for _ in range(ops // 100)]
+
+    resultado = {"benchmark": "particoes", "agencias": agencias, "ops": ops}
+    for n in sorted({1, shards}):
+        bank = ShardedBank(n)
+        try:
+            for ag in nomes:
+                for c in range(contas_por_agencia):
+                    bank.add_account(ContaCorrente(ag, str(c), "Cliente", "Rua A", 1000.0))
+            inicial = bank.total()
+            t0 = time.perf_counter()
+            for i in range(0, ops, lote):
+                bank.apply_batch(intra[i:i + lote])
+            duracao = time.perf_counter() - t0
+            bank.apply_batch(cruzadas)
+            final = bank.total()
+        finally:
+            bank.close()
+        resultado[f"shards_{n}_ops_por_segundo"] = ops / duracao
+        resultado[f"shards_{n}_conservado"] = abs(final[0] - inicial[0]) < 1e-6
+    return resultado
+
+
+# Custo adicional aceito por chamada com a instrumentação ligada, em ns.
+# Desligada, os métodos originais são usados diretamente (custo zero).
+ORCAMENTO_LIGADO_NS = 1500
+
+
+def bench_metricas(n):
+    """Custo da instrumentação por chamada: desligada (sem wrapper) x ligada."""
+    bank = Bank()
+    acc = ContaCorrente("0001", "1", "Cliente", "Rua A")
+    bank.add_account(acc)
+    novas = iter(range(2, 10 ** 9))
+
+    def conta_nova():
+        # Cada rodada de depósitos começa num histórico vazio, para que o
+        # crescimento do histórico não pese mais num modo que no outro.
+        nova = ContaCorrente("0001", str(next(novas)), "Cliente", "Rua A")
+        bank.add_account(nova)
+        return nova
+
+    casos = {
+        "find_account": lambda: (Bank.find_account, (bank, "0001", "1")),
+        "deposit": lambda: (ContaCorrente.deposit, (conta_nova(), 1.0)),
+    }
+    relogio = time.perf_counter_ns
+    resultado = {"benchmark": "metricas", "n": n,
+                 "orcamento_ligada_ns": ORCAMENTO_LIGADO_NS}
+    ativo_antes = METRICAS.ativo
+    gc_antes = gc.isenabled()
+    try:
+        # Sem coletas do gc no meio das rodadas: elas caem em rodadas
+        # aleatórias e dominam a diferença entre os modos.
+        gc.disable()
+        for nome, caso in casos.items():
+            tempos = {}
+            # Melhor de 25 rodadas curtas por modo, alternadas, para reduzir
+            # o ruído de outras cargas da máquina.
+            rodada = max(1, n // 50)
+            for modo in ("desligada", "ligada") * 25:
+                METRICAS.ativo = modo == "ligada"
+                fn, args = caso()
+                t0 = relogio()
+                for _ in range(rodada):
+                    fn(*args)
+                tempo = (relogio() - t0) / rodada
+                tempos[modo] = min(tempos.get(modo, tempo), tempo)
+                gc.collect()
+            extra = tempos["ligada"] - tempos["desligada"]
+            resultado[nome] = {
+                "ns_por_chamada": tempos,
+                "custo_ligada_ns": extra,
+                "dentro_do_orcamento": extra <= ORCAMENTO_LIGADO_NS,
+            }
+    finally:
+        if gc_antes:
+            gc.enable()
+        METRICAS.ativo = ativo_antes
+        METRICAS.reset()
+    return resultado
+
+
+def bench_importacao(contas, transacoes):
+    """Vazão (linhas/s) de exportação e importação em CSV e no formato binário."""
+    bank = gerar_banco(contas, transacoes)
+    linhas = contas + sum(len(acc.transactions) for acc in bank.accounts)
+    resultado = {"benchmark": "importacao", "contas": contas, "linhas": linhas}
+    with tempfile.TemporaryDirectory() as d:
+        arq_contas, arq_trans = os.path.join(d, "contas.csv"), os.path.join(d, "transacoes.csv")
+        arq_bin = os.path.join(d, "banco.bin")
+
+        t0 = time.perf_counter()
+        importacao.exportar_contas_csv(bank, arq_contas)
+        importacao.exportar_transacoes_csv(bank, arq_trans)
+        resultado["csv_exportar_linhas_por_segundo"] = linhas / (time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        novo = Bank()
+        importacao.importar_contas_csv(novo, arq_contas)
+        importacao.importar_transacoes_csv(novo, arq_trans)
+        resultado["csv_importar_linhas_por_segundo"] = linhas / (time.perf_counter() - t0)
+        resultado["csv_bytes"] = os.path.getsize(arq_contas) + os.path.getsize(arq_trans)
+
+        t0 = time.perf_counter()
+        importacao.exportar_binario(bank, arq_bin)
+        resultado["binario_exportar_linhas_por_segundo"] = linhas / (time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        importacao.importar_binario(Bank(), arq_bin)
+        resultado["binario_importar_linhas_por_segundo"] = linhas / (time.perf_counter() - t0)
+        resultado["binario_bytes"] = os.path.getsize(arq_bin)
+    return resultado
+
+
+def bench_extratos(contas, transacoes, consultas, seed=0):
+    """
+    Extrato do mês corrente (período aberto) consultado repetidamente em um
+    conjunto de contas ativas, intercalado com depósitos: sem cache x com cache.
+    """
+    fim = datetime(2025, 1, 1)
+    inicio_mes = fim - timedelta(days=30)
+
+    def rodar():
+        bank = gerar_banco(contas, transacoes, fim=fim, seed=seed)
+        rnd = random.Random(seed)
+        ativas = bank.accounts[:max(1, contas // 10)]
+        data = fim
+        t0 = time.perf_counter()
+        for _ in range(consultas):
+            acc = rnd.choice(ativas)
+            if rnd.random() < 0.2:
+                data += timedelta(seconds=1)
+                acc.deposit(10.0, "Caixa", data)
+            acc.get_extrato_texto(inicio_mes)
+        return bank, time.perf_counter() - t0
+
+    max_entradas = EXTRATOS.max_entradas
+    EXTRATOS.limpar()
+    EXTRATOS.max_entradas = 0
+    try:
+        _, sem_cache = rodar()
+    finally:
+        EXTRATOS.max_entradas = max_entradas
+    EXTRATOS.limpar()
+    bank, com_cache = rodar()
+    stats = EXTRATOS.estatisticas()
+    consistente = all(
+        acc.get_extrato_texto(inicio_mes) == "\n".join(
+            str(t) for t in acc.transactions.between(inicio_mes, datetime.max))
+        for acc in bank.accounts[:max(1, contas // 10)])
+    return {
+        "benchmark": "extratos",
+        "contas": contas,
+        "transacoes_por_conta": transacoes,
+        "consultas": consultas,
+        "sem_cache_consultas_por_segundo": consultas / sem_cache,
+        "com_cache_consultas_por_segundo": consultas / com_cache,
+        "ganho": sem_cache / com_cache,
+        "cache": stats,
+        "consistente": consistente,
+    }
+
+
+def bench_exclusoes(contas, pendentes, seed=0):
+    """Fila de solicitações de exclusão: consulta, aprovação e recusa em massa."""
+    bank = gerar_banco(contas, 0, seed=seed)
+    rnd = random.Random(seed)
+    marcar = rnd.sample(range(contas), 2 * pendentes)
+    for i in marcar:
+        bank.find_account(agencia_de(i, 100), str(i)).deletion_requested = True
+    resultado = {"benchmark": "exclusoes", "contas": contas, "pendentes": 2 * pendentes}
+
+    t0 = time.perf_counter()
+    fila = bank.get_pending_deletion_requests()
+    resultado["consulta_ms"] = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    recusadas = bank.reject_deletion_requests(fila[:pendentes])
+    resultado["recusa_em_massa_ms"] = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    aprovadas = bank.approve_deletion_requests()
+    resultado["aprovacao_em_massa_ms"] = (time.perf_counter() - t0) * 1000
+
+    removidas = [bank.find_account(agencia_de(i, 100), str(i)) for i in rnd.sample(range(contas), 1000)]
+    removidas = [acc for acc in removidas if acc is not None]
+    t0 = time.perf_counter()
+    for acc in removidas:
+        bank.remove_account(acc)
+    resultado["remove_account_us"] = (time.perf_counter() - t0) / len(removidas) * 1e6
+    resultado["consistente"] = (recusadas == pendentes and aprovadas == pendentes
+                                and not bank.get_pending_deletion_requests()
+                                and len(bank.accounts) == contas - pendentes - len(removidas)
+                                and sum(1 for _ in bank.accounts) == len(bank.accounts))
+    return resultado
+
+
+def bench_sqlite(contas, transacoes, amostras, leitores=4, seed=0):
+    """Backend SQLite x Bank em memória: carga, buscas, operações, extratos e leitura concorrente."""
+    fim = datetime(2025, 1, 1)
+    rnd = random.Random(seed)
+    chaves = [(agencia_de(i, 100), str(i)) for i in (rnd.randrange(contas) for _ in range(amostras))]
+    periodos = [(fim - timedelta(days=rnd.randint(30, 365)), timedelta(days=30)) for _ in range(amostras)]
+    resultado = {"benchmark": "sqlite", "contas": contas, "transacoes_por_conta": transacoes}
+
+    def medir(nome, bank):
+        r = {}
+        r["find_account"] = _estatisticas(_cronometrar(bank.find_account, chaves))
+        r["deposit"] = _estatisticas(_cronometrar(
+            lambda ag, ct: bank.deposit(ag, ct, 10.0, "Caixa"), chaves))
+        pares = list(zip(chaves, reversed(chaves)))
+        r["transfer"] = _estatisticas(_cronometrar(
+            lambda a, b: bank.transfer(a[0], a[1], b[0], b[1], 1.0), pares))
+        extratos = [(bank.find_account(*k), a, a + dur) for k, (a, dur) in zip(chaves, periodos)]
+        r["get_extrato"] = _estatisticas(_cronometrar(
+            lambda acc, a, b: acc.transactions.between(a, b), extratos[:5_000]))
+
+        def ler(parte):
+            for acc, a, b in parte:
+                acc.transactions.balance_range(a, b)
+        t0 = time.perf_counter()
+        ts = [threading.Thread(target=ler, args=(extratos[k::leitores],)) for k in range(leitores)]
+        for t in ts:
+            t.start()
+        for t in ts:
+            t.join()
+        r["leitura_concorrente_ops_por_segundo"] = len(extratos) / (time.perf_counter() - t0)
+        resultado[nome] = r
+
+    t0 = time.perf_counter()
+    memoria = gerar_banco(contas, transacoes, fim=fim, seed=seed)
+    resultado["memoria_carga_s"] = time.perf_counter() - t0
+    medir("memoria", memoria)
+    with tempfile.TemporaryDirectory() as d:
+        caminho = os.path.join(d, "banco.db")
+        origem = gerar_banco(contas, transacoes, fim=fim, seed=seed)
+        bank = SQLiteBank(caminho, leitores=leitores)
+        t0 = time.perf_counter()
+        bank.add_accounts(origem.accounts)
+        resultado["sqlite_carga_s"] = time.perf_counter() - t0
+        del origem
+        medir("sqlite", bank)
+        bank.close()
+        resultado["sqlite_bytes"] = sum(os.path.getsize(os.path.join(d, f)) for f in os.listdir(d))
+    return resultado
+
+
+def bench_arquivo(contas, transacoes, dias_recentes, amostras=5_000, seed=0):
+    """Memória residente e latência de extrato antes e depois de arquivar o histórico antigo."""
+    fim = datetime(2025, 1, 1)
+    horizonte = fim - timedelta(days=dias_recentes)
+    rnd = random.Random(seed)
+    gc.collect()
+    tracemalloc.start()
+    bank = gerar_banco(contas, transacoes, dias=730, fim=fim, seed=seed)
+    antes, _ = tracemalloc.get_traced_memory()
+    with tempfile.TemporaryDirectory() as d:
+        t0 = time.perf_counter()
+        arquivadas = bank.arquivar(d, horizonte)
+        duracao = time.perf_counter() - t0
+        gc.collect()
+        depois, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        amostra = [bank.accounts[rnd.randrange(contas)] for _ in range(amostras)]
+        recentes = [(acc, horizonte, None) for acc in amostra]
+        antigos = []
+        for acc in amostra:
+            inicio = fim - timedelta(days=rnd.randint(60, 700))
+            antigos.append((acc, inicio, inicio + timedelta(days=30)))
+        extrato = lambda acc, a, b: acc.transactions.between(a, b)
+        resultado = {
+            "benchmark": "arquivo",
+            "contas": contas,
+            "transacoes": contas * transacoes,
+            "arquivadas": arquivadas,
+            "arquivar_s": duracao,
+            "memoria_antes_bytes": antes,
+            "memoria_depois_bytes": depois,
+            "arquivo_bytes": sum(os.path.getsize(os.path.join(d, f)) for f in os.listdir(d)),
+            "extrato_recente": _estatisticas(_cronometrar(extrato, recentes)),
+            "extrato_arquivado": _estatisticas(_cronometrar(extrato, antigos)),
+        }
+        del bank, amostra, recentes, antigos, acc
+        gc.collect()
+        # Sem contas que o referenciem, o arquivo não pode continuar mapeado.
+        resultado["mapeamentos_abertos"] = len(arquivo_frio._abertos)
+    return resultado
+
+
+def bench_agregados(contas, threads, ops, amostras=20_000, seed=0):
+    """
+    Agregados por agência: consulta mantida x recálculo completo, e
+    verificação de consistência após operações concorrentes (depósitos,
+    saques, transferências, lotes, cadastro e remoção de contas e fechamento
+    mensal), no Bank em memória e no SQLiteBank.
+    """
+    rnd = random.Random(seed)
+    bank = gerar_banco(contas, 0, seed=seed)
+    agencias = [agencia_de(i, 100) for i in (rnd.randrange(contas) for _ in range(amostras))]
+    resultado = {"benchmark": "agregados", "contas": contas, "threads": threads, "ops": ops}
+    resultado["agregados"] = _estatisticas(_cronometrar(bank.agregados, [(a,) for a in agencias]))
+    t0 = time.perf_counter()
+    recalcular_agregados(bank.accounts)
+    resultado["recalculo_completo_ms"] = (time.perf_counter() - t0) * 1000
+
+    erros = []
+
+    def estressar(bank, contas, ops):
+        por_thread = ops // threads
+
+        def trabalhar(n):
+            try:
+                operar(n)
+            except Exception as e:
+                erros.append(repr(e))
+
+        def operar(n):
+            rnd = random.Random(seed + n)
+            for k in range(por_thread):
+                i, j = rnd.randrange(contas), rnd.randrange(contas)
+                a, b = (agencia_de(i, 100), str(i)), (agencia_de(j, 100), str(j))
+                r = rnd.random()
+                try:
+                    if r < 0.3:
+                        bank.deposit(*a, float(rnd.randint(1, 500)))
+                    elif r < 0.6:
+                        bank.withdraw(*a, float(rnd.randint(1, 3000)))
+                    elif r < 0.9:
+                        bank.transfer(*a, *b, float(rnd.randint(1, 3000)))
+                    elif r < 0.98:
+                        bank.apply_batch([("withdraw", *a, 2000.0), ("transfer", *b, *a, 500.0)],
+                                         atomic=False)
+                    else:
+                        acc = bank.find_account(*a)
+                        if acc is not None:
+                            bank.remove_account(acc)
+                            bank.add_account(ContaCorrente(a[0], f"{a[1]}-{n}-{k}", "Cliente",
+                                                           "Rua A", float(rnd.randint(-500, 500))))
+                except ValueError:
+                    pass
+
+        ts = [threading.Thread(target=trabalhar, args=(n,)) for n in range(threads)]
+        t0 = time.perf_counter()
+        for t in ts:
+            t.start()
+        bank.month_end()
+        for t in ts:
+            t.join()
+        return por_thread * threads / (time.perf_counter() - t0)
+
+    resultado["memoria_ops_por_segundo"] = estressar(bank, contas, ops)
+    t0 = time.perf_counter()
+    divergencias = bank.verificar_agregados()
+    resultado["verificacao_ms"] = (time.perf_counter() - t0) * 1000
+
+    n_sqlite = min(contas, 20_000)
+    with tempfile.TemporaryDirectory() as d:
+        caminho = os.path.join(d, "banco.db")
+        sqlite = SQLiteBank(caminho)
+        sqlite.add_accounts(gerar_banco(n_sqlite, 0, seed=seed).accounts)
+        resultado["sqlite_ops_por_segundo"] = estressar(sqlite, n_sqlite, ops // 10)
+        divergencias.update(sqlite.verificar_agregados())
+        mantidos = sqlite.agregados_por_agencia()
+        sqlite.close()
+        reaberto = SQLiteBank(caminho)
+        reaberto_ok = reaberto.agregados_por_agencia() == mantidos and not reaberto.verificar_agregados()
+        reaberto.close()
+    resultado["divergencias"] = divergencias
+    resultado["erros"] = erros
+    resultado["consistente"] = not divergencias and reaberto_ok and not erros
+    return resultado
+
+
+def _consultas_busca(rnd, contas, n):
+    """Consultas de busca por categoria: prefixos de nome, nome e sobrenome, conta, agência e ausentes."""
+    def prefixo(palavra):
+        return palavra[:rnd.randint(1, len(palavra))]
+    return {
+        "nome": [prefixo(rnd.choice(_NOMES)) for _ in range(n)],
+        "nome_sobrenome": [f"{rnd.choice(_NOMES)} {prefixo(rnd.choice(_SOBRENOMES))}" for _ in range(n)],
+        "conta": [prefixo(str(rnd.randrange(contas))) for _ in range(n)],
+        "agencia": [agencia_de(rnd.randrange(contas), 100) for _ in range(n)],
+        "ausente": [f"{rnd.choice(_NOMES)} x{rnd.randrange(contas)}" for _ in range(n)],
+    }
+
+
+def _conferir_busca(bank, consultas, k):
+    """Consultas de `consultas` cujo resultado diverge de uma varredura de todas as contas."""
+    contas = list(bank.accounts)
+    erradas = []
+    for texto in consultas:
+        termos = [normalizar(t) for t in texto.split()]
+        todas = {id(acc) for acc in contas if all(_casa(acc, t) for t in termos)}
+        achadas = bank.buscar(texto, k)
+        if (len({id(acc) for acc in achadas}) != len(achadas) or not {id(acc) for acc in achadas} <= todas
+                or len(achadas) != min(k, len(todas))):
+            erradas.append(texto)
+    return erradas
+
+
+def bench_busca(contas, consultas, k=20, conferidas=30, seed=0):
+    """
+    Busca incremental por titular, conta e agência: criação e memória do
+    índice, latência top-k por tipo de consulta, custo do cadastro com o
+    índice ativo e conferência com uma varredura completa, também após
+    cadastros e remoções; o SQLiteBank (FTS5) é conferido com o Bank em memória.
+    """
+    rnd = random.Random(seed)
+    bank = gerar_banco(contas, 0, seed=seed)
+    resultado = {"benchmark": "busca", "contas": contas, "k": k}
+    resultado["indice_mb"] = _medir_memoria(lambda: IndiceBusca(bank.accounts)) / 2**20
+    t0 = time.perf_counter()
+    bank.buscar("")
+    resultado["criacao_ms"] = (time.perf_counter() - t0) * 1000
+    por_tipo = _consultas_busca(rnd, contas, consultas)
+    resultado["consultas"] = {tipo: _estatisticas(_cronometrar(bank.buscar, [(q, k) for q in lista]))
+                              for tipo, lista in por_tipo.items()}
+    amostra = [q for lista in por_tipo.values() for q in lista[:conferidas // len(por_tipo)]]
+    erradas = _conferir_busca(bank, amostra, k)
+
+    novas = [ContaCorrente(agencia_de(i, 100), f"n{i}", f"Zélia Quaresma {i}", "Rua A", 100.0)
+             for i in range(contas // 100)]
+    resultado["cadastro"] = _estatisticas(_cronometrar(bank.add_account, [(acc,) for acc in novas]))
+    removidas = rnd.sample(list(bank.accounts), contas // 5)
+    resultado["remocao"] = _estatisticas(_cronometrar(bank.remove_account, [(acc,) for acc in removidas]))
+    bank.add_accounts(removidas[:len(removidas) // 2])
+    erradas += _conferir_busca(bank, amostra + ["zelia", "ZÉLIA quar", "quaresma 1", "n1"], k)
+
+    n_sqlite = min(contas, 20_000)
+    with tempfile.TemporaryDirectory() as d:
+        memoria = gerar_banco(n_sqlite, 0, seed=seed)
+        sqlite = SQLiteBank(os.path.join(d, "banco.db"))
+        sqlite.add_accounts(gerar_banco(n_sqlite, 0, seed=seed).accounts)
+        por_tipo = _consultas_busca(rnd, n_sqlite, consultas // 10)
+        resultado["sqlite_consultas"] = {
+            tipo: _estatisticas(_cronometrar(sqlite.buscar, [(q, k) for q in lista]))
+            for tipo, lista in por_tipo.items()}
+        for lista in por_tipo.values():
+            for texto in lista[:conferidas // len(por_tipo)]:
+                chaves = [{(acc.agencia, acc.conta) for acc in b.buscar(texto, n_sqlite)} for b in (memoria, sqlite)]
+                if chaves[0] != chaves[1]:
+                    erradas.append(texto)
+        sqlite.close()
+    resultado["divergentes"] = erradas
+    resultado["consistente"] = not erradas
+    return resultado
+
+
+async def _total_servico(host, porta, contas):
+    """Soma dos saldos das contas de carga.gerar_banco, consultadas pelo serviço."""
+    cliente = await ClienteServico.conectar(host, porta)
+    total = 0.0
+    for inicio in range(0, contas, 1000):
+        respostas = await cliente.lote([("find_account", agencia_de(i, 100), str(i))
+                                        for i in range(inicio, min(inicio + 1000, contas))])
+        total += sum(r["resultado"]["saldo"] for r in respostas)
+    await cliente.fechar()
+    return round(total, 2)
+
+
+def bench_servico(contas, requisicoes, conexoes=8):
+    """
+    Serviço TCP em outro processo sob o gerador de carga: uma requisição em
+    voo por conexão, pipelining e lotes. Confere o total dos saldos com o
+    efeito líquido das operações aceitas.
+    """
+    aqui = os.path.dirname(os.path.abspath(__file__))
+    processo = subprocess.Popen([sys.executable, os.path.join(aqui, "servico.py"), "--contas", str(contas),
+                                 "--porta", "0"], stdout=subprocess.PIPE, text=True)
+    try:
+        endereco = json.loads(processo.stdout.readline())
+        host, porta = endereco["host"], endereco["porta"]
+        resultado = {"benchmark": "servico", "contas": contas, "requisicoes": requisicoes,
+                     "conexoes": conexoes, "cpus": os.cpu_count()}
+        inicial = asyncio.run(_total_servico(host, porta, contas))
+        liquido = 0.0
+        for nome, profundidade, lote in (("sem_pipelining", 1, 1), ("pipelining", 32, 1), ("lotes", 4, 64)):
+            r = asyncio.run(gerar_carga(host, porta, contas, requisicoes, conexoes, profundidade, lote))
+            liquido += r["liquido"]
+            resultado[nome] = {chave: r[chave] for chave in
+                               ("profundidade", "lote", "req_por_segundo", "p50_us", "p99_us", "por_operacao")}
+            resultado[nome]["recusas"] = sum(r["recusas"].values())
+        final = asyncio.run(_total_servico(host, porta, contas))
+    finally:
+        processo.terminate()
+        processo.wait()
+    resultado["total_inicial"] = inicial
+    resultado["total_final"] = final
+    resultado["consistente"] = abs(final - (inicial + liquido)) < 0.005
+    return resultado
+
+
+def _tempo_processo(argv, cwd, repeticoes=5):
+    """Menor tempo de parede (ms) de um processo Python com `argv`, rodando em `cwd`."""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable] + argv, check=True, stdout=subprocess.DEVNULL, cwd=cwd)
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor * 1000
+
+
+def bench_cli(contas, ops, seed=0):
+    """
+    CLI sem interface gráfica: tempo de início do processo (comparado a um
+    interpretador vazio e à importação da GUI), vazão de um script de
+    operações e replay de um journal, conferido com o banco original.
+    """
+    rnd = random.Random(seed)
+    aqui = os.path.dirname(os.path.abspath(__file__))
+    cli = os.path.join(aqui, "cli.py")
+    resultado = {"benchmark": "cli", "contas": contas, "ops": ops}
+    with tempfile.TemporaryDirectory() as d:
+        vazio = os.path.join(d, "vazio.txt")
+        open(vazio, "w").close()
+        # Os processos rodam no diretório do projeto, para que `import main`
+        # funcione qualquer que seja o diretório de onde o benchmark foi chamado.
+        resultado["processo_vazio_ms"] = _tempo_processo(["-c", "pass"], aqui)
+        resultado["cli_inicio_ms"] = _tempo_processo([cli, "script", vazio], aqui)
+        resultado["gui_importacao_ms"] = _tempo_processo(["-c", "import main"], aqui)
+
+        script = os.path.join(d, "ops.txt")
+        with open(script, "w", encoding="utf-8") as f:
+            for i in range(contas):
+                tipo = "corrente" if i % 2 else "poupanca"
+                f.write(f"add_account;{tipo};{agencia_de(i, 100)};{i};Cliente {i};Rua A;1000.0\n")
+            for _ in range(ops):
+                i, j = rnd.randrange(contas), rnd.randrange(contas)
+                a, b = f"{agencia_de(i, 100)};{i}", f"{agencia_de(j, 100)};{j}"
+                r = rnd.random()
+                if r < 0.4:
+                    f.write(f"deposit;{a};{rnd.randint(1, 500)}.0;Caixa\n")
+                elif r < 0.7:
+                    f.write(f"withdraw;{a};{rnd.randint(1, 500)}.0\n")
+                else:
+                    f.write(f"transfer;{a};{b};{rnd.randint(1, 500)}.0\n")
+        saida = subprocess.run([sys.executable, cli, "script", script], check=True,
+                               capture_output=True, text=True, cwd=aqui).stdout
+        r = json.loads(saida)
+        resultado["script"] = {chave: r[chave] for chave in
+                               ("importacao_ms", "inicio_ms", "operacoes", "ops_por_segundo",
+                                "tkinter_carregado")}
+        resultado["script"]["rejeitadas"] = sum(r["rejeitadas"].values())
+
+        diretorio = os.path.join(d, "journal")
+        p = Persistencia(diretorio, snapshot_every=2 * (contas + ops), sync_commit=False)
+        bank = p.open()
+        bank.add_accounts(gerar_banco(contas, 0, seed=seed).accounts)
+        for _ in range(ops):
+            i, j = rnd.randrange(contas), rnd.randrange(contas)
+            try:
+                bank.transfer(agencia_de(i, 100), str(i), agencia_de(j, 100), str(j),
+                              float(rnd.randint(1, 500)))
+            except ValueError:
+                pass
+        p.close()
+        saida = subprocess.run([sys.executable, cli, "journal", diretorio], check=True,
+                               capture_output=True, text=True, cwd=aqui).stdout
+        r = json.loads(saida)
+        resultado["journal"] = {chave: r[chave] for chave in ("inicio_ms", "registros", "ops_por_segundo")}
+        resultado["consistente"] = (not resultado["script"]["tkinter_carregado"]
+                                    and r["contas"] == len(bank.accounts)
+                                    and r["saldo_total"] == round(sum(acc.saldo for acc in bank.accounts), 2))
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do SistemaBancario")
+    parser.add_argument("--saida", help="grava o resultado JSON neste arquivo")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p = sub.add_parser("suite", help="operações principais sobre população sintética")
+    p.add_argument("--escala", type=int, default=100_000)
+    p.add_argument("--transacoes", type=int, default=20)
+    p.add_argument("--agencias", type=int, default=100)
+    p.add_argument("--amostras", type=int, default=20_000)
+    p.add_argument("--sem-memoria", action="store_true", help="não rastreia memória (mais rápido)")
+    p = sub.add_parser("comparar", help="compara dois resultados da suite")
+    p.add_argument("base")
+    p.add_argument("novo")
+    p.add_argument("--tolerancia", type=float, default=0.10)
+    p = sub.add_parser("memoria", help="memória por transação: layout antigo x compacto")
+    p.add_argument("-n", type=int, default=1_000_000)
+    p = sub.add_parser("journal", help="vazão de group commit e tempo de recuperação")
+    p.add_argument("--threads", type=int, default=8)
+    p.add_argument("--ops", type=int, default=20_000)
+    p.add_argument("--tail", type=int, default=100_000)
+    p = sub.add_parser("concorrencia", help="estresse de transferências concorrentes")
+    p.add_argument("--threads", type=int, default=8)
+    p.add_argument("--contas", type=int, default=100)
+    p.add_argument("--ops", type=int, default=200_000)
+    p = sub.add_parser("lote", help="apply_batch x chamadas individuais")
+    p.add_argument("--contas", type=int, default=10_000)
+    p.add_argument("--ops", type=int, default=50_000)
+    p = sub.add_parser("mensal", help="fechamento mensal vetorizado")
+    p.add_argument("--contas", type=int, default=1_000_000)
+    p = sub.add_parser("particoes", help="Bank particionado por agência em processos")
+    p.add_argument("--shards", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--agencias", type=int, default=16)
+    p.add_argument("--ops", type=int, default=400_000)
+    p = sub.add_parser("metricas", help="custo da instrumentação de métricas")
+    p.add_argument("-n", type=int, default=200_000)
+    p = sub.add_parser("importacao", help="vazão de importação/exportação em fluxo")
+    p.add_argument("--contas", type=int, default=100_000)
+    p.add_argument("--transacoes", type=int, default=20)
+    p = sub.add_parser("extratos", help="cache de extratos do mês corrente")
+    p.add_argument("--contas", type=int, default=1000)
+    p.add_argument("--transacoes", type=int, default=500)
+    p.add_argument("--consultas", type=int, default=20_000)
+    p = sub.add_parser("exclusoes", help="fila de solicitações de exclusão")
+    p.add_argument("--contas", type=int, default=1_000_000)
+    p.add_argument("--pendentes", type=int, default=10_000)
+    p = sub.add_parser("sqlite", help="backend SQLite x Bank em memória")
+    p.add_argument("--contas", type=int, default=100_000)
+    p.add_argument("--transacoes", type=int, default=20)
+    p.add_argument("--amostras", type=int, default=20_000)
+    p = sub.add_parser("arquivo", help="arquivo frio do histórico antigo")
+    p.add_argument("--contas", type=int, default=20_000)
+    p.add_argument("--transacoes", type=int, default=100)
+    p.add_argument("--dias-recentes", type=int, default=30)
+    p = sub.add_parser("agregados", help="agregados por agência e verificação de consistência")
+    p.add_argument("--contas", type=int, default=100_000)
+    p.add_argument("--threads", type=int, default=8)
+    p.add_argument("--ops", type=int, default=200_000)
+    p = sub.add_parser("cli", help="início e replay da linha de comando sem GUI")
+    p.add_argument("--contas", type=int, default=10_000)
+    p.add_argument("--ops", type=int, default=200_000)
+    p = sub.add_parser("busca", help="busca incremental por titular, conta e agência")
+    p.add_argument("--contas", type=int, default=1_000_000)
+    p.add_argument("--consultas", type=int, default=2_000)
+    p.add_argument("--k", type=int, default=20)
+    p = sub.add_parser("servico", help="serviço TCP local sob o gerador de carga")
+    p.add_argument("--contas", type=int, default=10_000)
+    p.add_argument("--requisicoes", type=int, default=100_000)
+    p.add_argument("--conexoes", type=int, default=8)
+    args = parser.parse_args(argv)
+    if args.comando == "suite":
+        resultado = bench_suite(args.escala, args.transacoes, args.agencias,
+                                args.amostras, not args.sem_memoria)
+    elif args.comando == "comparar":
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.novo) as f:
+            novo = json.load(f)
+        resultado = comparar(base, novo, args.tolerancia)
+        print(json.dumps(resultado, indent=2))
+        if resultado["regressoes"]:
+            sys.exit(1)
+        return
+    elif args.comando == "memoria":
+        resultado = bench_memoria(args.n)
+    elif args.comando == "journal":
+        resultado = bench_journal(args.threads, args.ops, args.tail)
+    elif args.comando == "concorrencia":
+        resultado = bench_concorrencia(args.threads, args.contas, args.ops)
+        if (not resultado["conservado"] or resultado["violacoes_de_limite"]
+                or resultado["erros"] or resultado["threads_travadas"]):
+            print(json.dumps(resultado, indent=2))
+            sys.exit("Falha: saldo não conservado, limite ultrapassado, exceção inesperada "
+                     "ou thread travada.")
+    elif args.comando == "lote":
+        resultado = bench_lote(args.contas, args.ops)
+    elif args.comando == "mensal":
+        resultado = bench_mensal(args.contas)
+        if not resultado["consistente"]:
+            print(json.dumps(resultado, indent=2))
+            sys.exit("Falha: total dos saldos após o fechamento diverge do resumo.")
+    elif args.comando == "particoes":
+        resultado = bench_particoes(args.shards, args.agencias, args.ops)
+    elif args.comando == "metricas":
+        resultado = bench_metricas(args.n)
+    elif args.comando == "importacao":
+        resultado = bench_importacao(args.contas, args.transacoes)
+    elif args.comando == "extratos":
+        resultado = bench_extratos(args.contas, args.transacoes, args.consultas)
+        if not resultado["consistente"]:
+            print(json.dumps(resultado, indent=2))
+            sys.exit("Falha: extrato em cache diverge do registro.")
+    elif args.comando == "sqlite":
+        resultado = bench_sqlite(args.contas, args.transacoes, args.amostras)
+    elif args.comando == "arquivo":
+        resultado = bench_arquivo(args.contas, args.transacoes, args.dias_recentes)
+        if resultado["mapeamentos_abertos"]:
+            print(json.dumps(resultado, indent=2))
+            sys.exit("Falha: arquivo frio continua mapeado depois de descartado o banco.")
+    elif args.comando == "exclusoes":
+        resultado = bench_exclusoes(args.contas, args.pendentes)
+        if not resultado["consistente"]:
+            print(json.dumps(resultado, indent=2))
+            sys.exit("Falha: fila de exclusão inconsistente com as contas.")
+    elif args.comando == "agregados":
+        resultado = bench_agregados(args.contas, args.threads, args.ops)
+        if not resultado["consistente"]:
+            print(json.dumps(resultado, indent=2))
+            sys.exit("Falha: agregados por agência divergem do recálculo ou exceção inesperada.")
+    elif args.comando == "busca":
+        resultado = bench_busca(args.contas, args.consultas, args.k)
+        if not resultado["consistente"]:
+            print(json.dumps(resultado, indent=2))
+            sys.exit("Falha: busca diverge da varredura das contas.")
+    elif args.comando == "servico":
+        resultado = bench_servico(args.contas, args.requisicoes, args.conexoes)
+        if not resultado["consistente"]:
+            print(json.dumps(resultado, indent=2))
+            sys.exit("Falha: total dos saldos no serviço diverge das operações aceitas.")
+    elif args.comando == "cli":
+        resultado = bench_cli(args.contas, args.ops)
+        if not resultado["consistente"]:
+            print(json.dumps(resultado, indent=2))
+            sys.exit("Falha: replay do journal pela CLI diverge do banco.")
+    saida = json.dumps(resultado, indent=2)
+    if args.saida:
+        with open(args.saida, "w") as f:
+            f.write(saida + "\n")
+    print(saida)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+Índice de busca por prefixo sobre titular, conta e agência.
+
+Cada campo tem as suas chaves distintas (palavras do titular, números de
+conta, agências) normalizadas para minúsculas e sem acentos, numa lista
+ordenada em que o prefixo é localizado por bisect, e as contas de cada
+chave. Chaves novas entram numa lista ordenada pequena, mesclada à principal
+quando cresce, para que o cadastro não desloque a lista inteira. Contas
+removidas ficam marcadas e são ignoradas nas buscas até a compactação, como
+as lacunas da lista de contas do Bank.
+
+Uma busca é um texto com uma ou mais palavras; cada palavra precisa ser
+prefixo de uma palavra do titular, da conta ou da agência. As contas saem
+na ordem das chaves (números de conta primeiro), até `k`.
+"""
+import unicodedata
+from bisect import bisect_left, insort
+from functools import lru_cache
+from heapq import merge
+
+_FIM = chr(0x10FFFF)
+
+
+@lru_cache(maxsize=65536)
+def _sem_acentos(texto):
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+def normalizar(texto):
+    """Texto em minúsculas e sem acentos (o próprio objeto, se já estiver assim)."""
+    if texto.isascii():
+        minusculas = texto.lower()
+        return texto if minusculas == texto else minusculas
+    return _sem_acentos(texto)
+
+
+@lru_cache(maxsize=65536)
+def palavras(titular):
+    return tuple(normalizar(p) for p in titular.split())
+
+
+def _faixa(lista, inicio, fim):
+    for i in range(inicio, fim):
+        yield lista[i]
+
+
+class _Prefixos:
+    """Chaves de um campo em ordem, com as contas de cada uma."""
+    def __init__(self):
+        self._ordenadas = []
+        self._novas = []
+        self._contas = {}  # chave -> conta, ou lista de contas se houver mais de uma
+
+    def adicionar(self, chave, acc):
+        atual = self._contas.get(chave)
+        if atual is None:
+            self._contas[chave] = acc
+            insort(self._novas, chave)
+            if len(self._novas) > max(1024, len(self._ordenadas) // 32):
+                self._ordenadas += self._novas
+                self._ordenadas.sort()
+                self._novas = []
+        elif type(atual) is list:
+            atual.append(acc)
+        else:
+            self._contas[chave] = [atual, acc]
+
+    def construir(self, pares):
+        """Carga inicial a partir de (chave, conta), com uma única ordenação."""
+        for chave, acc in pares:
+            atual = self._contas.get(chave)
+            if atual is None:
+                self._contas[chave] = acc
+            elif type(atual) is list:
+                atual.append(acc)
+            else:
+                self._contas[chave] = [atual, acc]
+        self._ordenadas = sorted(self._contas)
+        self._novas = []
+
+    def compactar(self, removidas):
+        contas = {}
+        for chave, atual in self._contas.items():
+            if type(atual) is list:
+                atual = [acc for acc in atual if acc not in removidas]
+                if len(atual) > 1:
+                    contas[chave] = atual
+                elif atual:
+                    contas[chave] = atual[0]
+            elif atual not in removidas:
+                contas[chave] = atual
+        self._contas = contas
+        self._ordenadas = sorted(contas)
+        self._novas = []
+
+    def existe(self, prefixo):
+        for lista in (self._ordenadas, self._novas):
+            i = bisect_left(lista, prefixo)
+            if i < len(lista) and lista[i].startswith(prefixo):
+                return True
+        return False
+
+    def buscar(self, prefixo):
+        """Contas cujas chaves começam com `prefixo`, na ordem das chaves."""
+        fim = prefixo + _FIM
+        ordenadas, novas = self._ordenadas, self._novas
+        chaves = merge(_faixa(ordenadas, bisect_left(ordenadas, prefixo), bisect_left(ordenadas, fim)),
+                       _faixa(novas, bisect_left(novas, prefixo), bisect_left(novas, fim)))
+        contas = self._contas
+        for chave in chaves:
+            atual = contas[chave]
+            if type(atual) is list:
+                yield from atual
+            else:
+                yield atual
+
+
+class IndiceBusca:
+    """Índice de busca das contas de um Bank; usado sob o lock do banco."""
+    def __init__(self, contas=()):
+        self._conta = _Prefixos()
+        self._titular = _Prefixos()
+        self._agencia = _Prefixos()
+        self._removidas = set()
+        self._n = 0
+        contas = list(contas)
+        self._conta.construir((normalizar(acc.conta), acc) for acc in contas)
+        self._titular.construir((p, acc) for acc in contas for p in palavras(acc.titular))
+        self._agencia.construir((normalizar(acc.agencia), acc) for acc in contas)
+        self._n = len(contas)
+
+    def adicionar(self, acc):
+        if acc in self._removidas:
+            # As chaves (agência, conta e titular não mudam) ainda estão no índice.
+            self._removidas.discard(acc)
+        else:
+            self._conta.adicionar(normalizar(acc.conta), acc)
+            for p in palavras(acc.titular):
+                self._titular.adicionar(p, acc)
+            self._agencia.adicionar(normalizar(acc.agencia), acc)
+        self._n += 1
+
+    def remover(self, acc):
+        self._removidas.add(acc)
+        self._n -= 1
+        if len(self._removidas) > 64 and 4 * len(self._removidas) > self._n:
+            for campo in (self._conta, self._titular, self._agencia):
+                campo.compactar(self._removidas)
+            self._removidas.clear()
+
+    def buscar(self, texto, k=20):
+        """Até `k` contas em que cada palavra de `texto` é prefixo de titular, conta ou agência."""
+        termos = [normalizar(t) for t in texto.split()]
+        campos = (self._conta, self._titular, self._agencia)
+        if not termos or k <= 0 or not all(any(c.existe(t) for c in campos) for t in termos):
+            return []
+        guia = max(termos, key=len)
+        outros = list(termos)
+        outros.remove(guia)
+        removidas = self._removidas
+        vistas = set()
+        resultado = []
+        for campo in campos:
+            for acc in campo.buscar(guia):
+                if acc in removidas or acc in vistas:
+                    continue
+                vistas.add(acc)
+                for t in outros:
+                    if not _casa(acc, t):
+                        break
+                else:
+                    resultado.append(acc)
+                    if len(resultado) >= k:
+                        return resultado
+        return resultado
+
+
+def _casa(acc, termo):
+    for p in palavras(acc.titular):
+        if p.startswith(termo):
+            return True
+    return normalizar(acc.conta).startswith(termo) or normalizar(acc.agencia).startswith(termo)
@@ -0,0 +1,105 @@
+"""
+Gerador de carga sintética para o núcleo bancário.
+
+Produz populações de ContaCorrente/ContaPoupanca com históricos de
+transações e listas de operações no formato de Bank.apply_batch, sempre de
+forma determinística a partir de uma semente.
+"""
+import random
+from datetime import datetime, timedelta
+
+from SistemaBancario import Bank, ContaCorrente, ContaPoupanca, to_micros, tipo_codigo
+
+_NOMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Heitor",
+          "Isabela", "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael"]
+_SOBRENOMES = ["Silva", "Souza", "Oliveira", "Santos", "Pereira", "Lima", "Costa",
+               "Ferreira", "Almeida", "Ribeiro", "Carvalho", "Gomes", "Martins", "Rocha"]
+_RUAS = ["Rua das Flores", "Av. Brasil", "Rua XV de Novembro", "Av. Paulista", "Rua Bahia"]
+
+
+def agencia_de(i, agencias):
+    return f"{i % agencias:04d}"
+
+
+def gerar_contas(n, agencias=100, fracao_poupanca=0.4, seed=0):
+    """Gera `n` contas distribuídas entre `agencias` agências."""
+    rnd = random.Random(seed)
+    for i in range(n):
+        titular = f"{rnd.choice(_NOMES)} {rnd.choice(_SOBRENOMES)}"
+        endereco = f"{rnd.choice(_RUAS)}, {rnd.randint(1, 2000)}"
+        saldo = round(rnd.uniform(0, 10_000), 2)
+        if rnd.random() < fracao_poupanca:
+            yield ContaPoupanca(agencia_de(i, agencias), str(i), titular, endereco, saldo,
+                                rendimento_mensal=rnd.choice((0.005, 0.006, 0.007)))
+        else:
+            yield ContaCorrente(agencia_de(i, agencias), str(i), titular, endereco, saldo,
+                                limite_cheque_especial=rnd.choice((500.0, 1000.0, 5000.0)))
+
+
+def gerar_historico(acc, n, inicio, fim, contas_total, rnd):
+    """
+    Preenche o histórico de `acc` com `n` transações entre `inicio` e `fim`,
+    em ordem de data, sem ultrapassar o limite da conta. O saldo final da
+    conta passa a refletir o histórico.
+    """
+    ts_ini = to_micros(inicio)
+    span = to_micros(fim) - ts_ini
+    aleatorio = rnd.random
+    deposito, saque = tipo_codigo("Depósito"), tipo_codigo("Saque")
+    enviada, recebida = tipo_codigo("Transferência - Enviada"), tipo_codigo("Transferência - Recebida")
+    log = acc.transactions
+    saldo = round(acc.saldo * 100)
+    minimo = round(acc.saldo_minimo() * 100)
+    for ts in sorted(ts_ini + int(aleatorio() * span) for _ in range(n)):
+        r = aleatorio()
+        cents = 100 + int(aleatorio() * 49_900)
+        if r >= 0.4 and r < 0.8 and saldo - cents < minimo:
+            r = 0.0  # débito que violaria o limite vira depósito
+        if r < 0.4:
+            log.append_raw(ts, cents, deposito, "Caixa")
+        elif r < 0.6:
+            cents = -cents
+            log.append_raw(ts, cents, saque, "Saque realizado")
+        elif r < 0.8:
+            cents = -cents
+            log.append_raw(ts, cents, enviada, str(rnd.randrange(contas_total)))
+        else:
+            log.append_raw(ts, cents, recebida, str(rnd.randrange(contas_total)))
+        saldo += cents
+    acc.saldo = saldo / 100
+
+
+def gerar_banco(n_contas, transacoes_por_conta=20, agencias=100, fracao_poupanca=0.4,
+                dias=365, seed=0, fim=None):
+    """Cria um Bank com `n_contas` contas e históricos de `transacoes_por_conta` entradas."""
+    rnd = random.Random(seed)
+    fim = fim or datetime(2025, 1, 1)
+    inicio = fim - timedelta(days=dias)
+    bank = Bank()
+    for acc in gerar_contas(n_contas, agencias, fracao_poupanca, seed):
+        if transacoes_por_conta:
+            gerar_historico(acc, transacoes_por_conta, inicio, fim, n_contas, rnd)
+        bank.add_account(acc)
+    return bank
+
+
+def gerar_operacoes(n, n_contas, agencias=100, seed=0, valor_max=500):
+    """
+    Gera `n` operações (formato de Bank.apply_batch) sobre contas criadas
+    por gerar_contas/gerar_banco com os mesmos `n_contas` e `agencias`.
+    """
+    rnd = random.Random(seed)
+    ops = []
+    for _ in range(n):
+        i = rnd.randrange(n_contas)
+        valor = float(rnd.randint(1, valor_max))
+        r = rnd.random()
+        if r < 0.35:
+            ops.append(("deposit", agencia_de(i, agencias), str(i), valor, "Carga"))
+        elif r < 0.55:
+            ops.append(("withdraw", agencia_de(i, agencias), str(i), valor))
+        else:
+            j = rnd.randrange(n_contas)
+            ops.append(("transfer", agencia_de(i, agencias), str(i),
+                        agencia_de(j, agencias), str(j), valor))
+    return ops
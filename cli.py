@@ -0,0 +1,181 @@
+"""
+Linha de comando sem interface gráfica.
+
+Importa só o núcleo (SistemaBancario); tkinter nunca é carregado, então o
+início é praticamente imediato. Reaplica sobre um Bank, na velocidade do
+núcleo, um script de operações ou um journal da Persistencia, e informa em
+JSON o tempo de importação e de início e a vazão.
+
+Uso:
+    python cli.py script operacoes.txt [--carregar contas.bin] [--estrito] [--saida res.json]
+    python cli.py journal DIRETORIO [--saida res.json]
+    python cli.py journal journal.000001.log
+
+Script: uma operação por linha, campos separados por ";". Linhas vazias e
+iniciadas por "#" são ignoradas.
+    add_account;corrente|poupanca;agencia;conta;titular;endereco;saldo
+    deposit;agencia;conta;valor[;origem]
+    withdraw;agencia;conta;valor
+    transfer;agencia;conta;agencia_destino;conta_destino;valor
+    update_address;agencia;conta;endereco
+    remove_account;agencia;conta
+    month_end
+"""
+import time
+
+_T0 = time.perf_counter()
+
+import json
+import os
+import sys
+
+from SistemaBancario import Bank, ContaCorrente, ContaPoupanca
+
+_IMPORTACAO = time.perf_counter() - _T0
+
+
+def _operacoes(bank):
+    """Funções do script por nome de operação; cada uma recebe os campos da linha."""
+    index = bank._index
+
+    def conta(agencia, numero):
+        acc = index.get((agencia, numero))
+        if acc is None:
+            raise ValueError("Agência ou conta não encontrada.")
+        return acc
+
+    def add_account(tipo, agencia, numero, titular, endereco, saldo):
+        if tipo == "corrente":
+            bank.add_account(ContaCorrente(agencia, numero, titular, endereco, float(saldo)))
+        elif tipo == "poupanca":
+            bank.add_account(ContaPoupanca(agencia, numero, titular, endereco, float(saldo)))
+        else:
+            raise ValueError(f"Tipo de conta desconhecido: {tipo}")
+
+    def deposit(agencia, numero, valor, origem=""):
+        conta(agencia, numero).deposit(float(valor), origem)
+
+    def withdraw(agencia, numero, valor):
+        conta(agencia, numero).withdraw(float(valor))
+
+    def transfer(agencia, numero, agencia_destino, numero_destino, valor):
+        conta(agencia, numero).transfer(conta(agencia_destino, numero_destino), float(valor))
+
+    def update_address(agencia, numero, endereco):
+        conta(agencia, numero).update_address(endereco)
+
+    def remove_account(agencia, numero):
+        bank.remove_account(conta(agencia, numero))
+
+    def month_end():
+        bank.month_end()
+
+    return {
+        "add_account": add_account,
+        "deposit": deposit,
+        "withdraw": withdraw,
+        "transfer": transfer,
+        "update_address": update_address,
+        "remove_account": remove_account,
+        "month_end": month_end,
+    }
+
+
+def executar_script(bank, arquivo, estrito=False):
+    """
+    Executa o script `arquivo` sobre `bank`. Operações rejeitadas (ValueError
+    ou campos inválidos) são contadas por mensagem; com `estrito`, a primeira
+    encerra a execução. Retorna (operações, {mensagem: quantidade}).
+    """
+    operacoes = _operacoes(bank)
+    n = 0
+    erros = {}
+    with open(arquivo, encoding="utf-8") as f:
+        for numero, linha in enumerate(f, start=1):
+            linha = linha.rstrip("\n")
+            if not linha or linha[0] == "#":
+                continue
+            nome, *campos = linha.split(";")
+            n += 1
+            try:
+                operacao = operacoes.get(nome)
+                if operacao is None:
+                    raise ValueError(f"Operação desconhecida: {nome}")
+                operacao(*campos)
+            except (ValueError, TypeError) as e:
+                if estrito:
+                    raise ValueError(f"Linha {numero}: {e}") from None
+                mensagem = str(e)
+                erros[mensagem] = erros.get(mensagem, 0) + 1
+    return n, erros
+
+
+def _resumo(bank):
+    return {"contas": len(bank.accounts), "saldo_total": round(sum(acc.saldo for acc in bank.accounts), 2)}
+
+
+def _argumentos(argv):
+    """
+    (comando, caminho, opções) da linha de comando. Sem argparse, que sozinho
+    custa mais para importar que o núcleo.
+    """
+    posicionais, opcoes = [], {}
+    it = iter(argv)
+    for arg in it:
+        if arg == "--estrito":
+            opcoes["estrito"] = True
+        elif arg in ("--carregar", "--saida"):
+            opcoes[arg[2:]] = next(it, None)
+        elif arg.startswith("-"):
+            sys.exit(__doc__)
+        else:
+            posicionais.append(arg)
+    if len(posicionais) != 2 or posicionais[0] not in ("script", "journal") or None in opcoes.values():
+        sys.exit(__doc__)
+    return posicionais[0], posicionais[1], opcoes
+
+
+def main(argv=None):
+    comando, caminho, opcoes = _argumentos(sys.argv[1:] if argv is None else argv)
+
+    resultado = {"comando": comando, "importacao_ms": _IMPORTACAO * 1000}
+    try:
+        if comando == "script":
+            bank = Bank()
+            if "carregar" in opcoes:
+                import importacao
+                resultado["contas_carregadas"] = importacao.importar_binario(bank, opcoes["carregar"])[0]
+            resultado["inicio_ms"] = (time.perf_counter() - _T0) * 1000
+            t0 = time.perf_counter()
+            n, erros = executar_script(bank, caminho, opcoes.get("estrito", False))
+            duracao = time.perf_counter() - t0
+            resultado["operacoes"] = n
+            resultado["rejeitadas"] = erros
+        else:
+            from persistencia import read_records, recuperar, replay
+            resultado["inicio_ms"] = (time.perf_counter() - _T0) * 1000
+            t0 = time.perf_counter()
+            if os.path.isdir(caminho):
+                bank, _, n = recuperar(caminho)
+            else:
+                bank, n = Bank(), 0
+                for registro in read_records(caminho):
+                    replay(bank, *registro)
+                    n += 1
+            duracao = time.perf_counter() - t0
+            resultado["registros"] = n
+    except (OSError, ValueError) as e:
+        sys.exit(f"Erro: {e}")
+    resultado["duracao_s"] = duracao
+    resultado["ops_por_segundo"] = n / duracao if duracao else 0.0
+    resultado.update(_resumo(bank))
+    resultado["tkinter_carregado"] = "tkinter" in sys.modules
+    saida = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if "saida" in opcoes:
+        with open(opcoes["saida"], "w") as f:
+            f.write(saida + "\n")
+    print(saida)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+Cliente do serviço TCP (servico.py) e gerador de carga.
+
+ClienteServico mantém várias requisições em voo na mesma conexão
+(pipelining): as requisições feitas numa mesma volta do laço de eventos
+saem numa única escrita, e as respostas são casadas pelo id.
+
+gerar_carga abre `conexoes` conexões com `profundidade` requisições em voo
+em cada uma, sobre as contas de carga.gerar_banco, e informa a vazão e as
+latências p50/p99 (por operação e no total). Com `lote`, cada envio é um
+lote de requisições numa única linha.
+
+Uso:
+    python cliente_servico.py [--host 127.0.0.1] [--porta 8765] [--contas 10000]
+                              [--requisicoes 200000] [--conexoes 8] [--profundidade 32] [--lote 1]
+"""
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import count
+
+from carga import agencia_de
+
+LEITURA = 256 * 1024
+
+_decodificar = json.JSONDecoder().decode
+_codificar = json.JSONEncoder(separators=(",", ":")).encode
+
+
+class ErroServico(ValueError):
+    """Operação recusada pelo serviço (a mensagem é a do Bank)."""
+
+
+class ClienteServico:
+    """Conexão com o serviço; chamar() e lote() podem ser usados concorrentemente."""
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._ids = count(1)
+        self._esperando = {}
+        self._saida = []
+        self._envio_agendado = False
+        self._leitura = asyncio.get_running_loop().create_task(self._ler())
+
+    @classmethod
+    async def conectar(cls, host="127.0.0.1", porta=8765):
+        reader, writer = await asyncio.open_connection(host, porta, limit=LEITURA)
+        return cls(reader, writer)
+
+    def requisitar(self, op, *args):
+        """Resposta (dict com ok e resultado ou erro) da operação."""
+        return self._enviar({"id": next(self._ids), "op": op, "args": args})
+
+    async def chamar(self, op, *args):
+        """Resultado da operação; levanta ErroServico se o serviço a recusar."""
+        resposta = await self.requisitar(op, *args)
+        if not resposta["ok"]:
+            raise ErroServico(resposta["erro"])
+        return resposta["resultado"]
+
+    async def lote(self, operacoes):
+        """Envia [(op, *args), ...] numa única linha; retorna as respostas (dicts) na ordem."""
+        if not operacoes:
+            return []
+        return await self._enviar([{"id": next(self._ids), "op": op, "args": args}
+                                   for op, *args in operacoes])
+
+    def _enviar(self, requisicao):
+        chave = requisicao["id"] if isinstance(requisicao, dict) else requisicao[0]["id"]
+        futuro = asyncio.get_running_loop().create_future()
+        self._esperando[chave] = futuro
+        self._saida.append(_codificar(requisicao))
+        if not self._envio_agendado:
+            self._envio_agendado = True
+            asyncio.get_running_loop().call_soon(self._descarregar)
+        return futuro
+
+    def _descarregar(self):
+        self._envio_agendado = False
+        self._saida.append("")
+        self._writer.write("\n".join(self._saida).encode())
+        self._saida = []
+
+    async def _ler(self):
+        pendente = b""
+        try:
+            while True:
+                dados = await self._reader.read(LEITURA)
+                if not dados:
+                    break
+                linhas = (pendente + dados).split(b"\n")
+                pendente = linhas.pop()
+                if not linhas:
+                    continue
+                for linha in b"\n".join(linhas).decode().split("\n"):
+                    resposta = _decodificar(linha)
+                    chave = resposta["id"] if isinstance(resposta, dict) else resposta[0]["id"]
+                    futuro = self._esperando.pop(chave, None)
+                    if futuro is not None and not futuro.done():
+                        futuro.set_result(resposta)
+        finally:
+            erro = ConnectionError("Conexão com o serviço encerrada.")
+            for futuro in self._esperando.values():
+                if not futuro.done():
+                    futuro.set_exception(erro)
+            self._esperando.clear()
+
+    async def fechar(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._leitura.cancel()
+
+
+def _operacao(rnd, contas, agencias, hoje):
+    """Operação aleatória da carga: (op, *args)."""
+    i = rnd.randrange(contas)
+    a = (agencia_de(i, agencias), str(i))
+    r = rnd.random()
+    if r < 0.3:
+        return ("find_account", *a)
+    if r < 0.55:
+        return ("deposit", *a, float(rnd.randint(1, 500)), "Carga")
+    if r < 0.75:
+        return ("withdraw", *a, float(rnd.randint(1, 500)))
+    if r < 0.95:
+        j = rnd.randrange(contas)
+        return ("transfer", *a, agencia_de(j, agencias), str(j), float(rnd.randint(1, 500)))
+    return ("get_extrato", *a, (hoje - timedelta(days=1)).isoformat())
+
+
+def _percentis(amostras_ns):
+    amostras_ns = sorted(amostras_ns)
+    n = len(amostras_ns)
+    return {"n": n,
+            "p50_us": amostras_ns[n // 2] / 1000 if n else None,
+            "p99_us": amostras_ns[min(n - 1, int(n * 0.99))] / 1000 if n else None}
+
+
+async def gerar_carga(host="127.0.0.1", porta=8765, contas=10_000, requisicoes=200_000,
+                      conexoes=8, profundidade=32, lote=1, agencias=100, seed=0):
+    """
+    Envia `requisicoes` operações aleatórias e mede cada uma do envio à
+    resposta. Retorna vazão, latências, recusas por mensagem e o efeito
+    líquido no total dos saldos das operações aceitas (depósitos menos saques).
+    """
+    clientes = [await ClienteServico.conectar(host, porta) for _ in range(conexoes)]
+    hoje = datetime.now()
+    tempos = {}
+    recusas = {}
+    liquido = [0.0]
+    restantes = [requisicoes]
+    relogio = time.perf_counter_ns
+
+    def registrar(op, resposta, t):
+        tempos.setdefault(op[0], []).append(t)
+        if not resposta["ok"]:
+            recusas[resposta["erro"]] = recusas.get(resposta["erro"], 0) + 1
+        elif op[0] == "deposit":
+            liquido[0] += op[3]
+        elif op[0] == "withdraw":
+            liquido[0] -= op[3]
+
+    async def trabalhar(cliente, semente):
+        rnd = random.Random(semente)
+        while restantes[0] > 0:
+            n = min(lote, restantes[0])
+            restantes[0] -= n
+            ops = [_operacao(rnd, contas, agencias, hoje) for _ in range(n)]
+            t0 = relogio()
+            if lote == 1:
+                resposta = await cliente.requisitar(*ops[0])
+                registrar(ops[0], resposta, relogio() - t0)
+            else:
+                respostas = await cliente.lote(ops)
+                t = relogio() - t0
+                for op, resposta in zip(ops, respostas):
+                    registrar(op, resposta, t)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(trabalhar(c, seed * 10_000 + k * profundidade + p)
+                           for k, c in enumerate(clientes) for p in range(profundidade)))
+    duracao = time.perf_counter() - t0
+    for c in clientes:
+        await c.fechar()
+    todas = [t for lista in tempos.values() for t in lista]
+    return {"requisicoes": len(todas), "conexoes": conexoes, "profundidade": profundidade,
+            "lote": lote, "duracao_s": duracao, "req_por_segundo": len(todas) / duracao,
+            **_percentis(todas),
+            "por_operacao": {op: _percentis(lista) for op, lista in sorted(tempos.items())},
+            "recusas": recusas, "liquido": round(liquido[0], 2)}
+
+
+def _argumentos(argv):
+    """Opções da linha de comando (sem argparse, como em cli.py)."""
+    opcoes = {"host": "127.0.0.1", "porta": 8765, "contas": 10_000, "requisicoes": 200_000,
+              "conexoes": 8, "profundidade": 32, "lote": 1}
+    it = iter(argv)
+    for arg in it:
+        nome = arg[2:]
+        valor = next(it, None)
+        if not arg.startswith("--") or nome not in opcoes or valor is None:
+            sys.exit(__doc__)
+        try:
+            opcoes[nome] = valor if nome == "host" else int(valor)
+        except ValueError:
+            sys.exit(__doc__)
+    return opcoes
+
+
+def main(argv=None):
+    opcoes = _argumentos(sys.argv[1:] if argv is None else argv)
+    try:
+        resultado = asyncio.run(gerar_carga(**opcoes))
+    except OSError as e:
+        sys.exit(f"Erro: {e}")
+    print(json.dumps(resultado, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Cache LRU de extratos.
+
+Cada entrada guarda, para uma conta e um período, as transações do extrato,
+os saldos de abertura e de fechamento e, quando pedido, o texto formatado.
+O TransactionLog mantém atualizados os extratos em cache da própria conta:
+uma entrada nova no fim do registro é acrescentada aos períodos que a
+contêm (inclusive os abertos, sem data final) e uma entrada anterior ao
+início de um período apenas desloca os seus saldos. Só uma inserção fora de
+ordem dentro do período descarta o extrato.
+
+O cache é limitado em número de entradas e em bytes (estimados). Acertos,
+faltas, extensões, descartes e memória ficam em estatisticas().
+"""
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+
+class Extrato:
+    """Extrato em cache: transações, saldos (centavos) e linhas formatadas."""
+    __slots__ = ("transacoes", "abertura", "fechamento", "linhas", "texto", "bytes",
+                 "_custo", "_chave")
+
+    def __init__(self, transacoes, abertura, fechamento):
+        self.transacoes = transacoes
+        self.abertura = abertura
+        self.fechamento = fechamento
+        self.linhas = None
+        self.texto = None
+        self._custo = _custo_transacao(transacoes[0]) if transacoes else 0
+        self.bytes = sys.getsizeof(transacoes) + self._custo * len(transacoes)
+        self._chave = None
+
+
+def _custo_transacao(t):
+    return sys.getsizeof(t) + sys.getsizeof(t.data) + sys.getsizeof(t.valor) + 8
+
+
+class CacheExtratos:
+    """LRU de extratos por (registro de transações, período)."""
+    def __init__(self, max_entradas=1024, max_bytes=64 * 2 ** 20):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.acertos = 0
+        self.faltas = 0
+        self.extensoes = 0
+        self.invalidacoes = 0
+        self.descartes = 0
+
+    @property
+    def ativo(self):
+        return self.max_entradas > 0
+
+    def obter(self, log, periodo):
+        """Retorna o Extrato de `log` para `periodo` em cache, ou None."""
+        extrato = log._extratos.get(periodo)
+        with self._lock:
+            if extrato is None or extrato._chave not in self._lru:
+                self.faltas += 1
+                return None
+            self.acertos += 1
+            self._lru.move_to_end(extrato._chave)
+        return extrato
+
+    def guardar(self, log, periodo, extrato):
+        if extrato.bytes > self.max_bytes:
+            return
+        extrato._chave = (weakref.ref(log), periodo)
+        with self._lock:
+            antigo = self._lru.pop(extrato._chave, None)
+            if antigo is not None:
+                self._bytes -= antigo.bytes
+            self._lru[extrato._chave] = extrato
+            self._bytes += extrato.bytes
+            log._extratos[periodo] = extrato
+            self._reduzir()
+
+    def _reduzir(self):
+        while self._lru and (len(self._lru) > self.max_entradas or self._bytes > self.max_bytes):
+            (ref, periodo), extrato = self._lru.popitem(last=False)
+            self._bytes -= extrato.bytes
+            self.descartes += 1
+            log = ref()
+            if log is not None and log._extratos.get(periodo) is extrato:
+                del log._extratos[periodo]
+
+    def _crescer(self, extrato, n, extensao=False):
+        with self._lock:
+            self.extensoes += extensao
+            extrato.bytes += n
+            if extrato._chave in self._lru:
+                self._bytes += n
+                self._reduzir()
+
+    def acrescentar(self, extrato, t, cents):
+        """Acrescenta a transação `t`, a mais recente do registro, ao extrato."""
+        extrato.transacoes.append(t)
+        extrato.fechamento += cents
+        if not extrato._custo:
+            extrato._custo = _custo_transacao(t)
+        n = extrato._custo
+        if extrato.linhas is not None:
+            linha = str(t)
+            extrato.linhas.append(linha)
+            n += sys.getsizeof(linha) + 8
+        if extrato.texto is not None:
+            n -= sys.getsizeof(extrato.texto)
+            extrato.texto = None
+        self._crescer(extrato, n, extensao=True)
+
+    def invalidar(self, log, periodo):
+        extrato = log._extratos.pop(periodo, None)
+        if extrato is None:
+            return
+        with self._lock:
+            if self._lru.pop(extrato._chave, None) is not None:
+                self._bytes -= extrato.bytes
+            self.invalidacoes += 1
+
+    def linhas(self, extrato):
+        """Linhas formatadas do extrato (geradas uma vez e mantidas)."""
+        if extrato.linhas is None:
+            extrato.linhas = [str(t) for t in extrato.transacoes]
+            self._crescer(extrato, sys.getsizeof(extrato.linhas)
+                          + sum(sys.getsizeof(l) for l in extrato.linhas))
+        return extrato.linhas
+
+    def texto(self, extrato):
+        if extrato.texto is None:
+            extrato.texto = "\n".join(self.linhas(extrato))
+            self._crescer(extrato, sys.getsizeof(extrato.texto))
+        return extrato.texto
+
+    def limpar(self):
+        with self._lock:
+            for (ref, periodo), extrato in self._lru.items():
+                log = ref()
+                if log is not None and log._extratos.get(periodo) is extrato:
+                    del log._extratos[periodo]
+            self._lru.clear()
+            self._bytes = 0
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self.acertos + self.faltas
+            return {
+                "entradas": len(self._lru),
+                "bytes": self._bytes,
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+                "extensoes": self.extensoes,
+                "invalidacoes": self.invalidacoes,
+                "descartes": self.descartes,
+            }
+
+
+EXTRATOS = CacheExtratos()
@@ -0,0 +1,263 @@
+"""
+Importação e exportação em fluxo de contas e transações.
+
+Formatos:
+- CSV: um arquivo de contas e um de transações (agrupadas por conta, em
+  ordem de data).
+- Binário compacto: um único arquivo com um bloco por conta, contendo os
+  dados da conta e as colunas do histórico já no layout do TransactionLog
+  (as referências vão num bloco único separadas por NUL).
+
+Leitura e escrita são feitas em blocos, então a memória não cresce com o
+número de linhas. A carga usa Bank.add_accounts e TransactionLog.extend_raw,
+sem passar pelas operações individuais. Transações históricas não geram
+eventos para observadores; com Persistencia ativa, grave um snapshot após
+a importação.
+"""
+import csv
+import struct
+import sys
+from array import array
+from datetime import datetime
+from itertools import islice
+from sys import intern
+
+from SistemaBancario import (ContaCorrente, ContaPoupanca, from_micros, tipo_codigo,
+                             tipo_nome, tipos_registrados, to_micros)
+
+CAMPOS_CONTAS = ["tipo", "agencia", "conta", "titular", "endereco", "saldo", "saldo_abertura",
+                 "limite_cheque_especial", "taxa_manutencao", "rendimento_mensal"]
+CAMPOS_TRANSACOES = ["agencia", "conta", "data", "tipo", "valor", "referencia"]
+
+_MAGIC = b"SBEXP1\n"
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_CONTA = struct.Struct("<Bdddd")    # tipo, saldo, saldo de abertura, 2 parâmetros
+_TROCAR_BYTES = sys.byteorder != "little"
+
+
+def em_blocos(iteravel, tamanho):
+    it = iter(iteravel)
+    while True:
+        bloco = list(islice(it, tamanho))
+        if not bloco:
+            return
+        yield bloco
+
+
+def _nova_conta(tipo, agencia, conta, titular, endereco, saldo_abertura, p1, p2):
+    if tipo == "corrente":
+        return ContaCorrente(agencia, conta, titular, endereco, saldo_abertura,
+                             limite_cheque_especial=p1, taxa_manutencao=p2)
+    if tipo == "poupanca":
+        return ContaPoupanca(agencia, conta, titular, endereco, saldo_abertura,
+                             rendimento_mensal=p1)
+    raise ValueError(f"Tipo de conta desconhecido: {tipo}")
+
+
+def _parametros(acc):
+    if isinstance(acc, ContaCorrente):
+        return "corrente", acc.limite_cheque_especial, acc.taxa_manutencao
+    return "poupanca", acc.rendimento_mensal, 0.0
+
+
+# --- CSV ------------------------------------------------------------------
+
+def exportar_contas_csv(bank, arquivo):
+    """Grava as contas de `bank` em CSV; retorna o número de linhas."""
+    n = 0
+    with open(arquivo, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(CAMPOS_CONTAS)
+        for bloco in em_blocos(bank.accounts, 10_000):
+            linhas = []
+            for acc in bloco:
+                tipo, p1, p2 = _parametros(acc)
+                linhas.append((tipo, acc.agencia, acc.conta, acc.titular, acc.endereco,
+                               repr(acc.saldo), repr(acc.transactions.saldo_inicial),
+                               repr(p1) if tipo == "corrente" else "",
+                               repr(p2) if tipo == "corrente" else "",
+                               repr(p1) if tipo == "poupanca" else ""))
+            w.writerows(linhas)
+            n += len(linhas)
+    return n
+
+
+def exportar_transacoes_csv(bank, arquivo, bloco=50_000):
+    """Grava o histórico de todas as contas em CSV; retorna o número de linhas."""
+    n = 0
+    with open(arquivo, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(CAMPOS_TRANSACOES)
+        for acc in bank.accounts:
+            log = acc.transactions
+            for inicio in range(0, len(log), bloco):
+                ts, cents, codigos, refs = log.columns(inicio, inicio + bloco)
+                w.writerows((acc.agencia, acc.conta, from_micros(t).isoformat(),
+                             tipo_nome(c), f"{v / 100:.2f}", r)
+                            for t, v, c, r in zip(ts, cents, codigos, refs))
+                n += len(ts)
+    return n
+
+
+def ler_contas_csv(arquivo):
+    """Gera (conta, saldo atual) para cada linha do CSV de contas."""
+    with open(arquivo, newline="", encoding="utf-8") as f:
+        for linha in csv.DictReader(f):
+            saldo = float(linha["saldo"])
+            abertura = float(linha["saldo_abertura"]) if linha.get("saldo_abertura") else saldo
+            if linha["tipo"] == "corrente":
+                p1 = float(linha["limite_cheque_especial"] or 1000.0)
+                p2 = float(linha["taxa_manutencao"] or 10.0)
+            else:
+                p1, p2 = float(linha["rendimento_mensal"] or 0.01), 0.0
+            acc = _nova_conta(linha["tipo"], linha["agencia"], linha["conta"], linha["titular"],
+                              linha["endereco"], abertura, p1, p2)
+            yield acc, saldo
+
+
+def importar_contas_csv(bank, arquivo, bloco=10_000):
+    """Carrega o CSV de contas em `bank`; retorna o número de contas."""
+    n = 0
+    for itens in em_blocos(ler_contas_csv(arquivo), bloco):
+        for acc, saldo in itens:
+            acc.saldo = saldo
+        bank.add_accounts(acc for acc, _ in itens)
+        n += len(itens)
+    return n
+
+
+def importar_transacoes_csv(bank, arquivo, bloco=50_000):
+    """
+    Carrega o CSV de transações nas contas já existentes em `bank`.
+    Linhas consecutivas da mesma conta são acumuladas em colunas e
+    acrescentadas de uma vez. Retorna o número de transações.
+    """
+    n = 0
+    atual = None
+    ts, cents, codigos, refs = array("q"), array("q"), array("B"), []
+
+    def descarregar():
+        if atual is not None and len(ts):
+            acc = bank.find_account(*atual)
+            if acc is None:
+                raise ValueError(f"Conta {atual[0]}/{atual[1]} não encontrada.")
+            acc.transactions.extend_raw(ts, cents, codigos, refs)
+
+    with open(arquivo, newline="", encoding="utf-8") as f:
+        leitor = csv.reader(f)
+        next(leitor, None)
+        for agencia, conta, data, tipo, valor, ref in leitor:
+            chave = (agencia, conta)
+            if chave != atual or len(ts) >= bloco:
+                descarregar()
+                atual = chave
+                ts, cents, codigos, refs = array("q"), array("q"), array("B"), []
+            ts.append(to_micros(datetime.fromisoformat(data)))
+            cents.append(round(float(valor) * 100))
+            codigos.append(tipo_codigo(tipo))
+            refs.append(ref)
+            n += 1
+    descarregar()
+    return n
+
+
+# --- Binário --------------------------------------------------------------
+
+def _escrever_str(partes, s):
+    b = s.encode("utf-8")
+    partes.append(_U16.pack(len(b)))
+    partes.append(b)
+
+
+def _bytes_le(coluna):
+    if _TROCAR_BYTES:
+        coluna = array(coluna.typecode, coluna)
+        coluna.byteswap()
+    return coluna.tobytes()
+
+
+def exportar_binario(bank, arquivo):
+    """Grava contas e históricos no formato binário; retorna (contas, transações)."""
+    n_contas = n_trans = 0
+    with open(arquivo, "wb") as f:
+        f.write(_MAGIC)
+        # Tabela de tipos: os códigos no arquivo são índices nesta tabela.
+        tipos = tipos_registrados()
+        partes = [_U16.pack(len(tipos))]
+        for nome in tipos:
+            _escrever_str(partes, nome)
+        f.write(b"".join(partes))
+        for acc in bank.accounts:
+            tipo, p1, p2 = _parametros(acc)
+            ts, cents, codigos, refs = acc.transactions.columns()
+            partes = [_CONTA.pack(1 if tipo == "corrente" else 2, acc.saldo,
+                                  acc.transactions.saldo_inicial, p1, p2)]
+            for s in (acc.agencia, acc.conta, acc.titular, acc.endereco):
+                _escrever_str(partes, s)
+            partes.append(_U32.pack(len(ts)))
+            partes.append(_bytes_le(ts))
+            partes.append(_bytes_le(cents))
+            partes.append(codigos.tobytes())
+            blob = "\0".join(refs).encode("utf-8")
+            partes.append(_U32.pack(len(blob)))
+            partes.append(blob)
+            f.write(b"".join(partes))
+            n_contas += 1
+            n_trans += len(ts)
+    return n_contas, n_trans
+
+
+def _ler_exato(f, n):
+    dados = f.read(n)
+    if len(dados) != n:
+        raise ValueError("Arquivo binário truncado.")
+    return dados
+
+
+def _ler_str(f):
+    (tam,) = _U16.unpack(_ler_exato(f, 2))
+    return _ler_exato(f, tam).decode("utf-8")
+
+
+def ler_binario(arquivo):
+    """Gera as contas do arquivo binário, já com histórico e saldo atual."""
+    with open(arquivo, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError("Arquivo não está no formato binário do SistemaBancario.")
+        (n_tipos,) = _U16.unpack(_ler_exato(f, 2))
+        mapa = bytes(tipo_codigo(_ler_str(f)) for _ in range(n_tipos))
+        while True:
+            cabecalho = f.read(_CONTA.size)
+            if not cabecalho:
+                return
+            if len(cabecalho) != _CONTA.size:
+                raise ValueError("Arquivo binário truncado.")
+            tipo, saldo, abertura, p1, p2 = _CONTA.unpack(cabecalho)
+            agencia, conta, titular, endereco = (_ler_str(f) for _ in range(4))
+            acc = _nova_conta("corrente" if tipo == 1 else "poupanca",
+                              agencia, conta, titular, endereco, abertura, p1, p2)
+            (n,) = _U32.unpack(_ler_exato(f, 4))
+            ts, cents, codigos = array("q"), array("q"), array("B")
+            ts.frombytes(_ler_exato(f, 8 * n))
+            cents.frombytes(_ler_exato(f, 8 * n))
+            codigos.frombytes(_ler_exato(f, n).translate(mapa.ljust(256, b"\0")))
+            if _TROCAR_BYTES:
+                ts.byteswap()
+                cents.byteswap()
+            (tam,) = _U32.unpack(_ler_exato(f, 4))
+            blob = _ler_exato(f, tam).decode("utf-8")
+            refs = [intern(r) for r in blob.split("\0")] if n else []
+            acc.transactions.extend_raw(ts, cents, codigos, refs)
+            acc.saldo = saldo
+            yield acc
+
+
+def importar_binario(bank, arquivo, bloco=10_000):
+    """Carrega o arquivo binário em `bank`; retorna (contas, transações)."""
+    n_contas = n_trans = 0
+    for contas in em_blocos(ler_binario(arquivo), bloco):
+        bank.add_accounts(contas)
+        n_contas += len(contas)
+        n_trans += sum(len(acc.transactions) for acc in contas)
+    return n_contas, n_trans
@@ -0,0 +1,81 @@
+"""
+Lista virtualizada para as telas Tk.
+
+VirtualList mostra listas grandes (contas, extratos) formatando e inserindo
+no Listbox só as linhas visíveis; as demais são pedidas a `linha(i)` conforme
+a rolagem.
+"""
+import tkinter as tk
+from tkinter import font as tkfont
+from tkinter import ttk
+
+
+class VirtualList(ttk.Frame):
+    """
+    Lista virtualizada: só as linhas visíveis são formatadas e inseridas no
+    widget. `linha(i)` devolve o texto da linha i; `total` é o número de
+    linhas. Rolagem, roda do mouse e redimensionamento buscam novas linhas
+    sob demanda, então memória e tempo até a primeira linha não dependem
+    do tamanho da lista.
+    """
+    def __init__(self, master, total=0, linha=None, height=15):
+        super().__init__(master)
+        self.total = total
+        self.linha = linha
+        self.offset = 0
+        self.visiveis = height
+        self.lista = tk.Listbox(self, height=height, activestyle='none', exportselection=False)
+        self.barra = ttk.Scrollbar(self, orient='vertical', command=self._rolar)
+        self.lista.grid(row=0, column=0, sticky='nsew')
+        self.barra.grid(row=0, column=1, sticky='ns')
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+        self._altura_linha = tkfont.nametofont('TkDefaultFont').metrics('linespace') + 1
+        self.lista.bind('<Configure>', self._redimensionar)
+        self.lista.bind('<MouseWheel>', lambda e: self._mover(-1 if e.delta > 0 else 1, 'units'))
+        self.lista.bind('<Button-4>', lambda e: self._mover(-1, 'units'))
+        self.lista.bind('<Button-5>', lambda e: self._mover(1, 'units'))
+        self.lista.bind('<Prior>', lambda e: self._mover(-1, 'pages'))
+        self.lista.bind('<Next>', lambda e: self._mover(1, 'pages'))
+        self._desenhar()
+
+    def set_fonte(self, total, linha):
+        self.total = total
+        self.linha = linha
+        self.offset = 0
+        self._desenhar()
+
+    def _redimensionar(self, event):
+        visiveis = max(1, event.height // self._altura_linha)
+        if visiveis != self.visiveis:
+            self.visiveis = visiveis
+            self._desenhar()
+
+    def _rolar(self, acao, valor, unidade=None):
+        if acao == 'moveto':
+            self._ir_para(int(float(valor) * self.total))
+        else:
+            self._mover(int(valor), unidade)
+        return 'break'
+
+    def _mover(self, n, unidade):
+        passo = self.visiveis if unidade == 'pages' else 1
+        self._ir_para(self.offset + n * passo)
+        return 'break'
+
+    def _ir_para(self, offset):
+        offset = max(0, min(offset, self.total - self.visiveis))
+        if offset != self.offset:
+            self.offset = offset
+            self._desenhar()
+
+    def _desenhar(self):
+        fim = min(self.offset + self.visiveis, self.total)
+        self.lista.delete(0, tk.END)
+        if self.linha is not None:
+            for i in range(self.offset, fim):
+                self.lista.insert(tk.END, self.linha(i))
+        if self.total:
+            self.barra.set(self.offset / self.total, fim / self.total)
+        else:
+            self.barra.set(0, 1)
@@ -0,0 +1,310 @@
+"""
+Instrumentação de latência e erros das operações bancárias.
+
+Métodos decorados com @medir("nome") contam chamadas, erros (por mensagem)
+e latência em um histograma, separados por tipo de conta. A coleta é
+desligada por padrão: os wrappers de medição só são instalados nas classes
+quando METRICAS.ativo passa a True e são removidos ao voltar a False, então
+o modo desligado não tem custo por chamada. Cada thread acumula as suas
+séries sem lock; o snapshot soma as séries de todas as threads (as de
+threads encerradas são consolidadas nele). Os snapshots podem ser
+exportados em JSON ou no formato texto do Prometheus, para arquivo ou socket
+(json e socket só são importados na exportação, para não pesar no início).
+"""
+import functools
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Limites superiores dos buckets do histograma, em nanossegundos (1µs a 10s).
+LIMITES_NS = [int(m * 10 ** e) for e in range(3, 10) for m in (1, 2, 5)] + [10 ** 10]
+
+
+class _Serie:
+    __slots__ = ("chamadas", "soma_ns", "buckets", "erros")
+
+    def __init__(self):
+        self.chamadas = 0
+        self.soma_ns = 0
+        self.buckets = [0] * (len(LIMITES_NS) + 1)
+        self.erros = {}
+
+
+class Metricas:
+    """Registro de métricas por (operação, tipo de conta)."""
+    def __init__(self, ativo=False):
+        self._ativo = False
+        self._metodos = []
+        self._lock = threading.Lock()
+        self._locais = {}         # operação -> threading.local com as séries da thread
+        self._por_thread = []     # (thread, operação, séries da thread por tipo)
+        self._encerradas = {}     # séries somadas das threads já encerradas
+        self.ativo = ativo
+
+    @property
+    def ativo(self):
+        return self._ativo
+
+    @ativo.setter
+    def ativo(self, valor):
+        valor = bool(valor)
+        if valor != self._ativo:
+            self._ativo = valor
+            for classe, nome, fn, operacao in self._metodos:
+                setattr(classe, nome, self._envolver(fn, operacao) if valor else fn)
+
+    def _registrar_metodo(self, classe, nome, fn, operacao):
+        self._metodos.append((classe, nome, fn, operacao))
+        if self._ativo:
+            setattr(classe, nome, self._envolver(fn, operacao))
+
+    def _local(self, operacao):
+        local = self._locais.get(operacao)
+        if local is None:
+            with self._lock:
+                local = self._locais.setdefault(operacao, threading.local())
+        return local
+
+    def _envolver(self, fn, operacao):
+        """
+        Wrapper de `fn` com a mesma lista de parâmetros (sem *args/**kwargs,
+        cujo repasse custa mais que a própria medição) e o registro em linha
+        na série da thread para o tipo do objeto.
+        """
+        parametros, chamada = _parametros(fn)
+        obj = parametros[0]
+        codigo = f"""def medido({", ".join(parametros)}):
+    _t0 = _relogio()
+    try:
+        _resultado = _fn({", ".join(chamada)})
+    except Exception as _e:
+        _registrar(_operacao, type({obj}), _relogio() - _t0, str(_e))
+        raise
+    _duracao_ns = _relogio() - _t0
+    try:
+        _serie = _local.series[type({obj})]
+    except (AttributeError, KeyError):
+        _registrar(_operacao, type({obj}), _duracao_ns)
+        return _resultado
+    _serie.chamadas += 1
+    _serie.soma_ns += _duracao_ns
+    _serie.buckets[_bisect_left(_LIMITES_NS, _duracao_ns)] += 1
+    return _resultado
+"""
+        # Nomes com "_" na frente, para não colidirem com os parâmetros de fn.
+        nomes = {"_fn": fn, "_operacao": operacao, "_registrar": self.registrar,
+                 "_local": self._local(operacao), "_relogio": time.perf_counter_ns,
+                 "_bisect_left": bisect_left, "_LIMITES_NS": LIMITES_NS}
+        exec(codigo, nomes)
+        medido = functools.wraps(fn)(nomes["medido"])
+        medido.__defaults__ = fn.__defaults__
+        medido.__kwdefaults__ = fn.__kwdefaults__
+        return medido
+
+    def registrar(self, operacao, tipo, duracao_ns, erro=None):
+        """Registra uma chamada; `tipo` é o nome do tipo de conta (ou a própria classe)."""
+        local = self._local(operacao)
+        try:
+            series = local.series
+        except AttributeError:
+            series = local.series = {}
+            with self._lock:
+                self._por_thread.append((threading.current_thread(), operacao, series))
+        serie = series.get(tipo)
+        if serie is None:
+            serie = series[tipo] = _Serie()
+        serie.chamadas += 1
+        serie.soma_ns += duracao_ns
+        serie.buckets[bisect_left(LIMITES_NS, duracao_ns)] += 1
+        if erro is not None:
+            serie.erros[erro] = serie.erros.get(erro, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            # As threads vivas continuam com as suas séries (os wrappers as
+            # acham pelo threading.local); basta esvaziá-las.
+            self._por_thread = [(thread, operacao, series)
+                                for thread, operacao, series in self._por_thread
+                                if thread.is_alive()]
+            for _, _, series in self._por_thread:
+                series.clear()
+            self._encerradas = {}
+
+    def snapshot(self):
+        with self._lock:
+            vivas = []
+            for thread, operacao, series in self._por_thread:
+                if thread.is_alive():
+                    vivas.append((thread, operacao, series))
+                else:
+                    _somar(self._encerradas, operacao, series)
+            self._por_thread = vivas
+            series = {}
+            for (operacao, tipo), serie in self._encerradas.items():
+                _somar(series, operacao, {tipo: serie})
+            for _, operacao, s in vivas:
+                _somar(series, operacao, s)
+        resultado = {}
+        for (operacao, tipo), s in sorted(series.items()):
+            chamadas, soma_ns, buckets, erros = s.chamadas, s.soma_ns, s.buckets, s.erros
+            resultado.setdefault(operacao, {})[tipo] = {
+                "chamadas": chamadas,
+                "erros": erros,
+                "latencia_media_us": soma_ns / chamadas / 1000 if chamadas else 0.0,
+                "latencia_p50_us": _percentil(buckets, chamadas, 0.50),
+                "latencia_p99_us": _percentil(buckets, chamadas, 0.99),
+                "buckets_ns": dict(zip([str(l) for l in LIMITES_NS] + ["+Inf"], buckets)),
+                "soma_ns": soma_ns,
+            }
+        return {"timestamp": time.time(), "operacoes": resultado}
+
+    def to_json(self):
+        import json
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        snap = self.snapshot()["operacoes"]
+        linhas = [
+            "# HELP sistema_bancario_operacoes_total Chamadas por operação e tipo de conta.",
+            "# TYPE sistema_bancario_operacoes_total counter",
+        ]
+        for operacao, tipos in snap.items():
+            for tipo, d in tipos.items():
+                linhas.append(f'sistema_bancario_operacoes_total{{operacao="{operacao}",tipo="{tipo}"}} '
+                              f'{d["chamadas"]}')
+        linhas += [
+            "# HELP sistema_bancario_erros_total Operações rejeitadas por mensagem de erro.",
+            "# TYPE sistema_bancario_erros_total counter",
+        ]
+        for operacao, tipos in snap.items():
+            for tipo, d in tipos.items():
+                for erro, n in d["erros"].items():
+                    erro = erro.replace("\\", "\\\\").replace('"', '\\"')
+                    linhas.append(f'sistema_bancario_erros_total{{operacao="{operacao}",tipo="{tipo}",'
+                                  f'erro="{erro}"}} {n}')
+        linhas += [
+            "# HELP sistema_bancario_latencia_segundos Latência das operações.",
+            "# TYPE sistema_bancario_latencia_segundos histogram",
+        ]
+        for operacao, tipos in snap.items():
+            for tipo, d in tipos.items():
+                rotulo = f'operacao="{operacao}",tipo="{tipo}"'
+                acumulado = 0
+                for limite, n in d["buckets_ns"].items():
+                    acumulado += n
+                    le = limite if limite == "+Inf" else repr(int(limite) / 1e9)
+                    linhas.append(f'sistema_bancario_latencia_segundos_bucket{{{rotulo},le="{le}"}} '
+                                  f'{acumulado}')
+                linhas.append(f"sistema_bancario_latencia_segundos_sum{{{rotulo}}} {d['soma_ns'] / 1e9}")
+                linhas.append(f"sistema_bancario_latencia_segundos_count{{{rotulo}}} {d['chamadas']}")
+        return "\n".join(linhas) + "\n"
+
+    def exportar(self, destino, formato="json"):
+        """
+        Exporta um snapshot em `formato` ("json" ou "prometheus").
+        `destino` é o caminho de um arquivo (gravado de forma atômica) ou um
+        par (host, porta) para envio por TCP.
+        """
+        if formato == "json":
+            texto = self.to_json()
+        elif formato == "prometheus":
+            texto = self.to_prometheus()
+        else:
+            raise ValueError(f"Formato desconhecido: {formato}")
+        dados = texto.encode("utf-8")
+        if isinstance(destino, tuple):
+            import socket
+            with socket.create_connection(destino, timeout=5) as s:
+                s.sendall(dados)
+        else:
+            tmp = f"{destino}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(dados)
+            os.replace(tmp, destino)
+
+
+def _somar(destino, operacao, series):
+    """
+    Acumula as séries de `operacao` (por tipo) em `destino`, por (operação,
+    nome do tipo); copia, pois as séries de origem seguem em uso.
+    """
+    for tipo, s in list(series.items()):
+        chave = (operacao, tipo if isinstance(tipo, str) else tipo.__name__)
+        d = destino.get(chave)
+        if d is None:
+            d = destino[chave] = _Serie()
+        d.chamadas += s.chamadas
+        d.soma_ns += s.soma_ns
+        d.buckets = [a + b for a, b in zip(d.buckets, s.buckets)]
+        for erro, n in list(s.erros.items()):
+            d.erros[erro] = d.erros.get(erro, 0) + n
+
+
+def _parametros(fn):
+    """Parâmetros de `fn` para a definição do wrapper e os argumentos da chamada a `fn`."""
+    parametros, chamada = [], []
+    estrela = barra = False
+    for p in inspect.signature(fn).parameters.values():
+        if p.kind is not p.POSITIONAL_ONLY and barra is None:
+            parametros.append("/")
+            barra = True
+        if p.kind is p.POSITIONAL_ONLY:
+            barra = None
+            parametros.append(p.name)
+            chamada.append(p.name)
+        elif p.kind is p.VAR_POSITIONAL:
+            estrela = True
+            parametros.append(f"*{p.name}")
+            chamada.append(f"*{p.name}")
+        elif p.kind is p.VAR_KEYWORD:
+            parametros.append(f"**{p.name}")
+            chamada.append(f"**{p.name}")
+        elif p.kind is p.KEYWORD_ONLY:
+            if not estrela:
+                parametros.append("*")
+                estrela = True
+            parametros.append(p.name)
+            chamada.append(f"{p.name}={p.name}")
+        else:
+            parametros.append(p.name)
+            chamada.append(p.name)
+    if barra is None:
+        parametros.append("/")
+    return parametros, chamada
+
+
+def _percentil(buckets, total, q):
+    """Limite superior (µs) do bucket que contém o percentil q."""
+    if not total:
+        return 0.0
+    alvo = q * total
+    acumulado = 0
+    for limite, n in zip(LIMITES_NS, buckets):
+        acumulado += n
+        if acumulado >= alvo:
+            return limite / 1000
+    return float("inf")
+
+
+METRICAS = Metricas()
+
+
+class _Medido:
+    """Marca um método para instrumentação; na criação da classe, devolve o original."""
+    def __init__(self, fn, operacao, registro):
+        self.fn = fn
+        self.operacao = operacao
+        self.registro = registro
+
+    def __set_name__(self, classe, nome):
+        setattr(classe, nome, self.fn)
+        self.registro._registrar_metodo(classe, nome, self.fn, self.operacao)
+
+
+def medir(operacao, registro=METRICAS):
+    """Decorador de método: registra latência e erros em `registro` quando ativo."""
+    def decorador(fn):
+        return _Medido(fn, operacao, registro)
+    return decorador
@@ -0,0 +1,250 @@
+"""
+Bank particionado por agência entre processos.
+
+Cada partição (shard) é um processo com o seu próprio Bank. O roteador
+(ShardedBank), no processo chamador, encaminha cada operação para a partição
+da agência. Transferências entre partições usam um protocolo de duas fases:
+o valor é reservado na origem e a conta de destino é confirmada antes que
+qualquer lado seja efetivado, de modo que dinheiro nunca é criado nem perdido.
+"""
+import itertools
+import multiprocessing
+import os
+import threading
+import zlib
+from datetime import datetime
+
+from SistemaBancario import Bank
+
+
+def _worker(conn):
+    bank = Bank()
+    pendentes = {}
+
+    def add_account(account):
+        bank.add_account(account)
+
+    def find_account(agencia, conta):
+        return bank.find_account(agencia, conta)
+
+    def prepare_debit(txid, agencia, conta, amount, ref):
+        acc = bank._get_account(agencia, conta)
+        if amount <= 0:
+            raise ValueError("O valor da transferência deve ser positivo.")
+        with acc._lock:
+            if acc.saldo - amount < acc.saldo_minimo():
+                raise ValueError("Saldo insuficiente para transferência.")
+            # Reserva: o saldo já reflete a saída; o lançamento vem no commit.
+            acc.saldo -= amount
+        pendentes[txid] = ("debito", acc, amount, ref)
+
+    def prepare_credit(txid, agencia, conta, amount, ref):
+        acc = bank._get_account(agencia, conta)
+        pendentes[txid] = ("credito", acc, amount, ref)
+
+    def commit(txid, data):
+        lado, acc, amount, ref = pendentes.pop(txid)
+        with acc._lock:
+            if lado == "debito":
+                return acc.transactions.record("Transferência - Enviada", -amount, data, ref)
+            acc.saldo += amount
+            return acc.transactions.record("Transferência - Recebida", amount, data, ref)
+
+    def abort(txid):
+        item = pendentes.pop(txid, None)
+        if item is not None and item[0] == "debito":
+            _, acc, amount, _ = item
+            with acc._lock:
+                acc.saldo += amount
+
+    def apply_batch(ops):
+        return [None if r is None else str(r) for r in bank.apply_batch(ops, atomic=False)]
+
+    def total():
+        return sum(acc.saldo for acc in bank.accounts), len(bank.accounts)
+
+    metodos = {
+        "add_account": add_account,
+        "find_account": find_account,
+        "deposit": bank.deposit,
+        "withdraw": bank.withdraw,
+        "transfer": bank.transfer,
+        "prepare_debit": prepare_debit,
+        "prepare_credit": prepare_credit,
+        "commit": commit,
+        "abort": abort,
+        "apply_batch": apply_batch,
+        "total": total,
+        "agregados": bank.agregados,
+    }
+    while True:
+        try:
+            metodo, args = conn.recv()
+        except EOFError:
+            return
+        if metodo == "close":
+            conn.send((True, None))
+            return
+        try:
+            conn.send((True, metodos[metodo](*args)))
+        except ValueError as e:
+            conn.send((False, str(e)))
+        except Exception as e:
+            # Qualquer outra falha também vira resposta; sem ela o roteador
+            # ficaria esperando para sempre no recv.
+            conn.send((False, repr(e)))
+
+
+def shard_of(agencia, n_shards):
+    return zlib.crc32(agencia.encode("utf-8")) % n_shards
+
+
+class ShardedBank:
+    """
+    Roteador para um Bank particionado por agência em `n_shards` processos.
+
+    find_account devolve uma cópia da conta (o objeto vivo pertence ao
+    processo da partição). deposit, withdraw e transfer têm a mesma assinatura
+    e o mesmo retorno dos métodos de Bank, também entre partições. Pode ser
+    usado por várias threads: cada partição é acessada por um canal protegido
+    por lock próprio.
+    """
+    def __init__(self, n_shards=None):
+        self.n_shards = n_shards or os.cpu_count() or 1
+        self._conns = []
+        self._procs = []
+        self._locks = []
+        self._txids = itertools.count(1)
+        for _ in range(self.n_shards):
+            pai, filho = multiprocessing.Pipe()
+            proc = multiprocessing.Process(target=_worker, args=(filho,), daemon=True)
+            proc.start()
+            filho.close()
+            self._conns.append(pai)
+            self._procs.append(proc)
+            self._locks.append(threading.Lock())
+
+    def _call(self, shard, metodo, *args):
+        with self._locks[shard]:
+            self._conns[shard].send((metodo, args))
+            ok, resultado = self._conns[shard].recv()
+        if not ok:
+            raise ValueError(resultado)
+        return resultado
+
+    def _shard(self, agencia):
+        return shard_of(agencia, self.n_shards)
+
+    def add_account(self, account):
+        self._call(self._shard(account.agencia), "add_account", account)
+
+    def find_account(self, agencia, conta):
+        return self._call(self._shard(agencia), "find_account", agencia, conta)
+
+    def deposit(self, agencia, conta, amount, origem=""):
+        return self._call(self._shard(agencia), "deposit", agencia, conta, amount, origem)
+
+    def withdraw(self, agencia, conta, amount):
+        return self._call(self._shard(agencia), "withdraw", agencia, conta, amount)
+
+    def transfer(self, agencia, conta, agencia_destino, conta_destino, amount):
+        origem, destino = self._shard(agencia), self._shard(agencia_destino)
+        if origem == destino:
+            return self._call(origem, "transfer", agencia, conta,
+                              agencia_destino, conta_destino, amount)
+        return self._transfer_2pc(origem, destino, agencia, conta,
+                                  agencia_destino, conta_destino, amount)
+
+    def _transfer_2pc(self, origem, destino, agencia, conta,
+                      agencia_destino, conta_destino, amount):
+        txid = next(self._txids)
+        try:
+            self._call(destino, "prepare_credit", txid, agencia_destino, conta_destino, amount, conta)
+            self._call(origem, "prepare_debit", txid, agencia, conta, amount, conta_destino)
+            data = datetime.now()
+            t2 = self._call(destino, "commit", txid, data)
+        except BaseException:
+            # Nada foi efetivado: desfaz as reservas. abort de uma transação
+            # não preparada não faz nada, então as duas partições recebem o
+            # abort mesmo que a falha tenha vindo antes ou durante o prepare.
+            self._abortar(txid, origem, destino)
+            raise
+        try:
+            t1 = self._call(origem, "commit", txid, data)
+        except BaseException as e:
+            # O crédito já foi efetivado no destino; desfazer a reserva da
+            # origem criaria dinheiro. O saldo da origem já reflete a saída.
+            raise ValueError(f"Transferência {txid}: crédito efetivado, mas o lançamento "
+                             f"na origem (partição {origem}) não foi confirmado: {e!r}") from e
+        return t1, t2
+
+    def _abortar(self, txid, origem, destino):
+        """Desfaz as reservas de `txid`; levanta ValueError se a da origem ficar pendente."""
+        for shard in (destino, origem):
+            try:
+                self._call(shard, "abort", txid)
+            except Exception as e:
+                if shard == origem:
+                    raise ValueError(f"Transferência {txid}: não foi possível desfazer a reserva "
+                                     f"na origem (partição {origem}): {e!r}") from e
+
+    def apply_batch(self, ops):
+        """
+        Aplica um lote (mesmo formato de Bank.apply_batch) com resultado por
+        operação: None se aplicada ou a mensagem de erro. As operações de cada
+        partição são enviadas a todas as partições antes de aguardar qualquer
+        resposta, de modo que executem em paralelo; transferências entre
+        partições são feitas em seguida, uma a uma, pelo protocolo de duas fases.
+        """
+        resultados = [None] * len(ops)
+        por_shard = [[] for _ in range(self.n_shards)]
+        cruzadas = []
+        for i, op in enumerate(ops):
+            shard = self._shard(op[1])
+            if op[0] == "transfer" and self._shard(op[3]) != shard:
+                cruzadas.append(i)
+            else:
+                por_shard[shard].append(i)
+        ativos = [s for s in range(self.n_shards) if por_shard[s]]
+        for s in ativos:
+            self._locks[s].acquire()
+        try:
+            for s in ativos:
+                self._conns[s].send(("apply_batch", ([ops[i] for i in por_shard[s]],)))
+            for s in ativos:
+                ok, parciais = self._conns[s].recv()
+                for i, r in zip(por_shard[s], parciais if ok else [parciais] * len(por_shard[s])):
+                    resultados[i] = r
+        finally:
+            for s in ativos:
+                self._locks[s].release()
+        for i in cruzadas:
+            _, ag, ct, ag_d, ct_d, amount = ops[i]
+            try:
+                self._transfer_2pc(self._shard(ag), self._shard(ag_d), ag, ct, ag_d, ct_d, amount)
+            except ValueError as e:
+                resultados[i] = str(e)
+        return resultados
+
+    def total(self):
+        """Soma dos saldos e número de contas em todas as partições."""
+        saldo = contas = 0
+        for s in range(self.n_shards):
+            parcial, n = self._call(s, "total")
+            saldo += parcial
+            contas += n
+        return saldo, contas
+
+    def agregados(self, agencia):
+        """Agregados da agência, mantidos pela partição que a contém."""
+        return self._call(self._shard(agencia), "agregados", agencia)
+
+    def close(self):
+        for s in range(self.n_shards):
+            try:
+                self._call(s, "close")
+            except (EOFError, OSError):
+                pass
+            self._conns[s].close()
+        for proc in self._procs:
+            proc.join()
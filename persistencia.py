@@ -0,0 +1,386 @@
+"""
+Persistência do Bank em disco: journal binário append-only com group commit
+e snapshots periódicos.
+
+Layout do diretório:
+    snapshot.bin            último snapshot (estado completo das contas)
+    journal.<n>.log         segmentos do journal; o snapshot indica a partir
+                            de qual segmento o replay deve começar
+
+Na abertura, o último snapshot é carregado e apenas os segmentos posteriores
+a ele são reaplicados.
+
+Ordem de gravação: Persistencia é um observador do Bank, então cada registro
+é montado e enfileirado no journal depois que a operação já alterou a
+memória, ainda sob os locks das contas (o que mantém no journal a ordem em
+que as operações foram aplicadas). Com sync_commit, a espera pelo fsync do
+group commit também acontece sob esses locks: outras threads que usam as
+mesmas contas esperam pelo disco. Com sync_commit=False a operação retorna
+sem esperar, e flush() garante a durabilidade de tudo que já foi registrado.
+
+Se a gravação falhar (OSError), a operação que a espera levanta o erro, mas
+a alteração já está em memória e não será reaplicada na recuperação. O
+journal fica então inutilizado: todo registro seguinte levanta o mesmo erro,
+e o estado durável é o da recuperação (open()) a partir do disco.
+"""
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+
+from SistemaBancario import Bank, from_micros, lock_accounts, to_micros
+
+_HEADER = struct.Struct("<II")      # tamanho do payload, crc32 do payload
+_OP = struct.Struct("<Bq")          # código da operação, timestamp (µs)
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_F64 = struct.Struct("<d")
+
+_SNAPSHOT_MAGIC = b"SBSNAP1\n"
+
+_OPS = ["add_account", "remove_account", "update_address", "deposit",
+        "withdraw", "transfer", "aplicar_rendimento", "cobrar_taxa", "deletion_requested"]
+_OP_CODES = {op: i for i, op in enumerate(_OPS)}
+
+
+def encode_record(op, ts, strs=(), nums=(), blob=b""):
+    partes = [_OP.pack(_OP_CODES[op], ts), _U8.pack(len(strs))]
+    for s in strs:
+        b = s.encode("utf-8")
+        partes.append(_U16.pack(len(b)))
+        partes.append(b)
+    partes.append(_U8.pack(len(nums)))
+    partes.extend(_F64.pack(n) for n in nums)
+    partes.append(_U32.pack(len(blob)))
+    partes.append(blob)
+    return b"".join(partes)
+
+
+def decode_record(payload):
+    codigo, ts = _OP.unpack_from(payload, 0)
+    pos = _OP.size
+    (n,) = _U8.unpack_from(payload, pos)
+    pos += 1
+    strs = []
+    for _ in range(n):
+        (tam,) = _U16.unpack_from(payload, pos)
+        pos += 2
+        strs.append(payload[pos:pos + tam].decode("utf-8"))
+        pos += tam
+    (n,) = _U8.unpack_from(payload, pos)
+    pos += 1
+    nums = [_F64.unpack_from(payload, pos + 8 * i)[0] for i in range(n)]
+    pos += 8 * n
+    (tam,) = _U32.unpack_from(payload, pos)
+    pos += 4
+    return _OPS[codigo], ts, strs, nums, payload[pos:pos + tam]
+
+
+def read_records(path, truncate_torn_tail=False):
+    """
+    Lê os registros de um segmento do journal.
+    Um registro incompleto ou com crc inválido no fim do arquivo (escrita
+    interrompida) encerra a leitura; com truncate_torn_tail o arquivo é
+    cortado nesse ponto.
+    """
+    with open(path, "rb") as f:
+        dados = f.read()
+    pos = 0
+    registros = []
+    while pos + _HEADER.size <= len(dados):
+        tam, crc = _HEADER.unpack_from(dados, pos)
+        fim = pos + _HEADER.size + tam
+        payload = dados[pos + _HEADER.size:fim]
+        if fim > len(dados) or zlib.crc32(payload) != crc:
+            break
+        registros.append(decode_record(payload))
+        pos = fim
+    if truncate_torn_tail and pos < len(dados):
+        with open(path, "r+b") as f:
+            f.truncate(pos)
+    return registros
+
+
+class Journal:
+    """
+    Segmento de journal append-only com group commit.
+    Uma thread de escrita grava de uma vez todos os registros pendentes e faz
+    um único fsync por lote; sob carga, os registros que chegam durante um
+    fsync são agrupados no próximo. Com sync_commit, append só retorna quando
+    o registro está em disco.
+    """
+    def __init__(self, path, sync_commit=True, group_delay=0.0):
+        self.path = path
+        self.sync_commit = sync_commit
+        self.group_delay = group_delay
+        self.commits = 0
+        self._file = open(path, "ab")
+        self._cond = threading.Condition()
+        self._pending = []
+        self._appended = 0
+        self._durable = 0
+        self._closed = False
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="journal", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, payload):
+        """Enfileira um registro e retorna seu número de sequência."""
+        rec = _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._cond:
+            if self._closed:
+                raise ValueError("Journal fechado.")
+            if self._error is not None:
+                # A thread de escrita parou; o registro nunca chegaria ao disco.
+                raise self._error
+            self._pending.append(rec)
+            self._appended += 1
+            self._cond.notify_all()
+            return self._appended
+
+    def wait(self, seq):
+        """Bloqueia até o registro `seq` estar em disco."""
+        with self._cond:
+            while self._durable < seq and self._error is None:
+                self._cond.wait()
+            if self._error is not None:
+                raise self._error
+
+    def append(self, payload):
+        seq = self.enqueue(payload)
+        if self.sync_commit:
+            self.wait(seq)
+        return seq
+
+    def flush(self):
+        with self._cond:
+            seq = self._appended
+        self.wait(seq)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+            if self.group_delay:
+                time.sleep(self.group_delay)
+            with self._cond:
+                lote, self._pending = self._pending, []
+                ate = self._appended
+            try:
+                self._file.write(b"".join(lote))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError as e:
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._durable = ate
+                self.commits += 1
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._file.close()
+
+
+def segmentos(diretorio):
+    """Números dos segmentos do journal em `diretorio`, em ordem."""
+    nums = []
+    for nome in os.listdir(diretorio):
+        if nome.startswith("journal.") and nome.endswith(".log"):
+            nums.append(int(nome[len("journal."):-len(".log")]))
+    return sorted(nums)
+
+
+def recuperar(diretorio, truncate_torn_tail=False):
+    """
+    Reconstrói o Bank de `diretorio`: carrega o snapshot e reaplica os
+    segmentos posteriores a ele. Retorna (bank, último segmento, número de
+    registros reaplicados). Com truncate_torn_tail, um registro incompleto
+    no fim do último segmento é cortado do arquivo.
+    """
+    bank, inicio = Bank(), 1
+    caminho = os.path.join(diretorio, "snapshot.bin")
+    if os.path.exists(caminho):
+        with open(caminho, "rb") as f:
+            if f.read(len(_SNAPSHOT_MAGIC)) != _SNAPSHOT_MAGIC:
+                raise ValueError("Snapshot inválido.")
+            estado = pickle.load(f)
+        inicio = estado["segmento"]
+        bank.add_accounts(estado["contas"])
+    pendentes = [n for n in segmentos(diretorio) if n >= inicio]
+    registros = 0
+    for n in pendentes:
+        ultimo = n == pendentes[-1]
+        caminho = os.path.join(diretorio, f"journal.{n:06d}.log")
+        for registro in read_records(caminho, truncate_torn_tail=truncate_torn_tail and ultimo):
+            replay(bank, *registro)
+            registros += 1
+    return bank, pendentes[-1] if pendentes else inicio, registros
+
+
+class Persistencia:
+    """
+    Mantém um Bank durável em `diretorio`.
+
+    open() recupera o estado (snapshot + replay do journal) e passa a
+    registrar cada deposit, withdraw, transfer, aplicar_rendimento, cobrar_taxa,
+    update_address, add_account, remove_account e mudança de deletion_requested.
+    A cada `snapshot_every` registros um novo snapshot é gravado e os
+    segmentos antigos são apagados.
+    """
+    def __init__(self, diretorio, snapshot_every=100_000, sync_commit=True, group_delay=0.0):
+        self.diretorio = diretorio
+        self.snapshot_every = snapshot_every
+        self.sync_commit = sync_commit
+        self.group_delay = group_delay
+        self.bank = None
+        self._journal = None
+        self._segmento = 0
+        self._registros = 0
+        self._lock = threading.Lock()
+        self._snapshot_em_andamento = False
+
+    def _caminho_segmento(self, n):
+        return os.path.join(self.diretorio, f"journal.{n:06d}.log")
+
+    def _segmentos(self):
+        return segmentos(self.diretorio)
+
+    def _novo_journal(self, n):
+        return Journal(self._caminho_segmento(n), self.sync_commit, self.group_delay)
+
+    def open(self):
+        os.makedirs(self.diretorio, exist_ok=True)
+        bank, self._segmento, _ = recuperar(self.diretorio, truncate_torn_tail=True)
+        self._journal = self._novo_journal(self._segmento)
+        self.bank = bank
+        bank.add_observer(self._on_event)
+        return bank
+
+    def _on_event(self, evento, account, *args):
+        payload = encode_event(evento, account, *args)
+        with self._lock:
+            journal = self._journal
+            seq = journal.enqueue(payload)
+            self._registros += 1
+            fazer_snapshot = (self._registros >= self.snapshot_every
+                              and not self._snapshot_em_andamento)
+            if fazer_snapshot:
+                self._snapshot_em_andamento = True
+        if self.sync_commit:
+            journal.wait(seq)
+        if fazer_snapshot:
+            # Esta thread está com locks de contas; o snapshot precisa de
+            # todos eles na ordem canônica, então roda em outra thread.
+            threading.Thread(target=self.snapshot, name="snapshot", daemon=True).start()
+
+    def snapshot(self):
+        """
+        Grava o estado completo e inicia um novo segmento do journal.
+        Bloqueia o registro de contas e todas as contas enquanto troca de
+        segmento, de modo que o snapshot corresponda exatamente aos
+        segmentos anteriores ao novo. Não deve ser chamado com locks de
+        contas já adquiridos.
+        """
+        bank = self.bank
+        try:
+            with bank._lock, lock_accounts(*bank.accounts):
+                self._gravar_snapshot()
+        finally:
+            self._snapshot_em_andamento = False
+
+    def _gravar_snapshot(self):
+        with self._lock:
+            antigo = self._journal
+            self._segmento += 1
+            self._journal = self._novo_journal(self._segmento)
+            self._registros = 0
+            antigo.close()
+            estado = {"segmento": self._segmento, "contas": list(self.bank.accounts)}
+            caminho = os.path.join(self.diretorio, "snapshot.bin")
+            tmp = caminho + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(_SNAPSHOT_MAGIC)
+                pickle.dump(estado, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, caminho)
+            for n in self._segmentos():
+                if n < self._segmento:
+                    os.remove(self._caminho_segmento(n))
+
+    def close(self):
+        if self.bank is not None:
+            self.bank.remove_observer(self._on_event)
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+def encode_event(evento, account, *args):
+    chave = (account.agencia, account.conta)
+    if evento == "add_account":
+        return encode_record(evento, to_micros(datetime.now()), chave,
+                             blob=pickle.dumps(account, pickle.HIGHEST_PROTOCOL))
+    if evento == "remove_account":
+        return encode_record(evento, to_micros(datetime.now()), chave)
+    if evento == "update_address":
+        (endereco,) = args
+        return encode_record(evento, to_micros(datetime.now()), chave + (endereco,))
+    if evento == "deposit":
+        amount, origem, data = args
+        return encode_record(evento, to_micros(data), chave + (origem,), (amount,))
+    if evento == "withdraw":
+        amount, data = args
+        return encode_record(evento, to_micros(data), chave, (amount,))
+    if evento == "transfer":
+        destino, amount, data = args
+        return encode_record(evento, to_micros(data),
+                             chave + (destino.agencia, destino.conta), (amount,))
+    if evento in ("aplicar_rendimento", "cobrar_taxa"):
+        valor, data = args
+        return encode_record(evento, to_micros(data), chave, (valor,))
+    if evento == "deletion_requested":
+        (solicitada,) = args
+        return encode_record(evento, to_micros(datetime.now()), chave, (float(solicitada),))
+    raise ValueError(f"Evento desconhecido: {evento}")
+
+
+def replay(bank, op, ts, strs, nums, blob):
+    """Reaplica um registro do journal sobre `bank`."""
+    if op == "add_account":
+        bank.add_account(pickle.loads(blob))
+        return
+    acc = bank.find_account(strs[0], strs[1])
+    if acc is None:
+        raise ValueError(f"Replay: conta {strs[0]}/{strs[1]} não encontrada.")
+    data = from_micros(ts)
+    if op == "remove_account":
+        bank.remove_account(acc)
+    elif op == "update_address":
+        acc.update_address(strs[2])
+    elif op == "deposit":
+        acc.deposit(nums[0], strs[2], data)
+    elif op == "withdraw":
+        acc.withdraw(nums[0], data)
+    elif op == "transfer":
+        acc.transfer(bank.find_account(strs[2], strs[3]), nums[0], data)
+    elif op == "aplicar_rendimento":
+        acc._creditar_rendimento(nums[0], data)
+    elif op == "cobrar_taxa":
+        acc._debitar_taxa(nums[0], data)
+    elif op == "deletion_requested":
+        acc.deletion_requested = bool(nums[0])
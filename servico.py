@@ -0,0 +1,233 @@
+"""
+Serviço TCP local (asyncio) para o núcleo bancário.
+
+Protocolo: uma requisição JSON por linha; as respostas, também uma por
+linha, saem na ordem das requisições da conexão.
+    {"id": 1, "op": "deposit", "args": ["0001", "123", 50.0, "Caixa"]}
+    {"id": 1, "ok": true, "resultado": 1050.0}
+    {"id": 2, "ok": false, "erro": "Agência ou conta não encontrada."}
+Qualquer falha numa requisição vira uma resposta com "ok": false; a conexão
+continua aberta.
+Uma linha com uma lista de requisições é um lote, respondido por uma lista
+na mesma ordem.
+
+Pipelining: o cliente pode enviar várias requisições sem esperar as
+respostas. O servidor processa de uma vez todas as linhas já recebidas e
+grava as respostas delas com uma única escrita.
+
+Operações (datas em ISO 8601):
+    find_account   agencia, conta -> conta ou null
+    deposit        agencia, conta, valor[, origem] -> saldo após o depósito
+    withdraw       agencia, conta, valor -> saldo após o saque
+    transfer       agencia, conta, agencia_destino, conta_destino, valor -> saldo da origem
+    get_extrato    agencia, conta, inicio[, fim] -> [[data, tipo, valor, info], ...]
+
+Por padrão as operações rodam na própria thread do laço de eventos, o mais
+rápido para o Bank em memória. Com `threads` (por exemplo, sobre um
+SQLiteBank, cujas operações esperam pelo disco), cada bloco de linhas roda
+num pool de threads.
+
+Uso:
+    python servico.py [--host 127.0.0.1] [--porta 8765] [--threads N]
+                      [--carregar contas.bin | --sqlite banco.db | --contas N]
+"""
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from SistemaBancario import Bank, ContaCorrente
+
+LEITURA = 256 * 1024        # bytes lidos do socket de cada vez
+MAX_LINHA = 1024 * 1024     # requisição maior que isso encerra a conexão
+
+_decodificar = json.JSONDecoder().decode
+_codificar = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def _operacoes(bank):
+    """Funções do protocolo por nome de operação; cada uma recebe os args da requisição."""
+    def conta(agencia, numero):
+        return bank._get_account(agencia, numero)
+
+    def find_account(agencia, numero):
+        acc = bank.find_account(agencia, numero)
+        if acc is None:
+            return None
+        return {"agencia": acc.agencia, "conta": acc.conta, "titular": acc.titular,
+                "tipo": "corrente" if isinstance(acc, ContaCorrente) else "poupanca",
+                "saldo": acc.saldo}
+
+    def deposit(agencia, numero, valor, origem=""):
+        acc = conta(agencia, numero)
+        acc.deposit(float(valor), origem)
+        return acc.saldo
+
+    def withdraw(agencia, numero, valor):
+        acc = conta(agencia, numero)
+        acc.withdraw(float(valor))
+        return acc.saldo
+
+    def transfer(agencia, numero, agencia_destino, numero_destino, valor):
+        acc = conta(agencia, numero)
+        acc.transfer(conta(agencia_destino, numero_destino), float(valor))
+        return acc.saldo
+
+    def get_extrato(agencia, numero, inicio, fim=None):
+        inicio = datetime.fromisoformat(inicio)
+        fim = None if fim is None else datetime.fromisoformat(fim)
+        return [[t.data.isoformat(), t.tipo, t.valor, t.info]
+                for t in conta(agencia, numero).get_extrato(inicio, fim)]
+
+    return {
+        "find_account": find_account,
+        "deposit": deposit,
+        "withdraw": withdraw,
+        "transfer": transfer,
+        "get_extrato": get_extrato,
+    }
+
+
+class Servico:
+    """Servidor asyncio sobre um Bank; `threads` > 0 tira as operações do laço de eventos."""
+    def __init__(self, bank, threads=0):
+        self.bank = bank
+        self._operacoes = _operacoes(bank)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="servico") if threads else None
+        self._servidor = None
+
+    async def iniciar(self, host="127.0.0.1", porta=8765):
+        """Começa a aceitar conexões; retorna (host, porta) efetivos (porta 0 escolhe uma livre)."""
+        self._servidor = await asyncio.start_server(self._atender, host, porta, limit=LEITURA)
+        return self._servidor.sockets[0].getsockname()[:2]
+
+    async def servir(self):
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+    def fechar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+    def _executar(self, req):
+        id_ = req.get("id") if isinstance(req, dict) else None
+        try:
+            if not isinstance(req, dict):
+                raise ValueError("A requisição deve ser um objeto JSON.")
+            op = self._operacoes.get(req.get("op"))
+            if op is None:
+                raise ValueError(f"Operação desconhecida: {req.get('op')}")
+            try:
+                return {"id": id_, "ok": True, "resultado": op(*req.get("args", ()))}
+            except TypeError:
+                raise ValueError(f"Argumentos inválidos para {req['op']}.") from None
+        except ValueError as e:
+            return {"id": id_, "ok": False, "erro": str(e)}
+        except Exception as e:
+            # Uma falha inesperada recusa só esta requisição; a conexão e as
+            # demais requisições do bloco seguem normalmente.
+            return {"id": id_, "ok": False, "erro": f"Erro interno: {type(e).__name__}."}
+
+    def _processar(self, linhas):
+        """Respostas de um bloco de linhas completas (bytes, cada uma com o fim de linha)."""
+        respostas = []
+        for linha in b"\n".join(linhas).decode("utf-8", "replace").split("\n"):
+            if not linha.strip():
+                continue
+            try:
+                req = _decodificar(linha)
+            except (ValueError, RecursionError):
+                resposta = {"id": None, "ok": False, "erro": "JSON inválido."}
+            else:
+                if isinstance(req, list):
+                    resposta = [self._executar(r) for r in req]
+                else:
+                    resposta = self._executar(req)
+            respostas.append(_codificar(resposta))
+        respostas.append("")
+        return "\n".join(respostas).encode("utf-8") if len(respostas) > 1 else b""
+
+    async def _atender(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        pendente = b""
+        try:
+            while True:
+                dados = await reader.read(LEITURA)
+                if not dados:
+                    break
+                linhas = (pendente + dados).split(b"\n")
+                pendente = linhas.pop()
+                if len(pendente) > MAX_LINHA:
+                    writer.write(_codificar({"id": None, "ok": False,
+                                             "erro": "Requisição grande demais."}).encode("utf-8") + b"\n")
+                    break
+                if not linhas:
+                    continue
+                if self._pool is None:
+                    saida = self._processar(linhas)
+                else:
+                    saida = await loop.run_in_executor(self._pool, self._processar, linhas)
+                if saida:
+                    writer.write(saida)
+                    await writer.drain()
+        except OSError:
+            # Conexão encerrada ou com erro pelo cliente.
+            pass
+        finally:
+            writer.close()
+
+
+def _argumentos(argv):
+    """Opções da linha de comando (sem argparse, como em cli.py)."""
+    opcoes = {"host": "127.0.0.1", "porta": "8765", "threads": "0"}
+    it = iter(argv)
+    for arg in it:
+        if arg in ("--host", "--porta", "--threads", "--carregar", "--sqlite", "--contas"):
+            opcoes[arg[2:]] = next(it, None)
+        else:
+            sys.exit(__doc__)
+    if None in opcoes.values() or len(opcoes.keys() & {"carregar", "sqlite", "contas"}) > 1:
+        sys.exit(__doc__)
+    return opcoes
+
+
+def _banco(opcoes):
+    if "sqlite" in opcoes:
+        from banco_sqlite import SQLiteBank
+        return SQLiteBank(opcoes["sqlite"])
+    if "contas" in opcoes:
+        from carga import gerar_banco
+        return gerar_banco(int(opcoes["contas"]), 0)
+    bank = Bank()
+    if "carregar" in opcoes:
+        import importacao
+        importacao.importar_binario(bank, opcoes["carregar"])
+    return bank
+
+
+async def _principal(opcoes):
+    servico = Servico(_banco(opcoes), int(opcoes["threads"]))
+    host, porta = await servico.iniciar(opcoes["host"], int(opcoes["porta"]))
+    # Primeira linha da saída: endereço efetivo, para quem iniciou o processo (porta 0).
+    print(json.dumps({"host": host, "porta": porta, "contas": len(servico.bank.accounts)}), flush=True)
+    try:
+        await servico.servir()
+    finally:
+        servico.fechar()
+
+
+def main(argv=None):
+    opcoes = _argumentos(sys.argv[1:] if argv is None else argv)
+    try:
+        asyncio.run(_principal(opcoes))
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as e:
+        sys.exit(f"Erro: {e}")
+
+
+if __name__ == '__main__':
+    main()
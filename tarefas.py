@@ -0,0 +1,191 @@
+"""
+Execução em segundo plano para a interface Tk.
+
+Executor roda chamadas ao backend num pool de threads e devolve resultados,
+erros e progresso à thread da interface por um laço de after(), ativo só
+enquanto houver tarefas. Nenhum widget é tocado fora dessa thread. A função
+da tarefa recebe a Tarefa como primeiro argumento: informa o progresso com
+tarefa.progresso() e, em trabalhos longos, consulta o cancelamento com
+tarefa.verificar() entre etapas. Tarefas de uma tela são canceladas quando
+ela é trocada, e callbacks de telas já destruídas são descartados.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk
+
+
+class Cancelada(Exception):
+    """Levantada na função da tarefa quando ela foi cancelada."""
+
+
+class Tarefa:
+    """Trabalho submetido ao Executor; cancelável e com progresso."""
+    def __init__(self, dono, ao_concluir, ao_falhar, ao_progredir, ao_cancelar):
+        self.dono = dono
+        self.ao_concluir = ao_concluir
+        self.ao_falhar = ao_falhar
+        self.ao_progredir = ao_progredir
+        self.ao_cancelar = ao_cancelar
+        self._cancelada = threading.Event()
+        self._progresso = None
+        self._exibido = None
+        self._future = None
+
+    @property
+    def cancelada(self):
+        return self._cancelada.is_set()
+
+    def cancelar(self):
+        self._cancelada.set()
+        if self._future is not None:
+            self._future.cancel()
+
+    def verificar(self):
+        if self._cancelada.is_set():
+            raise Cancelada()
+
+    def progresso(self, feito, total=None, texto=""):
+        """Registra o progresso (a interface vê só o mais recente) e verifica o cancelamento."""
+        self._progresso = (feito, total, texto)
+        self.verificar()
+
+
+def _existe(widget):
+    return widget is None or bool(widget.winfo_exists())
+
+
+class Executor:
+    """
+    Pool de `workers` threads ligado à janela `raiz`. Resultados são
+    entregues a cada `intervalo_ms`; `ao_falhar` é o tratamento de erro
+    padrão das tarefas.
+    """
+    def __init__(self, raiz, workers=4, intervalo_ms=30, ao_falhar=None):
+        self.raiz = raiz
+        self.intervalo_ms = intervalo_ms
+        self.ao_falhar = ao_falhar
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tarefa")
+        self._resultados = queue.SimpleQueue()
+        self._ativas = set()
+        self._agendado = None
+
+    def executar(self, dono, funcao, *args, ao_concluir=None, ao_falhar=None,
+                 ao_progredir=None, ao_cancelar=None, barra=None):
+        """
+        Roda funcao(tarefa, *args) no pool e retorna a Tarefa. Os callbacks
+        rodam na thread da interface: ao_concluir(resultado), ao_falhar(erro),
+        ao_progredir(feito, total, texto) e ao_cancelar(). Com `barra`
+        (BarraProgresso), o progresso e o fim da tarefa são exibidos nela.
+        """
+        tarefa = Tarefa(dono, ao_concluir, ao_falhar or self.ao_falhar, ao_progredir, ao_cancelar)
+        if barra is not None:
+            barra.acompanhar(tarefa)
+        tarefa._future = self._pool.submit(self._rodar, tarefa, funcao, args)
+        self._ativas.add(tarefa)
+        self._agendar()
+        return tarefa
+
+    def _rodar(self, tarefa, funcao, args):
+        try:
+            tarefa.verificar()
+            self._resultados.put((tarefa, True, funcao(tarefa, *args)))
+        except Cancelada:
+            self._resultados.put((tarefa, None, None))
+        except Exception as e:
+            self._resultados.put((tarefa, False, e))
+
+    def _agendar(self):
+        if self._agendado is None and self._ativas:
+            self._agendado = self.raiz.after(self.intervalo_ms, self._drenar)
+
+    def _drenar(self):
+        self._agendado = None
+        concluidas = []
+        while True:
+            try:
+                concluidas.append(self._resultados.get_nowait())
+            except queue.Empty:
+                break
+        # Canceladas antes de começar não passam por _rodar.
+        concluidas += [(t, None, None) for t in self._ativas if t._future.cancelled()]
+        for tarefa, ok, valor in concluidas:
+            self._ativas.discard(tarefa)
+            if not _existe(tarefa.dono):
+                continue
+            if tarefa.cancelada or ok is None:
+                if tarefa.ao_cancelar is not None:
+                    tarefa.ao_cancelar()
+            elif ok:
+                if tarefa.ao_concluir is not None:
+                    tarefa.ao_concluir(valor)
+            elif tarefa.ao_falhar is not None:
+                tarefa.ao_falhar(valor)
+        for tarefa in list(self._ativas):
+            progresso = tarefa._progresso
+            if progresso is not tarefa._exibido and tarefa.ao_progredir is not None and _existe(tarefa.dono):
+                tarefa._exibido = progresso
+                tarefa.ao_progredir(*progresso)
+        self._agendar()
+
+    def cancelar_de(self, dono):
+        """Cancela as tarefas submetidas por `dono` (uma tela que será trocada)."""
+        for tarefa in list(self._ativas):
+            if tarefa.dono is dono:
+                tarefa.cancelar()
+
+    def encerrar(self):
+        for tarefa in list(self._ativas):
+            tarefa.cancelar()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class BarraProgresso(ttk.Frame):
+    """Progresso de uma tarefa, com botão para cancelá-la."""
+    def __init__(self, master):
+        super().__init__(master)
+        self.tarefa = None
+        self.barra = ttk.Progressbar(self, mode='determinate', maximum=1.0)
+        self.texto = ttk.Label(self, text='')
+        self.botao = ttk.Button(self, text='Cancelar', command=self.cancelar, state='disabled')
+        self.barra.pack(side='left', fill='x', expand=True)
+        self.botao.pack(side='right', padx=(5, 0))
+        self.texto.pack(side='right', padx=5)
+
+    def acompanhar(self, tarefa):
+        if self.tarefa is not None:
+            self.tarefa.cancelar()
+        self.tarefa = tarefa
+        anteriores = (tarefa.ao_concluir, tarefa.ao_falhar, tarefa.ao_cancelar)
+        tarefa.ao_progredir = self.atualizar
+        tarefa.ao_concluir = self._ao_fim(tarefa, anteriores[0], '')
+        tarefa.ao_falhar = self._ao_fim(tarefa, anteriores[1], 'Erro.')
+        tarefa.ao_cancelar = self._ao_fim(tarefa, anteriores[2], 'Cancelado.')
+        self.barra.configure(mode='indeterminate')
+        self.barra.start(20)
+        self.texto.configure(text='Processando...')
+        self.botao.configure(state='normal')
+
+    def _ao_fim(self, tarefa, callback, texto):
+        def fim(*args):
+            if self.tarefa is tarefa:
+                self.tarefa = None
+                self.barra.stop()
+                self.barra.configure(mode='determinate', value=0)
+                self.texto.configure(text=texto)
+                self.botao.configure(state='disabled')
+            if callback is not None:
+                callback(*args)
+        return fim
+
+    def atualizar(self, feito, total, texto):
+        if total:
+            self.barra.stop()
+            self.barra.configure(mode='determinate', value=feito / total)
+        self.texto.configure(text=texto)
+
+    def cancelar(self):
+        if self.tarefa is not None:
+            self.tarefa.cancelar()
+            self.texto.configure(text='Cancelando...')
+            self.botao.configure(state='disabled')
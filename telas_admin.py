@@ -0,0 +1,228 @@
+"""Telas do administrador, carregadas no primeiro login de administrador."""
+import tkinter as tk
+from tkinter import messagebox, scrolledtext
+from tkinter import ttk
+from SistemaBancario import ContaCorrente, ContaPoupanca
+from lista_virtual import VirtualList
+from tarefas import BarraProgresso
+
+class DeletionRequestsFrame(ttk.Frame):
+    MAX_LINHAS = 100  # linhas exibidas de cada vez; as ações em massa valem para toda a fila
+    BLOCO = 1000      # solicitações por etapa nas ações em massa (progresso e cancelamento)
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.master = master
+        self.linhas = {}
+        ttk.Label(self, text='Solicitações de Exclusão', style='Header.TLabel').pack(pady=(0,20))
+        self.contador = ttk.Label(self, text='Carregando solicitações...')
+        self.contador.pack(anchor='w')
+        acoes = ttk.Frame(self)
+        acoes.pack(fill='x', pady=5)
+        self.botoes = [
+            ttk.Button(acoes, text='Aprovar todas', style='Accent.TButton', command=lambda: self.process_all(True)),
+            ttk.Button(acoes, text='Recusar todas', style='Accent.TButton', command=lambda: self.process_all(False)),
+        ]
+        self.botoes[0].pack(side='left', padx=5)
+        self.botoes[1].pack(side='left')
+        self.progresso = BarraProgresso(acoes)
+        self.progresso.pack(side='left', fill='x', expand=True, padx=5)
+        self.area = ttk.Frame(self)
+        self.area.pack(fill='both', expand=True)
+        ttk.Button(self, text='Voltar', style='Accent.TButton', command=lambda: master.switch_frame(AdminMainFrame)).pack(pady=10)
+        self.completar()
+
+    def completar(self):
+        """Busca a fila em segundo plano e atualiza a tela."""
+        self.master.tarefas.executar(self, lambda tarefa: self.master.bank.get_pending_deletion_requests(),
+                                     ao_concluir=self._preencher)
+
+    def _preencher(self, pendentes):
+        """Atualiza o contador e exibe novas solicitações até MAX_LINHAS."""
+        self.contador.configure(text=f'{len(pendentes)} solicitações pendentes' if pendentes
+                                else 'Nenhuma solicitação pendente.')
+        for acc in pendentes:
+            if len(self.linhas) >= self.MAX_LINHAS:
+                break
+            if acc in self.linhas:
+                continue
+            frm = ttk.Frame(self.area, borderwidth=1, relief='solid')
+            frm.pack(fill='x', pady=5)
+            ttk.Label(frm, text=f'Ag: {acc.agencia} Cn: {acc.conta} Titular: {acc.titular}').pack(side='left', padx=5)
+            ttk.Button(frm, text='Aprovar', style='Accent.TButton', command=lambda a=acc: self.process(a, True)).pack(side='right', padx=5)
+            ttk.Button(frm, text='Recusar', style='Accent.TButton', command=lambda a=acc: self.process(a, False)).pack(side='right')
+            self.linhas[acc] = frm
+
+    def process(self, acc, aprovar):
+        if aprovar:
+            self.master.bank.approve_deletion_requests([acc])
+        else:
+            self.master.bank.reject_deletion_requests([acc])
+        self.linhas.pop(acc).destroy()
+        self.completar()
+
+    def process_all(self, aprovar):
+        for botao in self.botoes:
+            botao.configure(state='disabled')
+        self.master.tarefas.executar(self, self._processar_todas, aprovar, barra=self.progresso,
+                                     ao_concluir=self._concluir, ao_falhar=self._falhar,
+                                     ao_cancelar=self._recarregar)
+
+    def _processar_todas(self, tarefa, aprovar):
+        """Aprova ou recusa toda a fila em blocos; o cancelamento vale entre blocos."""
+        bank = self.master.bank
+        pendentes = bank.get_pending_deletion_requests()
+        n = 0
+        for i in range(0, len(pendentes), self.BLOCO):
+            tarefa.progresso(i, len(pendentes), f'{i} de {len(pendentes)}')
+            bloco = pendentes[i:i + self.BLOCO]
+            n += bank.approve_deletion_requests(bloco) if aprovar else bank.reject_deletion_requests(bloco)
+        return n
+
+    def _recarregar(self):
+        for botao in self.botoes:
+            botao.configure(state='normal')
+        for frm in self.linhas.values():
+            frm.destroy()
+        self.linhas.clear()
+        self.completar()
+
+    def _concluir(self, n):
+        self._recarregar()
+        messagebox.showinfo('Sucesso', f'{n} solicitações processadas')
+
+    def _falhar(self, erro):
+        self._recarregar()
+        messagebox.showerror('Erro', str(erro))
+
+class ListAccountsFrame(ttk.Frame):
+    def __init__(self, master):
+        super().__init__(master)
+        self.master = master
+        ttk.Label(self, text='Lista de Contas', style='Header.TLabel').pack(pady=(0,20))
+        self.total = ttk.Label(self, text='Carregando contas...')
+        self.total.pack(anchor='w')
+        self.lista = VirtualList(self)
+        self.lista.pack(fill='both', expand=True)
+        ttk.Button(self, text='Voltar', style='Accent.TButton', command=lambda: master.switch_frame(AdminMainFrame)).pack(pady=10)
+        master.tarefas.executar(self, self._contar, ao_concluir=self._exibir)
+
+    def _contar(self, tarefa):
+        contas = self.master.bank.accounts
+        return contas, len(contas)
+
+    def _exibir(self, resultado):
+        contas, n = resultado
+        self.total.configure(text=f'{n} contas' if n else 'Nenhuma conta cadastrada.')
+        self.lista.set_fonte(n, lambda i: self._linha(contas[i]))
+
+    @staticmethod
+    def _linha(acc):
+        return f'Ag: {acc.agencia} Cn: {acc.conta} Titular: {acc.titular} Saldo: R$ {acc.saldo:.2f}'
+
+class SearchAccountFrame(ttk.Frame):
+    ATRASO_MS = 200  # espera após a última tecla antes de consultar
+    LIMITE = 50      # resultados exibidos por consulta
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.master = master
+        self.encontradas = []
+        self._agendada = None
+        self._consulta = None
+        ttk.Label(self, text='Buscar Conta', style='Header.TLabel').grid(row=0, column=0, columnspan=2, pady=(0,20))
+        ttk.Label(self, text='Titular, conta ou agência:').grid(row=1, column=0, sticky='w', pady=5)
+        self.busca = ttk.Entry(self); self.busca.grid(row=1, column=1, sticky='ew', pady=5)
+        self.busca.bind('<KeyRelease>', self._digitado)
+        self.status = ttk.Label(self, text='Preparando índice de busca...')
+        self.status.grid(row=2, column=0, columnspan=2, sticky='w')
+        self.resultados = tk.Listbox(self, height=8, activestyle='none', exportselection=False)
+        self.resultados.grid(row=3, column=0, columnspan=2, sticky='nsew', pady=5)
+        self.resultados.bind('<<ListboxSelect>>', self._selecionar)
+        ttk.Label(self, text='Agência:').grid(row=4, column=0, sticky='w', pady=5)
+        self.ag = ttk.Entry(self); self.ag.grid(row=4, column=1, sticky='ew', pady=5)
+        ttk.Label(self, text='Conta:').grid(row=5, column=0, sticky='w', pady=5)
+        self.ct = ttk.Entry(self); self.ct.grid(row=5, column=1, sticky='ew', pady=5)
+        self.columnconfigure(1, weight=1)
+        ttk.Button(self, text='Buscar', style='Accent.TButton', command=self.search).grid(row=6, column=0, columnspan=2, pady=20)
+        self.txt = scrolledtext.ScrolledText(self, height=10)
+        self.txt.grid(row=7, column=0, columnspan=2, sticky='nsew', pady=5)
+        self.rowconfigure(3, weight=1)
+        self.rowconfigure(7, weight=1)
+        ttk.Button(self, text='Voltar', style='Accent.TButton', command=lambda: master.switch_frame(AdminMainFrame)).grid(row=8, column=0, columnspan=2)
+        # Cria o índice em segundo plano (k=0 não retorna contas) antes da primeira tecla.
+        master.tarefas.executar(self, lambda tarefa: master.bank.buscar('', 0),
+                                ao_concluir=lambda _: self.status.configure(text=''))
+
+    def destroy(self):
+        if self._agendada is not None:
+            self.after_cancel(self._agendada)
+            self._agendada = None
+        super().destroy()
+
+    def _digitado(self, event=None):
+        if self._agendada is not None:
+            self.after_cancel(self._agendada)
+        self._agendada = self.after(self.ATRASO_MS, self._consultar)
+
+    def _consultar(self):
+        self._agendada = None
+        if self._consulta is not None:
+            self._consulta.cancelar()  # o resultado de uma consulta anterior é descartado
+        self._consulta = self.master.tarefas.executar(
+            self, lambda tarefa, texto: self.master.bank.buscar(texto, self.LIMITE),
+            self.busca.get(), ao_concluir=self._listar)
+
+    def _listar(self, contas):
+        self._consulta = None
+        self.encontradas = contas
+        self.resultados.delete(0, tk.END)
+        for acc in contas:
+            self.resultados.insert(tk.END, f'{acc.agencia} / {acc.conta} - {acc.titular}')
+        if not self.busca.get().strip():
+            self.status.configure(text='')
+        elif not contas:
+            self.status.configure(text='Nenhuma conta encontrada')
+        elif len(contas) == self.LIMITE:
+            self.status.configure(text=f'Primeiras {self.LIMITE} contas; refine a busca')
+        else:
+            self.status.configure(text=f'{len(contas)} conta(s)')
+
+    def _selecionar(self, event=None):
+        selecao = self.resultados.curselection()
+        if selecao and selecao[0] < len(self.encontradas):
+            self._exibir(self.encontradas[selecao[0]])
+
+    def search(self):
+        self.txt.delete('1.0', tk.END)
+        self.master.tarefas.executar(self, lambda tarefa, ag, ct: self.master.bank.find_account(ag, ct),
+                                     self.ag.get(), self.ct.get(), ao_concluir=self._exibir)
+
+    def _exibir(self, acc):
+        self.txt.delete('1.0', tk.END)
+        if not acc:
+            self.txt.insert(tk.END, 'Conta não encontrada')
+        else:
+            info = (
+                f'Ag: {acc.agencia}\n'
+                f'Cn: {acc.conta}\n'
+                f'Tit: {acc.titular}\n'
+                f'End: {acc.endereco}\n'
+                f'Saldo: R$ {acc.saldo:.2f}\n'
+            )
+            if isinstance(acc, ContaCorrente):
+                info += f'Limite: R$ {acc.limite_cheque_especial:.2f}\nTaxa: R$ {acc.taxa_manutencao:.2f}'
+            elif isinstance(acc, ContaPoupanca):
+                info += f'Rend: {acc.rendimento_mensal:.2%}'
+            self.txt.insert(tk.END, info)
+
+class AdminMainFrame(ttk.Frame):
+    def __init__(self, master):
+        super().__init__(master)
+        self.master = master
+        self.columnconfigure(0, weight=1)
+        ttk.Label(self, text='Administrador', style='Header.TLabel').grid(row=0, column=0, pady=(0,30))
+        ttk.Button(self, text='Solicitações de Exclusão', style='Accent.TButton', command=lambda: master.switch_frame(DeletionRequestsFrame)).grid(row=1, column=0, pady=10, ipadx=20)
+        ttk.Button(self, text='Listar Contas', style='Accent.TButton', command=lambda: master.switch_frame(ListAccountsFrame)).grid(row=2, column=0, pady=10, ipadx=20)
+        ttk.Button(self, text='Buscar Conta', style='Accent.TButton', command=lambda: master.switch_frame(SearchAccountFrame)).grid(row=3, column=0, pady=10, ipadx=20)
+        ttk.Button(self, text='Logout', style='Accent.TButton', command=lambda: master.switch_frame('SelectionFrame')).grid(row=4, column=0, pady=10, ipadx=20)
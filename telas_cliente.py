@@ -0,0 +1,188 @@
+"""Telas do cliente, carregadas quando o primeiro cliente entra."""
+from tkinter import messagebox
+from tkinter import ttk
+from datetime import datetime
+from SistemaBancario import Account, ContaCorrente, ContaPoupanca
+from lista_virtual import VirtualList
+from tarefas import BarraProgresso
+
+class ClientMainFrame(ttk.Frame):
+    def __init__(self, master, account: Account):
+        super().__init__(master)
+        self.master = master
+        self.account = account
+        ttk.Label(self, text=f'Cliente: {account.titular}', style='Header.TLabel').grid(row=0, column=0, columnspan=2, pady=(0,20))
+        actions = [
+            ('Depósito', DepositFrame),
+            ('Saque', WithdrawFrame),
+            ('Transferência', TransferFrame),
+            ('Extrato', ExtractFrame),
+            ('Detalhes Conta', AccountDetailsFrame),
+            ('Atualizar Endereço', UpdateAddressFrame),
+        ]
+        for i, (txt, frm) in enumerate(actions, start=1):
+            ttk.Button(self, text=txt, style='Accent.TButton', command=lambda f=frm: master.switch_frame(f, account=account)).grid(row=i, column=0, pady=5, ipadx=20)
+        ttk.Button(self, text='Solicitar Exclusão', style='Accent.TButton', command=self.request_deletion).grid(row=1, column=1, pady=5)
+        ttk.Button(self, text='Logout', style='Accent.TButton', command=lambda: master.switch_frame('SelectionFrame')).grid(row=2, column=1, pady=5)
+        self.columnconfigure(0, weight=1)
+        self.columnconfigure(1, weight=1)
+
+    def request_deletion(self):
+        self.account.deletion_requested = True
+        messagebox.showinfo('Sucesso','Solicitação enviada')
+
+class DepositFrame(ttk.Frame):
+    def __init__(self, master, account: Account):
+        super().__init__(master)
+        self.master = master
+        self.account = account
+        ttk.Label(self, text='Depósito', style='Header.TLabel').grid(row=0, column=0, columnspan=2, pady=(0,20))
+        ttk.Label(self, text='Valor:').grid(row=1, column=0, sticky='w', pady=5)
+        self.val = ttk.Entry(self); self.val.grid(row=1, column=1, sticky='ew', pady=5)
+        ttk.Label(self, text='Origem:').grid(row=2, column=0, sticky='w', pady=5)
+        self.inf = ttk.Entry(self); self.inf.grid(row=2, column=1, sticky='ew', pady=5)
+        self.columnconfigure(1, weight=1)
+        ttk.Button(self, text='Confirmar', style='Accent.TButton', command=self.deposit).grid(row=3, column=0, columnspan=2, pady=20)
+        ttk.Button(self, text='Voltar', style='Accent.TButton', command=lambda: master.switch_frame(ClientMainFrame, account=account)).grid(row=4, column=0, columnspan=2)
+
+    def deposit(self):
+        try:
+            self.account.deposit(float(self.val.get()), self.inf.get())
+            messagebox.showinfo('Sucesso','Depósito realizado')
+            self.master.switch_frame(ClientMainFrame, account=self.account)
+        except Exception as e:
+            messagebox.showerror('Erro', str(e))
+
+class WithdrawFrame(ttk.Frame):
+    def __init__(self, master, account: Account):
+        super().__init__(master)
+        self.master = master
+        self.account = account
+        ttk.Label(self, text='Saque', style='Header.TLabel').grid(row=0, column=0, columnspan=2, pady=(0,20))
+        ttk.Label(self, text='Valor:').grid(row=1, column=0, sticky='w', pady=5)
+        self.val = ttk.Entry(self); self.val.grid(row=1, column=1, sticky='ew', pady=5)
+        self.columnconfigure(1, weight=1)
+        ttk.Button(self, text='Confirmar', style='Accent.TButton', command=self.withdraw).grid(row=2, column=0, columnspan=2, pady=20)
+        ttk.Button(self, text='Voltar', style='Accent.TButton', command=lambda: master.switch_frame(ClientMainFrame, account=account)).grid(row=3, column=0, columnspan=2)
+
+    def withdraw(self):
+        try:
+            self.account.withdraw(float(self.val.get()))
+            messagebox.showinfo('Sucesso','Saque realizado')
+            self.master.switch_frame(ClientMainFrame, account=self.account)
+        except Exception as e:
+            messagebox.showerror('Erro', str(e))
+
+class TransferFrame(ttk.Frame):
+    def __init__(self, master, account: Account):
+        super().__init__(master)
+        self.master = master
+        self.account = account
+        ttk.Label(self, text='Transferência', style='Header.TLabel').grid(row=0, column=0, columnspan=2, pady=(0,20))
+        ttk.Label(self, text='Agência destino:').grid(row=1, column=0, sticky='w', pady=5)
+        self.ag = ttk.Entry(self); self.ag.grid(row=1, column=1, sticky='ew', pady=5)
+        ttk.Label(self, text='Conta destino:').grid(row=2, column=0, sticky='w', pady=5)
+        self.ct = ttk.Entry(self); self.ct.grid(row=2, column=1, sticky='ew', pady=5)
+        ttk.Label(self, text='Valor:').grid(row=3, column=0, sticky='w', pady=5)
+        self.val = ttk.Entry(self); self.val.grid(row=3, column=1, sticky='ew', pady=5)
+        self.columnconfigure(1, weight=1)
+        ttk.Button(self, text='Confirmar', style='Accent.TButton', command=self.transfer).grid(row=4, column=0, columnspan=2, pady=20)
+        ttk.Button(self, text='Voltar', style='Accent.TButton', command=lambda: master.switch_frame(ClientMainFrame, account=account)).grid(row=5, column=0, columnspan=2)
+
+    def transfer(self):
+        try:
+            dest = self.master.bank.find_account(self.ag.get(), self.ct.get())
+            if not dest:
+                raise ValueError('Conta destino não encontrada')
+            self.account.transfer(dest, float(self.val.get()))
+            messagebox.showinfo('Sucesso','Transferência realizada')
+            self.master.switch_frame(ClientMainFrame, account=self.account)
+        except Exception as e:
+            messagebox.showerror('Erro', str(e))
+
+class ExtractFrame(ttk.Frame):
+    def __init__(self, master, account: Account):
+        super().__init__(master)
+        self.master = master
+        self.account = account
+        ttk.Label(self, text='Extrato', style='Header.TLabel').grid(row=0, column=0, columnspan=2, pady=(0,20))
+        ttk.Label(self, text='Data início (dd/mm/aaaa):').grid(row=1, column=0, sticky='w', pady=5)
+        self.start = ttk.Entry(self); self.start.grid(row=1, column=1, sticky='ew', pady=5)
+        ttk.Label(self, text='Data fim (dd/mm/aaaa):').grid(row=2, column=0, sticky='w', pady=5)
+        self.end = ttk.Entry(self); self.end.grid(row=2, column=1, sticky='ew', pady=5)
+        self.columnconfigure(1, weight=1)
+        ttk.Button(self, text='Gerar', style='Accent.TButton', command=self.generate).grid(row=3, column=0, columnspan=2, pady=20)
+        self.resumo = ttk.Label(self, text='')
+        self.resumo.grid(row=4, column=0, columnspan=2, sticky='w')
+        self.lista = VirtualList(self, height=10)
+        self.lista.grid(row=5, column=0, columnspan=2, sticky='nsew', pady=5)
+        self.rowconfigure(5, weight=1)
+        self.progresso = BarraProgresso(self)
+        self.progresso.grid(row=6, column=0, columnspan=2, sticky='ew', pady=5)
+        ttk.Button(self, text='Voltar', style='Accent.TButton', command=lambda: master.switch_frame(ClientMainFrame, account=account)).grid(row=7, column=0, columnspan=2)
+
+    def generate(self):
+        self.lista.set_fonte(0, None)
+        self.resumo.configure(text='')
+        try:
+            inicio = datetime.strptime(self.start.get(), '%d/%m/%Y')
+            fim = datetime.strptime(self.end.get(), '%d/%m/%Y')
+        except ValueError as e:
+            return messagebox.showerror('Erro', str(e))
+        self.master.tarefas.executar(self, self._consultar, inicio, fim,
+                                     ao_concluir=self._exibir, barra=self.progresso)
+
+    def _consultar(self, tarefa, inicio, fim):
+        log = self.account.transactions
+        lo, hi = log.index_range(inicio, fim)
+        tarefa.verificar()
+        abertura, fechamento = self.account.get_saldos_periodo(inicio, fim)
+        return log, lo, hi, abertura, fechamento
+
+    def _exibir(self, resultado):
+        log, lo, hi, abertura, fechamento = resultado
+        resumo = f'Saldo inicial: R$ {abertura:.2f}    Saldo final: R$ {fechamento:.2f}'
+        if lo == hi:
+            resumo += '\nNenhuma operação neste período.'
+        self.resumo.configure(text=resumo)
+        self.lista.set_fonte(hi - lo, lambda i: str(log[lo + i]))
+
+class AccountDetailsFrame(ttk.Frame):
+    def __init__(self, master, account: Account):
+        super().__init__(master)
+        info = (
+            f'Agência: {account.agencia}\n'
+            f'Conta: {account.conta}\n'
+            f'Titular: {account.titular}\n'
+            f'Endereço: {account.endereco}\n'
+            f'Saldo: R$ {account.saldo:.2f}\n'
+        )
+        if isinstance(account, ContaCorrente):
+            info += f'Limite cheque especial: R$ {account.limite_cheque_especial:.2f}\n'
+            info += f'Taxa manutenção: R$ {account.taxa_manutencao:.2f}'
+        elif isinstance(account, ContaPoupanca):
+            info += f'Rendimento mensal: {account.rendimento_mensal:.2%}'
+        ttk.Label(self, text='Detalhes da Conta', style='Header.TLabel').pack(pady=(0,20))
+        ttk.Label(self, text=info, justify='left').pack(padx=10)
+        ttk.Button(self, text='Voltar', style='Accent.TButton', command=lambda: master.switch_frame(ClientMainFrame, account=account)).pack(pady=10)
+
+class UpdateAddressFrame(ttk.Frame):
+    def __init__(self, master, account: Account):
+        super().__init__(master)
+        self.master = master
+        self.account = account
+        ttk.Label(self, text='Atualizar Endereço', style='Header.TLabel').grid(row=0, column=0, columnspan=2, pady=(0,20))
+        ttk.Label(self, text='Novo endereço:').grid(row=1, column=0, sticky='w', pady=5)
+        self.en = ttk.Entry(self)
+        self.en.grid(row=1, column=1, sticky='ew', pady=5)
+        self.columnconfigure(1, weight=1)
+        ttk.Button(self, text='Salvar', style='Accent.TButton', command=self.update).grid(row=2, column=0, columnspan=2, pady=20)
+        ttk.Button(self, text='Voltar', style='Accent.TButton', command=lambda: master.switch_frame(ClientMainFrame, account=account)).grid(row=3, column=0, columnspan=2)
+
+    def update(self):
+        try:
+            self.account.update_address(self.en.get())
+            messagebox.showinfo('Sucesso','Endereço atualizado')
+            self.master.switch_frame(ClientMainFrame, account=self.account)
+        except Exception as e:
+            messagebox.showerror('Erro', str(e))